@@ -0,0 +1,215 @@
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+
+from ortools.sat.python import cp_model
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, joinedload
+
+import effective_schedule
+import models
+import schemas
+import timetable_engine
+from occupancy_index import OccupancyIndex
+
+class AvailabilitySnapshot:
+    """
+    Busy bitmaps (bit n = calendar slot id n) for every teacher, room and section, plus the teachers
+    qualified for each course. Loaded once per request so every conflict is answered from memory;
+    only the cells of `days` x `time_slots` are offered as reschedule targets.
+    The weekly bitmaps come from the occupancy index. Overrides are dated, so the index does not hold
+    them: load() reads the ones dated `on` from the database and applies them on top, so a teacher or
+    room an override already books is not offered again.
+    """
+    def __init__(self, days: list, time_slots: list):
+        self.days, self.time_slots = list(days), list(time_slots)
+        self.cell_bits = {(d, t): 1 << timetable_engine.slot_id(d, t) for d in self.days for t in self.time_slots if timetable_engine.slot_id(d, t) is not None}
+        self.teacher_busy, self.room_busy, self.section_busy = defaultdict(int), defaultdict(int), defaultdict(int)
+        self.qualified = defaultdict(list)
+        self.teacher_names, self.room_names = {}, {}
+
+    @classmethod
+    def load(cls, db: Session, occupancy: OccupancyIndex, days: list = None, time_slots: list = None, on: date = None):
+        """The index's weekly bitmaps with the overrides dated `on` (default today) applied."""
+        snapshot = cls(days or timetable_engine.DAYS, time_slots or timetable_engine.time_slots_for(False))
+        for busy, masks in zip((snapshot.teacher_busy, snapshot.room_busy, snapshot.section_busy), occupancy.masks()): busy.update(masks)
+        for teacher_id, course_id in db.execute(select(models.teacher_course_association.c.teacher_id, models.teacher_course_association.c.course_id)):
+            snapshot.qualified[course_id].append(teacher_id)
+        snapshot.teacher_names, snapshot.room_names = dict(occupancy.teacher_names), dict(occupancy.room_names)
+        Entry, Override = models.ScheduleEntry, models.ScheduleOverride
+        for ov, entry in db.execute(select(Override, Entry).join(Entry, Override.original_entry_id == Entry.id).where(Override.override_date == (on or date.today()))).all():
+            snapshot.apply_override(ov, entry)
+        return snapshot
+
+    def apply_override(self, ov: models.ScheduleOverride, entry: models.ScheduleEntry):
+        slot = timetable_engine.slot_id(entry.day, entry.time_slot)
+        if slot is None: return
+        bit = 1 << slot
+        if ov.change_type == "SUBSTITUTE" and ov.new_teacher_id:
+            self.teacher_busy[entry.teacher_id] &= ~bit
+            self.teacher_busy[ov.new_teacher_id] |= bit
+        elif ov.change_type == "RESCHEDULE":
+            new_slot = timetable_engine.slot_id(ov.new_day or entry.day, ov.new_time_slot or entry.time_slot)
+            self.teacher_busy[entry.teacher_id] &= ~bit; self.room_busy[entry.room_id] &= ~bit; self.section_busy[entry.section_id] &= ~bit
+            if new_slot is None: return
+            self.teacher_busy[ov.new_teacher_id or entry.teacher_id] |= 1 << new_slot
+            self.room_busy[ov.new_room_id or entry.room_id] |= 1 << new_slot
+            self.section_busy[entry.section_id] |= 1 << new_slot
+
+    def free_rooms(self, bit: int) -> list:
+        return [room_id for room_id in self.room_names if not self.room_busy[room_id] & bit]
+
+def find_solutions_for_conflict(conflict: models.ScheduleEntry, snapshot: AvailabilitySnapshot, max_reschedules: int = 3):
+    solutions = []
+    bit = snapshot.cell_bits.get((conflict.day, conflict.time_slot), 0)
+    for teacher_id in snapshot.qualified[conflict.course_id]:
+        if teacher_id == conflict.teacher_id: continue
+        if not snapshot.teacher_busy[teacher_id] & bit:
+            solutions.append(schemas.Solution(type="SUBSTITUTE", details=f"Assign {snapshot.teacher_names[teacher_id]}", new_teacher_id=teacher_id))
+
+    occupied = snapshot.section_busy[conflict.section_id] | snapshot.teacher_busy[conflict.teacher_id]
+    potential_slots = [cell for cell, cell_bit in snapshot.cell_bits.items() if not occupied & cell_bit]
+    random.shuffle(potential_slots)
+
+    reschedule_count = 0
+    for day, time in potential_slots:
+        if reschedule_count >= max_reschedules: break
+        available_rooms = snapshot.free_rooms(snapshot.cell_bits[(day, time)])
+        if available_rooms:
+            free_room_id = available_rooms[0]
+            solutions.append(schemas.Solution(type="RESCHEDULE", details=f"Move to {day}, {time} in {snapshot.room_names[free_room_id]}", new_day=day, new_time_slot=time, new_room_id=free_room_id))
+            reschedule_count += 1
+    return solutions
+
+# --- LEAVE PLANNING (CP-SAT) ---
+SUBSTITUTE_COST = 1
+RESCHEDULE_COST = 5
+UNRESOLVED_COST = 100
+
+class DatedOccupancy:
+    """Busy (date, time_slot) cells per teacher, room and section across a date window, overrides applied."""
+    def __init__(self, entries: dict, overrides: list, dates: list):
+        self.teacher, self.room, self.section = defaultdict(set), defaultdict(set), defaultdict(set)
+        self.dates = list(dates)
+        by_day = defaultdict(list)
+        for entry in entries.values(): by_day[entry.day].append(entry)
+        for on in self.dates:
+            for entry in by_day[timetable_engine.DAYS[on.weekday()]]: self._mark(entry.teacher_id, entry.room_id, entry.section_id, on, entry.time_slot, set.add)
+        for ov in overrides:
+            entry = entries.get(ov.original_entry_id)
+            if entry is None: continue
+            if ov.change_type == "SUBSTITUTE":
+                self.teacher[entry.teacher_id].discard((ov.override_date, entry.time_slot))
+                self.teacher[ov.new_teacher_id].add((ov.override_date, entry.time_slot))
+            elif ov.change_type == "RESCHEDULE" and ov.new_day in timetable_engine.DAYS:
+                self._mark(entry.teacher_id, entry.room_id, entry.section_id, ov.override_date, entry.time_slot, set.discard)
+                self._mark(ov.new_teacher_id or entry.teacher_id, ov.new_room_id or entry.room_id, entry.section_id,
+                           timetable_engine.date_for_day(ov.override_date, ov.new_day), ov.new_time_slot or entry.time_slot, set.add)
+
+    def _mark(self, teacher_id, room_id, section_id, on, time_slot, op):
+        op(self.teacher[teacher_id], (on, time_slot)); op(self.room[room_id], (on, time_slot)); op(self.section[section_id], (on, time_slot))
+
+def plan_leave(db: Session, teacher: models.Teacher, start: date, end: date, time_limit: float = 10.0, num_workers: int = 8) -> schemas.LeavePlan:
+    """
+    Expands a leave into dated class instances and assigns every instance a substitute, a make-up slot
+    later or earlier in the same week (outside this leave and the teacher's other leave records), or
+    nothing, in one CP-SAT model so no substitute, room or section is double-booked across the whole plan.
+    Existing overrides in the window are honoured and instances that already have one are left alone.
+    """
+    if end < start: raise ValueError("end_date is before start_date")
+    time_slots = timetable_engine.time_slots_for(False)
+    dates = sorted({d for offset in range((end - start).days + 1) for d in timetable_engine.week_dates(start + timedelta(days=offset))})
+    leave_dates = {d for d in dates if start <= d <= end}
+
+    entries = {e.id: e for e in db.query(models.ScheduleEntry).options(
+        joinedload(models.ScheduleEntry.course), joinedload(models.ScheduleEntry.section)).all()}
+    overrides = db.query(models.ScheduleOverride).filter(models.ScheduleOverride.override_date.between(dates[0], dates[-1])).all()
+    qualified = defaultdict(list)
+    for teacher_id, course_id in db.execute(select(models.teacher_course_association.c.teacher_id, models.teacher_course_association.c.course_id)):
+        qualified[course_id].append(teacher_id)
+    on_leave = defaultdict(set)
+    for leave in db.query(models.TeacherLeave).filter(models.TeacherLeave.start_date <= dates[-1], models.TeacherLeave.end_date >= dates[0]):
+        on_leave[leave.teacher_id].update(d for d in dates if leave.start_date <= d <= leave.end_date)
+    teacher_names = dict(db.query(models.Teacher.id, models.Teacher.name).all())
+    room_names = dict(db.query(models.Room.id, models.Room.name).all())
+
+    busy = DatedOccupancy(entries, overrides, dates)
+    covered = {(ov.original_entry_id, ov.override_date) for ov in overrides}
+    instances = sorted(
+        ((e, d) for d in leave_dates for e in entries.values() if e.teacher_id == teacher.id and e.day == timetable_engine.DAYS[d.weekday()]),
+        key=lambda item: (item[1], time_slots.index(item[0].time_slot) if item[0].time_slot in time_slots else len(time_slots)))
+    already_covered = sum((e.id, d) in covered for e, d in instances)
+    instances = [(e, d) for e, d in instances if (e.id, d) not in covered]
+    if not instances: return schemas.LeavePlan(assignments=[], unresolved=[], already_covered=already_covered, status="OPTIMAL", solve_time=0.0, objective=0)
+
+    free_room_count = {(d, t): sum((d, t) not in busy.room[r] for r in room_names) for d in dates for t in time_slots}
+    makeup_dates = [d for d in dates if d not in leave_dates and d >= date.today()]
+
+    model = cp_model.CpModel()
+    options, costs = [], []
+    substitute_cells, section_cells, teacher_cells, room_cells = defaultdict(list), defaultdict(list), defaultdict(list), defaultdict(list)
+    for i, (entry, on) in enumerate(instances):
+        choices = []
+        for teacher_id in qualified[entry.course_id]:
+            if teacher_id == teacher.id or on in on_leave[teacher_id] or (on, entry.time_slot) in busy.teacher[teacher_id]: continue
+            var = model.NewBoolVar(f'sub_{i}_{teacher_id}')
+            substitute_cells[(teacher_id, on, entry.time_slot)].append(var)
+            options.append((var, i, "SUBSTITUTE", teacher_id, None, None)); choices.append(var); costs.append(SUBSTITUTE_COST * var)
+        for makeup in makeup_dates:
+            if makeup not in timetable_engine.week_dates(on) or makeup in on_leave[teacher.id]: continue  # another leave of the teacher
+            for time_slot in time_slots:
+                cell = (makeup, time_slot)
+                if cell in busy.section[entry.section_id] or cell in busy.teacher[teacher.id] or free_room_count[cell] == 0: continue
+                var = model.NewBoolVar(f'res_{i}_{makeup.toordinal()}_{time_slot}')
+                section_cells[(entry.section_id,) + cell].append(var); teacher_cells[cell].append(var); room_cells[cell].append(var)
+                options.append((var, i, "RESCHEDULE", None, makeup, time_slot)); choices.append(var); costs.append(RESCHEDULE_COST * var)
+        unresolved = model.NewBoolVar(f'unresolved_{i}')
+        options.append((unresolved, i, "UNRESOLVED", None, None, None)); costs.append(UNRESOLVED_COST * unresolved)
+        model.AddExactlyOne(choices + [unresolved])
+    for group in (substitute_cells, section_cells, teacher_cells):
+        for cell_vars in group.values():
+            if len(cell_vars) > 1: model.AddAtMostOne(cell_vars)
+    for cell, cell_vars in room_cells.items():
+        if len(cell_vars) > free_room_count[cell]: model.Add(sum(cell_vars) <= free_room_count[cell])
+    model.Minimize(sum(costs))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_search_workers = num_workers
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE): raise ValueError(f"Leave planning failed ({solver.StatusName(status)}).")
+
+    assignments, unresolved_list, rooms_taken = [], [], defaultdict(set)
+    for var, i, change_type, teacher_id, makeup, time_slot in options:
+        if not solver.BooleanValue(var): continue
+        entry, on = instances[i]
+        planned = schemas.PlannedOverride(entry_id=entry.id, override_date=on, change_type=change_type, details="No substitute or make-up slot available",
+                                          original_class=f"{entry.course.name} ({entry.section.name}) on {on.isoformat()} ({entry.day}) at {entry.time_slot}")
+        if change_type == "SUBSTITUTE":
+            planned.new_teacher_id, planned.details = teacher_id, f"Assign {teacher_names[teacher_id]}"
+        elif change_type == "RESCHEDULE":
+            cell = (makeup, time_slot)
+            candidates = [r for r in room_names if cell not in busy.room[r] and r not in rooms_taken[cell]]
+            room_id = entry.room_id if entry.room_id in candidates else candidates[0]
+            rooms_taken[cell].add(room_id)
+            planned.new_teacher_id, planned.new_room_id = teacher.id, room_id
+            planned.new_day, planned.new_time_slot = timetable_engine.DAYS[makeup.weekday()], time_slot
+            planned.details = f"Move to {planned.new_day} {makeup.isoformat()}, {time_slot} in {room_names[room_id]}"
+        (unresolved_list if change_type == "UNRESOLVED" else assignments).append(planned)
+    return schemas.LeavePlan(assignments=assignments, unresolved=unresolved_list, already_covered=already_covered,
+                             status=solver.StatusName(status), solve_time=round(solver.WallTime(), 3), objective=round(solver.ObjectiveValue()))
+
+def apply_plan(db: Session, assignments: list) -> int:
+    """Writes every planned override with one executemany and a single commit."""
+    assignments = [a for a in assignments if a.change_type in ("SUBSTITUTE", "RESCHEDULE")]
+    if not assignments: return 0
+    known = set(db.execute(select(models.ScheduleEntry.id).where(models.ScheduleEntry.id.in_({a.entry_id for a in assignments}))).scalars())
+    missing = {a.entry_id for a in assignments} - known
+    if missing: raise LookupError(f"Schedule entries not found: {sorted(missing)}")
+    db.execute(insert(models.ScheduleOverride), [{
+        "original_entry_id": a.entry_id, "override_date": a.override_date, "change_type": a.change_type,
+        "new_teacher_id": a.new_teacher_id, "new_room_id": a.new_room_id, "new_day": a.new_day, "new_time_slot": a.new_time_slot,
+    } for a in assignments])
+    db.commit()
+    for a in assignments: effective_schedule.cache.invalidate(a.override_date)
+    return len(assignments)
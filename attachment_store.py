@@ -0,0 +1,83 @@
+"""
+Content-addressed storage for community post attachments. An upload is copied in CHUNK_BYTES chunks into a
+temporary file while it is hashed, then renamed to ATTACHMENT_DIR/<sha256[:2]>/<sha256><ext>, so the same
+notice uploaded twice is stored once and a stored file never changes: its URL can be cached for good.
+Posts share a file, so linking a file to a new post and removing it with the last post that links it both
+happen under `lock`: a delete cannot unlink a file that a post being created has just deduplicated onto.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+
+import ingest
+
+ATTACHMENT_DIR = os.environ.get("SMARTFLEX_ATTACHMENT_DIR", "./attachments")
+MAX_ATTACHMENT_BYTES = int(os.environ.get("SMARTFLEX_MAX_ATTACHMENT_MB", "20")) * 1024 * 1024
+CHUNK_BYTES = 1024 * 1024
+FORM_OVERHEAD_BYTES = 1024 * 1024  # the post's text fields and multipart framing around the attachment
+URL_PREFIX = "/api/attachments/"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+NAME = re.compile(r"[0-9a-f]{64}(\.[a-z0-9]{1,8})?")
+EXTENSION = re.compile(r"\.[a-z0-9]{1,8}")
+
+lock = threading.RLock()  # per process, like the occupancy index
+
+def extension(filename: str) -> str:
+    """The client filename's extension when it is a plain one, else ''; only used to pick the media type."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if EXTENSION.fullmatch(ext) else ""
+
+def path(name: str) -> str:
+    """The file of a stored attachment name (`<sha256><ext>`); ValueError for anything else."""
+    if not NAME.fullmatch(name): raise ValueError("not an attachment name")
+    return os.path.join(ATTACHMENT_DIR, name[:2], name)
+
+def media_type(name: str) -> str:
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+def receive(file_obj, filename: str, limit: int = MAX_ATTACHMENT_BYTES) -> tuple:
+    """
+    Streams `file_obj` into a temporary file in the store, hashing it; raises ingest.UploadTooLarge past `limit`
+    bytes (nothing is kept). Blocking: run it in the thread pool. Returns (temporary path, name, size) for link().
+    """
+    digest, size = hashlib.sha256(), 0
+    os.makedirs(ATTACHMENT_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=ATTACHMENT_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := file_obj.read(CHUNK_BYTES):
+                size += len(chunk)
+                if size > limit: raise ingest.UploadTooLarge(f"Attachment is over the {limit / 1048576:.0f} MB limit.")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+    return tmp, digest.hexdigest() + extension(filename), size
+
+def link(tmp: str, name: str, size: int) -> dict:
+    """
+    Moves a received file to its place, or drops it when that content is already stored. Hold `lock` from
+    here until the post that links it is committed. Returns the name, its URL, its size and whether it was already stored.
+    """
+    target = path(name)
+    with lock:
+        existed = os.path.exists(target)
+        if existed: os.remove(tmp)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp, target)
+    return {"name": name, "url": URL_PREFIX + name, "size": size, "deduplicated": existed}
+
+def name_of(url: str):
+    """The attachment name behind a post's attachment_url, or None for legacy /uploads/ URLs."""
+    return url[len(URL_PREFIX):] if url and url.startswith(URL_PREFIX) else None
+
+def remove(name: str):
+    """Deletes a stored file; call under `lock`, after checking that no post links it."""
+    try: os.remove(path(name))
+    except FileNotFoundError: pass
@@ -0,0 +1,138 @@
+from datetime import date, timedelta
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, case, delete, func, insert, select, text, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import attendance_archive
+import models
+
+# teacher.js cycles P / A / L; a late mark still counts as attended. The long forms come from older clients.
+ATTENDED = ("P", "L", "Present", "Late")
+DEFAULTER_THRESHOLD = 75.0
+
+Log, Rollup = models.AttendanceRecord, models.AttendanceRollup
+
+# Per-connection scratch table for per-student totals of archived days, so they aggregate in SQL with the rest
+ArchivedTotals = Table(
+    "attendance_archived_totals", MetaData(), Column("classroom_id", String), Column("student_roll", String),
+    Column("student_name", String), Column("attended", Integer), Column("total", Integer),
+)
+
+# --- ROLLUP MAINTENANCE ---
+REBUILD_SQL = [  # rebuild() only, migrations keep a frozen copy. Archived months keep their rollups: their rows left the log
+    """DELETE FROM attendance_rollups WHERE NOT EXISTS (SELECT 1 FROM attendance_archive a
+        WHERE a.classroom_id = attendance_rollups.classroom_id AND a.month = attendance_rollups.month)""",
+    f"""INSERT INTO attendance_rollups (classroom_id, student_roll, month, student_name, attended, total)
+        SELECT classroom_id, student_roll, date(date, 'start of month'), max(student_name),
+               sum(status IN ({", ".join(f"'{s}'" for s in ATTENDED)})), count(*)
+        FROM attendance_log_v1 GROUP BY classroom_id, student_roll, date(date, 'start of month')""",
+]
+
+def rebuild(dbapi):
+    """Recomputes every rollup from the log; for migrations and after out-of-band writes to the log."""
+    for statement in REBUILD_SQL: dbapi.execute(statement)
+
+def count_rows(rows, sign: int, deltas: dict, names: dict):
+    """Adds `sign` x each (classroom_id, student_roll, student_name, date, status) row to the per-month deltas."""
+    for classroom_id, roll, name, day, status in rows:
+        key = (classroom_id, roll, day.replace(day=1))
+        attended, total = deltas.get(key, (0, 0))
+        deltas[key] = (attended + sign * (status in ATTENDED), total + sign)
+        names[key] = name
+
+def apply_deltas(db: Session, deltas: dict, names: dict):
+    """Moves the rollups by `deltas` in one upsert; months left with no records are dropped."""
+    rows = [{"classroom_id": c, "student_roll": r, "month": m, "student_name": names[(c, r, m)], "attended": a, "total": t}
+            for (c, r, m), (a, t) in deltas.items()]
+    if not rows: return
+    table = Rollup.__table__
+    upsert = sqlite_insert(table)
+    db.execute(upsert.on_conflict_do_update(index_elements=["classroom_id", "student_roll", "month"], set_={
+        "attended": table.c.attended + upsert.excluded.attended, "total": table.c.total + upsert.excluded.total,
+        "student_name": upsert.excluded.student_name,
+    }), rows)
+    db.execute(delete(Rollup).where(Rollup.total <= 0, Rollup.classroom_id.in_({c for c, _, _ in deltas})))
+
+# --- REPORTS ---
+def next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def split_range(start: date = None, end: date = None) -> tuple:
+    """
+    ((first month, last month) read from the rollups or None, [(from, to), ...] read from the log) covering
+    [start, end]; None bounds are open. Only the partial months at either end touch the log.
+    """
+    if start and end and start > end: raise ValueError("start must not be after end")
+    first = None if start is None else (start if start.day == 1 else next_month(start))
+    last = None if end is None else (end.replace(day=1) if (end + timedelta(days=1)).day == 1 else (end.replace(day=1) - timedelta(days=1)).replace(day=1))
+    if first and last and first > last: return None, [(start, end)]
+    edges = []
+    if start and start < first: edges.append((start, first - timedelta(days=1)))
+    if end and last and end >= next_month(last): edges.append((next_month(last), end))
+    return (first, last), edges
+
+def archived_totals(db: Session, edges: list, classroom_id: str = None, student_roll: str = None):
+    """A select over the archived days of the edge ranges, or None when none of them is archived."""
+    rows = [row for low, high in edges for row in attendance_archive.student_totals(db, low, high, ATTENDED, classroom_id, student_roll)]
+    if not rows: return None
+    db.execute(text("CREATE TEMP TABLE IF NOT EXISTS attendance_archived_totals (classroom_id, student_roll, student_name, attended, total)"))
+    db.execute(delete(ArchivedTotals))
+    db.execute(insert(ArchivedTotals), [dict(zip(("classroom_id", "student_roll", "student_name", "attended", "total"), row)) for row in rows])
+    return select(ArchivedTotals)
+
+def student_totals(db: Session, start: date = None, end: date = None, classroom_id: str = None, student_roll: str = None):
+    """
+    Subquery of (classroom_id, student_roll, student_name, attended, total) per student over [start, end]: full months
+    from the rollups, partial months from the log and, where those months are archived, from the archive files.
+    """
+    months, edges = split_range(start, end)
+    parts = []
+    if months:
+        q = select(Rollup.classroom_id, Rollup.student_roll, Rollup.student_name, Rollup.attended, Rollup.total)
+        if months[0]: q = q.where(Rollup.month >= months[0])
+        if months[1]: q = q.where(Rollup.month <= months[1])
+        if classroom_id: q = q.where(Rollup.classroom_id == classroom_id)
+        if student_roll: q = q.where(Rollup.student_roll == student_roll)
+        parts.append(q)
+    for low, high in edges:
+        q = select(Log.classroom_id, Log.student_roll, func.max(Log.student_name).label("student_name"),
+                   func.sum(case((Log.status.in_(ATTENDED), 1), else_=0)).label("attended"), func.count().label("total")
+        ).where(Log.date.between(low, high)).group_by(Log.classroom_id, Log.student_roll)
+        if classroom_id: q = q.where(Log.classroom_id == classroom_id)
+        if student_roll: q = q.where(Log.student_roll == student_roll)
+        parts.append(q)
+    archived = archived_totals(db, edges, classroom_id, student_roll)
+    if archived is not None: parts.append(archived)
+    rows = union_all(*parts).subquery() if len(parts) > 1 else parts[0].subquery()
+    return select(
+        rows.c.classroom_id, rows.c.student_roll, func.max(rows.c.student_name).label("student_name"),
+        func.sum(rows.c.attended).label("attended"), func.sum(rows.c.total).label("total"),
+    ).group_by(rows.c.classroom_id, rows.c.student_roll).subquery()
+
+def percentage(attended, total):
+    return func.round(100.0 * attended / total, 2)
+
+def students(db: Session, start: date = None, end: date = None, classroom_id: str = None, student_roll: str = None) -> list:
+    totals = student_totals(db, start, end, classroom_id, student_roll)
+    q = select(totals, percentage(totals.c.attended, totals.c.total).label("percentage")).where(totals.c.total > 0) \
+        .order_by(totals.c.classroom_id, totals.c.student_roll)
+    return [dict(r) for r in db.execute(q).mappings()]
+
+def classrooms(db: Session, start: date = None, end: date = None, threshold: float = DEFAULTER_THRESHOLD) -> list:
+    totals = student_totals(db, start, end)
+    attended, total = func.sum(totals.c.attended), func.sum(totals.c.total)
+    q = select(
+        totals.c.classroom_id, func.count().label("students"), attended.label("attended"), total.label("total"),
+        percentage(attended, total).label("percentage"),
+        func.sum(case((100.0 * totals.c.attended < threshold * totals.c.total, 1), else_=0)).label("defaulters"),
+    ).where(totals.c.total > 0).group_by(totals.c.classroom_id).order_by(totals.c.classroom_id)
+    return [dict(r) for r in db.execute(q).mappings()]
+
+def defaulters(db: Session, start: date = None, end: date = None, classroom_id: str = None, threshold: float = DEFAULTER_THRESHOLD) -> list:
+    """Students below `threshold` percent attendance, lowest first."""
+    totals = student_totals(db, start, end, classroom_id)
+    pct = percentage(totals.c.attended, totals.c.total)
+    q = select(totals, pct.label("percentage")).where(totals.c.total > 0, 100.0 * totals.c.attended < threshold * totals.c.total) \
+        .order_by(pct, totals.c.classroom_id, totals.c.student_roll)
+    return [dict(r) for r in db.execute(q).mappings()]
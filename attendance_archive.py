@@ -0,0 +1,197 @@
+"""
+Cold storage for attendance_log_v1. Closed months move out of SQLite into one compressed NumPy file per
+classroom and month (ARCHIVE_DIR/<classroom>/<YYYY-MM>.npz) with dictionary-encoded text columns, and the
+attendance_archive table catalogs them. The monthly rollups stay in SQLite; get_attendance and the analytics
+read archived days from the files, and a write to an archived month restores its partition first.
+
+    python attendance_archive.py                      # archive the months before the last HOT_MONTHS
+    python attendance_archive.py --before 2025-06-01  # archive the months before a date
+    python attendance_archive.py --vacuum             # archive, then VACUUM to hand the space back to the OS
+    python attendance_archive.py --status             # partitions, rows and bytes on disk
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from urllib.parse import quote
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+import models
+
+ARCHIVE_DIR = os.environ.get("SMARTFLEX_ATTENDANCE_ARCHIVE_DIR", "./attendance_archive")
+HOT_MONTHS = int(os.environ.get("SMARTFLEX_ATTENDANCE_HOT_MONTHS", "2"))  # the current month and the one before stay in SQLite
+CACHE_PARTITIONS = int(os.environ.get("SMARTFLEX_ATTENDANCE_ARCHIVE_CACHE", "1024"))  # loaded classroom-months; a few KB each
+PAIR_BATCH = 400
+
+Log, Partition = models.AttendanceRecord, models.AttendanceArchivePartition
+COLUMNS = ("classroom_id", "date", "student_roll", "student_name", "status", "remarks", "id")  # the get_attendance row
+
+def next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def hot_cutoff(today: date = None, hot_months: int = HOT_MONTHS) -> date:
+    """First day of the oldest month that stays in SQLite."""
+    first = (today or date.today()).replace(day=1)
+    for _ in range(hot_months - 1): first = (first - timedelta(days=1)).replace(day=1)
+    return first
+
+def partition_path(classroom_id: str, month: date) -> str:
+    return os.path.join(quote(classroom_id, safe="").replace(".", "%2E"), f"{month:%Y-%m}.npz")
+
+# --- FILE FORMAT ---
+def dictionary(values: list) -> tuple:
+    uniques, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return uniques, codes.astype(np.uint16 if len(uniques) <= 65535 else np.uint32)
+
+def write_partition(path: str, rows: list):
+    """rows: (date, student_roll, student_name, status, remarks, id) tuples of one classroom and month."""
+    rows = sorted(rows, key=lambda r: (r[0], r[1]))
+    days, rolls, names, statuses, remarks, ids = zip(*rows)
+    rolls, roll_codes = dictionary(rolls)
+    names, name_codes = dictionary(names)
+    statuses, status_codes = dictionary(statuses)
+    remark_rows = np.array([i for i, r in enumerate(remarks) if r is not None], dtype=np.int32)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        np.savez_compressed(
+            f, id=np.array(ids, dtype=np.int64), day=np.array([d.day for d in days], dtype=np.uint8),
+            rolls=rolls, roll_codes=roll_codes, names=names, name_codes=name_codes, statuses=statuses, status_codes=status_codes,
+            remark_rows=remark_rows, remarks=np.array([remarks[i] for i in remark_rows], dtype=str),
+        )
+    os.replace(path + ".tmp", path)
+
+class ArchivedMonth:
+    """One classroom-month loaded from its file, columns kept encoded."""
+    def __init__(self, classroom_id: str, month: date, arrays):
+        self.classroom_id, self.month = classroom_id, month
+        for name in arrays.files: setattr(self, name, arrays[name])
+        self.remark_at = dict(zip(self.remark_rows.tolist(), self.remarks.tolist()))
+
+    def rows(self, positions=None) -> list:
+        """COLUMNS dicts for `positions` (default all), in id order."""
+        positions = np.arange(len(self.id)) if positions is None else positions
+        positions = positions[np.argsort(self.id[positions], kind="stable")]
+        days, rolls = self.day[positions].tolist(), self.rolls[self.roll_codes[positions]].tolist()
+        names, statuses = self.names[self.name_codes[positions]].tolist(), self.statuses[self.status_codes[positions]].tolist()
+        return [
+            {"classroom_id": self.classroom_id, "date": self.month.replace(day=d), "student_roll": roll, "student_name": name,
+             "status": status, "remarks": self.remark_at.get(p), "id": entry_id}
+            for p, d, roll, name, status, entry_id in zip(positions.tolist(), days, rolls, names, statuses, self.id[positions].tolist())
+        ]
+
+    def day_rows(self, day: date) -> list:
+        return self.rows(np.flatnonzero(self.day == day.day))
+
+    def student_totals(self, low: date, high: date, attended: tuple, student_roll: str = None) -> list:
+        """(classroom_id, student_roll, student_name, attended, total) per student over [low, high] ∩ this month."""
+        low_day = low.day if low >= self.month else 1
+        high_day = high.day if high < next_month(self.month) else 31
+        mask = (self.day >= low_day) & (self.day <= high_day)
+        if student_roll is not None: mask &= self.rolls[self.roll_codes] == student_roll
+        codes = self.roll_codes[mask]
+        totals = np.bincount(codes, minlength=len(self.rolls))
+        present = np.bincount(codes, weights=np.isin(self.statuses, attended)[self.status_codes[mask]], minlength=len(self.rolls))
+        last_name = np.zeros(len(self.rolls), dtype=np.int64)
+        last_name[codes] = self.name_codes[mask]
+        seen = np.flatnonzero(totals)
+        return list(zip([self.classroom_id] * len(seen), self.rolls[seen].tolist(), self.names[last_name[seen]].tolist(),
+                        present[seen].astype(np.int64).tolist(), totals[seen].tolist()))
+
+_cache, _cache_lock = OrderedDict(), threading.Lock()
+
+def load(partition: Partition) -> ArchivedMonth:
+    """The partition's file, from an LRU of CACHE_PARTITIONS loaded files keyed on path and mtime."""
+    path = os.path.join(ARCHIVE_DIR, partition.path)
+    key = (path, os.stat(path).st_mtime_ns)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    with np.load(path) as arrays: month = ArchivedMonth(partition.classroom_id, partition.month, arrays)
+    with _cache_lock:
+        _cache[key] = month
+        while len(_cache) > CACHE_PARTITIONS: _cache.popitem(last=False)
+    return month
+
+# --- READS ---
+def read_day(db: Session, classroom_id: str, day: date):
+    """The day's rows when its month is archived, else None (read the log)."""
+    partition = db.get(Partition, (classroom_id, day.replace(day=1)))
+    return None if partition is None else load(partition).day_rows(day)
+
+def student_totals(db: Session, low: date, high: date, attended: tuple, classroom_id: str = None, student_roll: str = None) -> list:
+    """Per-student (classroom_id, student_roll, student_name, attended, total) rows of the archived days in [low, high]."""
+    q = select(Partition).where(Partition.month.between(low.replace(day=1), high))
+    if classroom_id: q = q.where(Partition.classroom_id == classroom_id)
+    return [row for partition in db.execute(q).scalars() for row in load(partition).student_totals(low, high, attended, student_roll)]
+
+# --- ARCHIVE / RESTORE ---
+def archive(db: Session, before: date = None) -> list:
+    """
+    Moves every classroom-month of the log that ends before `before` (default hot_cutoff()) into its file, one
+    commit per partition; the file is written first, so a failed commit leaves the rows in the log. Returns
+    a summary per partition.
+    """
+    before = (before or hot_cutoff()).replace(day=1)
+    month_of = func.date(Log.date, "start of month")
+    done = []
+    for classroom_id, month in db.execute(select(Log.classroom_id, month_of).where(Log.date < before).group_by(Log.classroom_id, month_of)).all():
+        month = date.fromisoformat(month)
+        in_month = (Log.classroom_id == classroom_id, Log.date >= month, Log.date < next_month(month))
+        rows = {(r[0], r[1]): r for r in db.execute(select(Log.date, Log.student_roll, Log.student_name, Log.status, Log.remarks, Log.id).where(*in_month))}
+        partition = db.get(Partition, (classroom_id, month))
+        if partition is not None:  # rows written straight to the log for an archived month; they win
+            for r in load(partition).rows(): rows.setdefault((r["date"], r["student_roll"]), tuple(r[c] for c in COLUMNS[1:]))
+        relative = partition_path(classroom_id, month)
+        write_partition(os.path.join(ARCHIVE_DIR, relative), list(rows.values()))
+        size = os.path.getsize(os.path.join(ARCHIVE_DIR, relative))
+        try:
+            db.execute(delete(Log).where(*in_month))
+            db.merge(Partition(classroom_id=classroom_id, month=month, path=relative, rows=len(rows), size_bytes=size))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        done.append({"classroom_id": classroom_id, "month": month, "rows": len(rows), "size_bytes": size})
+    return done
+
+def restore(db: Session, pairs) -> list:
+    """
+    Moves the archived partitions among `pairs` ((classroom_id, month) with month the first day) back into the
+    log inside the caller's transaction. Returns their files: pass them to remove_files() after the commit.
+    """
+    pairs, paths = list(pairs), []
+    for i in range(0, len(pairs), PAIR_BATCH):
+        for partition in db.execute(select(Partition).where(tuple_(Partition.classroom_id, Partition.month).in_(pairs[i:i + PAIR_BATCH]))).scalars().all():
+            db.execute(insert(Log.__table__), load(partition).rows())
+            paths.append(os.path.join(ARCHIVE_DIR, partition.path))
+            db.delete(partition)
+    return paths
+
+def remove_files(paths: list):
+    for path in paths:
+        try: os.remove(path)
+        except FileNotFoundError: pass
+
+def status(db: Session) -> dict:
+    partitions, rows, size = db.execute(select(func.count(), func.coalesce(func.sum(Partition.rows), 0), func.coalesce(func.sum(Partition.size_bytes), 0))).one()
+    return {"partitions": partitions, "rows": rows, "size_bytes": size, "log_rows": db.execute(select(func.count()).select_from(Log)).scalar()}
+
+if __name__ == "__main__":
+    from database import SessionLocal, engine
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if "--status" not in sys.argv:
+            before = date.fromisoformat(sys.argv[sys.argv.index("--before") + 1]) if "--before" in sys.argv else None
+            done = archive(db, before)
+            print(f"archived {sum(p['rows'] for p in done)} rows into {len(done)} partitions")
+        if "--vacuum" in sys.argv:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn: conn.exec_driver_sql("VACUUM")
+        print(status(db))
+    finally:
+        db.close()
@@ -0,0 +1,77 @@
+import time
+
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import attendance_analytics
+import attendance_archive
+import ingest
+import models
+
+DAY_BATCH = 400  # (classroom_id, date) pairs per lookup, two bound parameters each
+ID_BATCH = 900
+
+Log = models.AttendanceRecord
+
+def save_records(db: Session, rows: list, replace_days=True) -> dict:
+    """
+    Upserts attendance `rows` (dicts with the AttendanceCreate fields) keyed on (classroom_id, date, student_roll),
+    grouped by (classroom_id, date); the last row wins for a repeated key. `replace_days` (True, or a set of
+    (classroom_id, date) pairs) marks days whose rows are the whole register: their students missing from `rows`
+    are removed. Archived months among the days are restored to the log first. Moves the monthly rollups by the
+    difference and commits once. Returns the row, day and removed counts.
+    """
+    latest = {(r["classroom_id"], r["date"], r["student_roll"]): r for r in rows}
+    days = list({(classroom_id, day) for classroom_id, day, _ in latest})
+    archived = attendance_archive.restore(db, {(classroom_id, day.replace(day=1)) for classroom_id, day in days})
+    existing = []
+    for i in range(0, len(days), DAY_BATCH):
+        existing += db.execute(select(Log.id, Log.classroom_id, Log.student_roll, Log.student_name, Log.date, Log.status)
+            .where(tuple_(Log.classroom_id, Log.date).in_(days[i:i + DAY_BATCH]))).all()
+    replaced = [row for row in existing if (row.classroom_id, row.date, row.student_roll) in latest]
+    replace = set(days) if replace_days is True else set(replace_days or ())
+    removed = [row for row in existing if (row.classroom_id, row.date) in replace and (row.classroom_id, row.date, row.student_roll) not in latest]
+
+    deltas, names = {}, {}
+    attendance_analytics.count_rows((row[1:] for row in replaced + removed), -1, deltas, names)
+    attendance_analytics.count_rows(((r["classroom_id"], r["student_roll"], r["student_name"], r["date"], r["status"]) for r in latest.values()), 1, deltas, names)
+    try:
+        ids = [row.id for row in removed]
+        for i in range(0, len(ids), ID_BATCH): db.execute(delete(Log).where(Log.id.in_(ids[i:i + ID_BATCH])))
+        if latest:
+            upsert = sqlite_insert(Log.__table__)  # Core insert: no per-row ORM bookkeeping
+            db.execute(upsert.on_conflict_do_update(index_elements=["classroom_id", "date", "student_roll"], set_={
+                "student_name": upsert.excluded.student_name, "status": upsert.excluded.status, "remarks": upsert.excluded.remarks,
+            }), [{"remarks": None, **r} for r in latest.values()])
+        attendance_analytics.apply_deltas(db, deltas, names)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    attendance_archive.remove_files(archived)
+    return {"rows": len(latest), "days": len(days), "removed": len(removed)}
+
+def import_csv(db: Session, file_obj, replace_days: bool = False) -> dict:
+    """
+    Streams a historical attendance CSV into the log one chunk (ingest.CSV_CHUNK_ROWS rows) per transaction,
+    so other writers are not held off for the whole file. Invalid rows are skipped and reported. With
+    `replace_days` a day's register is replaced when the file first reaches it, so a day may span chunks.
+    """
+    start = time.perf_counter()
+    rows_read = imported = removed = 0
+    seen, errors = set(), []
+    for rows, chunk_errors, chunk_rows in ingest.iter_attendance_csv(file_obj):
+        rows_read += chunk_rows
+        errors = (errors + chunk_errors)[:ingest.MAX_ROW_ERRORS]
+        if not rows: continue
+        chunk_days = {(r["classroom_id"], r["date"]) for r in rows}
+        saved = save_records(db, rows, replace_days=chunk_days - seen if replace_days else False)
+        imported, removed = imported + len(rows), removed + saved["removed"]
+        seen |= chunk_days
+    seconds = time.perf_counter() - start
+    return {
+        "rowsRead": rows_read, "rowsImported": imported, "rowsRemoved": removed, "days": len(seen),
+        "errors": errors, "errorCount": rows_read - imported, "seconds": round(seconds, 3),
+        "rowsPerSecond": round(imported / seconds) if seconds else None,
+    }
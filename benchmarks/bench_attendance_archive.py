@@ -0,0 +1,120 @@
+"""
+Attendance log row store (SQLite) vs the columnar archive (attendance_archive npz partitions):
+- on-disk size: the DB file before and after archive + VACUUM, and the archive directory
+- scan: per-student totals over the whole archived range, SQLite GROUP BY vs numpy over the partitions (cold and warm)
+- day read: GET /api/attendance/{classroom}/{date} for a hot day and an archived one
+Run from the project root: python -m benchmarks.bench_attendance_archive
+"""
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+import httpx
+from sqlalchemy import func, select
+
+N_CLASSROOMS, N_STUDENTS, N_DAYS = 60, 60, 160
+FIRST_DAY, ARCHIVE_BEFORE = date(2025, 1, 6), date(2025, 7, 1)
+REPEATS = 5
+
+TMP = tempfile.mkdtemp(prefix="smartflex-bench-")
+os.environ["SMARTFLEX_DATABASE_URL"] = f"sqlite:///{TMP}/bench.db"
+os.environ["SMARTFLEX_ATTENDANCE_ARCHIVE_DIR"] = f"{TMP}/archive"
+import attendance_analytics  # noqa: E402
+import attendance_archive  # noqa: E402  (reads SMARTFLEX_ATTENDANCE_ARCHIVE_DIR)
+import database  # noqa: E402  (reads SMARTFLEX_DATABASE_URL)
+import main  # noqa: E402
+import models  # noqa: E402
+from benchmarks.bench_attendance_import import school_days  # noqa: E402
+
+DB_PATH = f"{TMP}/bench.db"
+
+def seed() -> int:
+    rng, rows = random.Random(0), 0
+    with database.engine.begin() as conn:
+        for day in school_days(N_DAYS, FIRST_DAY):
+            batch = [{"classroom_id": f"C{c}", "date": day, "student_roll": f"C{c}-{s:03d}", "student_name": f"Student {s}",
+                      "status": "P" if rng.random() < 0.85 else rng.choice("AL"), "remarks": "medical" if rng.random() < 0.02 else None}
+                     for c in range(N_CLASSROOMS) for s in range(N_STUDENTS)]
+            conn.execute(models.AttendanceRecord.__table__.insert(), batch)
+            rows += len(batch)
+    raw = database.engine.raw_connection()
+    attendance_analytics.rebuild(raw.driver_connection)
+    raw.commit()
+    raw.close()
+    return rows
+
+def vacuum():
+    with database.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn: conn.exec_driver_sql("VACUUM")
+
+def mib(size: int) -> str:
+    return f"{size / 1048576:>8.1f} MiB"
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+def median_ms(fn) -> float:
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def scan_sqlite(db) -> list:
+    Log = models.AttendanceRecord
+    return db.execute(select(Log.classroom_id, Log.student_roll, func.max(Log.student_name),
+                             func.sum(Log.status.in_(attendance_analytics.ATTENDED)), func.count())
+                      .where(Log.date < ARCHIVE_BEFORE).group_by(Log.classroom_id, Log.student_roll)).all()
+
+def scan_archive(db) -> list:
+    return attendance_archive.student_totals(db, FIRST_DAY, ARCHIVE_BEFORE - timedelta(days=1), attendance_analytics.ATTENDED)
+
+async def day_read(day: date) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as http:
+        samples = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            (await http.get(f"/api/attendance/C7/{day}")).raise_for_status()
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples) * 1000
+
+if __name__ == "__main__":
+    models.Base.metadata.create_all(bind=database.engine)
+    rows = seed()
+    vacuum()
+    before_size = os.path.getsize(DB_PATH)
+    db = database.SessionLocal()
+    sqlite_ms = median_ms(lambda: scan_sqlite(db))
+    cold_day = asyncio.run(day_read(date(2025, 3, 3)))
+
+    start = time.perf_counter()
+    done = attendance_archive.archive(db, ARCHIVE_BEFORE)
+    archive_s = time.perf_counter() - start
+    vacuum()
+    archived = sum(p["rows"] for p in done)
+    print(f"{rows} rows, {archived} archived into {len(done)} partitions in {archive_s:.1f}s ({archived / archive_s:,.0f} rows/s)")
+    print(f"{'DB before archive':<28} {mib(before_size)}")
+    print(f"{'DB after archive + VACUUM':<28} {mib(os.path.getsize(DB_PATH))}")
+    freed, archive_size = before_size - os.path.getsize(DB_PATH), directory_size(attendance_archive.ARCHIVE_DIR)
+    print(f"{'archive directory':<28} {mib(archive_size)}  ({freed / archive_size:.0f}x smaller than the space freed)")
+
+    attendance_archive._cache.clear()
+    start = time.perf_counter()
+    scan_archive(db)
+    cold_ms = (time.perf_counter() - start) * 1000
+    warm_ms = median_ms(lambda: scan_archive(db))
+    print(f"\nper-student totals over {archived} rows (median of {REPEATS})")
+    print(f"{'SQLite GROUP BY':<28} {sqlite_ms:>8.1f} ms")
+    print(f"{'archive, cold files':<28} {cold_ms:>8.1f} ms")
+    print(f"{'archive, cached':<28} {warm_ms:>8.1f} ms")
+
+    print(f"\nGET one classroom-day ({N_STUDENTS} rows)")
+    print(f"{'SQLite (before archive)':<28} {cold_day:>8.1f} ms")
+    print(f"{'hot day (SQLite)':<28} {asyncio.run(day_read(date(2025, 7, 1))):>8.1f} ms")
+    attendance_archive._cache.clear()
+    print(f"{'archived day':<28} {asyncio.run(day_read(date(2025, 3, 3))):>8.1f} ms")
+    db.close()
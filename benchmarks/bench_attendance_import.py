@@ -0,0 +1,81 @@
+"""
+Attendance write throughput in rows/sec:
+- legacy: one POST per classroom and day, ORM objects inserted one by one (the old save_attendance)
+- bulk: the same days as one multi-day POST /api/attendance payload
+- import: a semester CSV through POST /api/attendance/import
+Run from the project root: python -m benchmarks.bench_attendance_import
+"""
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+
+N_CLASSROOMS, N_STUDENTS, N_DAYS, SAMPLE_DAYS = 100, 60, 90, 5
+FIRST_DAY = date(2025, 1, 6)
+
+TMP = tempfile.mkdtemp(prefix="smartflex-bench-")
+os.environ["SMARTFLEX_DATABASE_URL"] = f"sqlite:///{TMP}/bench.db"
+import database  # noqa: E402  (reads SMARTFLEX_DATABASE_URL)
+import main  # noqa: E402
+import models  # noqa: E402
+import schemas  # noqa: E402
+
+def school_days(n: int, first: date = FIRST_DAY) -> list:
+    days, day = [], first
+    while len(days) < n:
+        if day.weekday() < 5: days.append(day)
+        day += timedelta(days=1)
+    return days
+
+def register(classroom: str, day: date, rng: random.Random) -> list:
+    return [{"classroom_id": classroom, "date": day.isoformat(), "student_roll": f"{classroom}-{s:03d}", "student_name": f"Student {s}",
+             "status": "P" if rng.random() < 0.85 else "A"} for s in range(N_STUDENTS)]
+
+def legacy_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/attendance")
+    def save_attendance(payload: schemas.BulkAttendancePayload, db: Session = Depends(database.get_db)):
+        first = payload.records[0]
+        db.query(models.AttendanceRecord).filter(models.AttendanceRecord.classroom_id == first.classroom_id, models.AttendanceRecord.date == first.date).delete()
+        db.add_all([models.AttendanceRecord(**r.model_dump()) for r in payload.records])
+        db.commit()
+        return {"message": "Attendance saved successfully"}
+    return app
+
+def rate(rows: int, seconds: float) -> str:
+    return f"{rows:>8} rows {seconds:>7.2f}s {rows / seconds:>10,.0f} rows/s"
+
+async def run():
+    rng = random.Random(0)
+    sample = [(f"L{c}", day) for c in range(N_CLASSROOMS) for day in school_days(SAMPLE_DAYS)]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=legacy_app()), base_url="http://bench") as legacy, \
+               httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench", timeout=None) as current:
+        start = time.perf_counter()
+        for classroom, day in sample: (await legacy.post("/api/attendance", json={"records": register(classroom, day, rng)})).raise_for_status()
+        print(f"{'legacy, one POST per day':<30} {rate(len(sample) * N_STUDENTS, time.perf_counter() - start)}")
+
+        records = [r for classroom, day in sample for r in register(classroom.replace("L", "B"), day, rng)]
+        start = time.perf_counter()
+        (await current.post("/api/attendance", json={"records": records})).raise_for_status()
+        print(f"{'bulk, one multi-day POST':<30} {rate(len(records), time.perf_counter() - start)}")
+
+        lines = ["classroom_id,date,student_roll,student_name,status,remarks"]
+        lines += [f"{r['classroom_id']},{r['date']},{r['student_roll']},{r['student_name']},{r['status']}," for day in school_days(N_DAYS)
+                  for c in range(N_CLASSROOMS) for r in register(f"C{c}", day, rng)]
+        body = ("\n".join(lines) + "\n").encode()
+        start = time.perf_counter()
+        response = await current.post("/api/attendance/import", files={"file": ("semester.csv", body)})
+        response.raise_for_status()
+        report = response.json()
+        print(f"{'CSV import (end to end)':<30} {rate(report['rowsImported'], time.perf_counter() - start)}  ({len(body) / 1048576:.0f} MB)")
+        print(f"{'CSV import (reported)':<30} {rate(report['rowsImported'], report['seconds'])}")
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,78 @@
+"""
+Community feed response time as posts accumulate:
+- legacy: every post, newest first, on each load (the old get_community_posts; ORM rows through response_model)
+- current: first page, a deep page by cursor, one tag, and a search, through main.app
+Run from the project root: python -m benchmarks.bench_community_feed
+"""
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+
+SIZES = (1000, 10000, 100000)
+REPEATS = 5
+WORDS = "exam lab schedule holiday seminar fees library hostel sports results workshop placement notice canteen".split()
+
+TMP = tempfile.mkdtemp(prefix="smartflex-bench-")
+os.environ["SMARTFLEX_DATABASE_URL"] = f"sqlite:///{TMP}/bench.db"
+import database  # noqa: E402  (reads SMARTFLEX_DATABASE_URL)
+import main  # noqa: E402
+import models  # noqa: E402
+import schemas  # noqa: E402
+
+def seed(start: int, end: int, rng: random.Random):
+    now = datetime(2025, 1, 6, 9, 30)
+    with database.engine.begin() as conn:
+        conn.execute(models.CommunityPost.__table__.insert(), [
+            {"title": " ".join(rng.sample(WORDS, 3) + (["scholarship"] if rng.random() < 0.01 else [])).capitalize(), "content": " ".join(rng.choices(WORDS, k=40)), "author": f"Prof {i % 40}",
+             "role": rng.choice(["Faculty", "Administrator"]), "tag": rng.choice(["Notice", "Event", "General"]), "attachment_url": None,
+             "created_at": now + timedelta(minutes=i)} for i in range(start, end)])
+
+def legacy_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/community/posts", response_model=List[schemas.PostResponse])
+    def get_community_posts(db: Session = Depends(database.get_db)):
+        return db.query(models.CommunityPost).order_by(models.CommunityPost.created_at.desc()).all()
+    return app
+
+async def timed(http: httpx.AsyncClient, url: str, params: dict = None) -> float:
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        (await http.get(url, params=params)).raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+async def deep_cursor(http: httpx.AsyncClient, pages: int) -> str:
+    cursor = None
+    for _ in range(pages):
+        cursor = (await http.get("/api/community/posts", params={"limit": 100, **({"cursor": cursor} if cursor else {})})).headers["x-next-cursor"]
+    return cursor
+
+async def run():
+    rng, seeded = random.Random(0), 0
+    print(f"{'posts':>7} {'legacy all':>11} {'page 1':>8} {'deep page':>10} {'tag page':>9} {'search 1%':>10} {'search 95%':>11}   (ms, median of {REPEATS}; deep = up to 5000 posts in)")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=legacy_app()), base_url="http://bench", timeout=None) as legacy, \
+               httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as current:
+        for size in SIZES:
+            seed(seeded, size, rng)
+            seeded = size
+            cursor = await deep_cursor(current, min(size // 200, 50))
+            print(f"{size:>7} {await timed(legacy, '/api/community/posts'):>11.1f} {await timed(current, '/api/community/posts'):>8.1f}"
+                  f" {await timed(current, '/api/community/posts', {'cursor': cursor}):>10.1f}"
+                  f" {await timed(current, '/api/community/posts', {'tag': 'Event'}):>9.1f}"
+                  f" {await timed(current, '/api/community/posts', {'q': 'scholarship'}):>10.1f}"
+                  f" {await timed(current, '/api/community/posts', {'q': 'placement'}):>11.1f}")
+
+if __name__ == "__main__":
+    models.Base.metadata.create_all(bind=database.engine)
+    asyncio.run(run())
@@ -0,0 +1,114 @@
+"""
+Attendance read/write throughput under concurrent clients, and the latency of a page that does not touch
+the database (/api/dashboard) while that load runs, before and after the database access policy:
+- legacy: `async def` handlers calling SQLAlchemy on the event loop, default rollback journal
+- current: main.app (sync handlers on the thread pool, WAL + pragmas from database.py)
+Run from the project root: python -m benchmarks.bench_db_concurrency
+"""
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+N_CLASSROOMS, N_DAYS, N_STUDENTS = 40, 30, 60
+CLIENTS, REQUESTS_PER_CLIENT, WRITE_SHARE = 32, 40, 0.1
+FIRST_DAY = date(2025, 1, 6)
+
+TMP = tempfile.mkdtemp(prefix="smartflex-bench-")
+os.environ["SMARTFLEX_DATABASE_URL"] = f"sqlite:///{TMP}/current.db"
+import database  # noqa: E402  (reads SMARTFLEX_DATABASE_URL)
+import main  # noqa: E402
+import models  # noqa: E402
+import schemas  # noqa: E402
+
+def records(classroom: str, day: date) -> list:
+    return [{"classroom_id": classroom, "date": day, "student_roll": f"R{s}", "student_name": f"Student {s}", "status": "Present"} for s in range(N_STUDENTS)]
+
+def seed(bind):
+    models.Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        conn.execute(models.AttendanceRecord.__table__.insert(), [
+            r for c in range(N_CLASSROOMS) for d in range(N_DAYS) for r in records(f"C{c}", FIRST_DAY + timedelta(days=d))
+        ])
+
+def legacy_app() -> FastAPI:
+    # The old engine kept the default 5+10 connection pool, which deadlocks at this concurrency: a checkout
+    # blocks the event loop that would return the connections. Size it so the old policy can be measured.
+    bind = create_engine(f"sqlite:///{TMP}/legacy.db", connect_args={"check_same_thread": False}, pool_size=CLIENTS, max_overflow=0)
+    seed(bind)
+    LegacySession = sessionmaker(autocommit=False, autoflush=False, bind=bind)
+    def get_db():
+        db = LegacySession()
+        try: yield db
+        finally: db.close()
+    app = FastAPI()
+
+    @app.get("/api/attendance/{classroom_id}/{date_str}")
+    async def get_attendance(classroom_id: str, date_str: str, db: Session = Depends(get_db)):
+        target = date.fromisoformat(date_str)
+        rows = db.query(models.AttendanceRecord).filter(models.AttendanceRecord.classroom_id == classroom_id, models.AttendanceRecord.date == target).all()
+        return [schemas.AttendanceResponse.model_validate(r, from_attributes=True) for r in rows]
+
+    @app.post("/api/attendance")
+    async def save_attendance(payload: schemas.BulkAttendancePayload, db: Session = Depends(get_db)):
+        first = payload.records[0]
+        db.query(models.AttendanceRecord).filter(models.AttendanceRecord.classroom_id == first.classroom_id, models.AttendanceRecord.date == first.date).delete()
+        db.add_all([models.AttendanceRecord(**r.model_dump()) for r in payload.records])
+        db.commit()
+        return {"message": "Attendance saved successfully"}
+
+    @app.get("/api/dashboard")
+    async def get_dashboard_data(): return {"teacherName": "dr. devkar sharma"}
+    return app
+
+async def client(http: httpx.AsyncClient, rng: random.Random, latencies: list):
+    for _ in range(REQUESTS_PER_CLIENT):
+        classroom, day = f"C{rng.randrange(N_CLASSROOMS)}", FIRST_DAY + timedelta(days=rng.randrange(N_DAYS))
+        start = time.perf_counter()
+        if rng.random() < WRITE_SHARE:
+            body = [{**r, "date": r["date"].isoformat()} for r in records(classroom, day)]
+            response = await http.post("/api/attendance", json={"records": body})
+        else:
+            response = await http.get(f"/api/attendance/{classroom}/{day.isoformat()}")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+async def probe(http: httpx.AsyncClient, done: asyncio.Event, latencies: list):
+    """A page load every 10 ms; latency counts from when it was due, so event loop stalls show up."""
+    due = time.perf_counter()
+    while not done.is_set():
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        (await http.get("/api/dashboard")).raise_for_status()
+        latencies.append(time.perf_counter() - due)
+        due = time.perf_counter() + 0.01
+
+def p95(latencies: list) -> float:
+    return statistics.quantiles(latencies, n=20)[-1] * 1000
+
+async def measure(app) -> tuple:
+    latencies, probe_latencies, done = [], [], asyncio.Event()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        if app is main.app: database.configure_thread_pool()
+        prober = asyncio.create_task(probe(http, done, probe_latencies))
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http, random.Random(i), latencies) for i in range(CLIENTS)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+    return len(latencies) / elapsed, p95(latencies), p95(probe_latencies), len(probe_latencies)
+
+if __name__ == "__main__":
+    seed(database.engine)
+    print(f"{CLIENTS} clients x {REQUESTS_PER_CLIENT} requests, {WRITE_SHARE:.0%} writes, {N_CLASSROOMS * N_DAYS * N_STUDENTS} attendance rows")
+    print(f"{'variant':<10} {'req/s':>8} {'p95 ms':>8} {'dashboard p95 ms':>17} {'dashboard hits':>15}")
+    for label, app in (("legacy", legacy_app()), ("current", main.app)):
+        throughput, db_p95, probe_p95, probes = asyncio.run(measure(app))
+        print(f"{label:<10} {throughput:>8.1f} {db_p95:>8.1f} {probe_p95:>17.1f} {probes:>15}")
@@ -0,0 +1,98 @@
+"""
+Response time of the heaviest list endpoints before and after fast_json:
+- legacy: ORM objects / SeatAssignment models validated against response_model and encoded by FastAPI
+- current: main.app (dict rows from column selects or the solver, encoded by fast_json)
+Run from the project root: python -m benchmarks.bench_json
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+
+N_POSTS, N_COMPLAINTS, N_ATTENDANCE, N_STUDENTS = 5000, 5000, 3000, 10000
+REPEATS = 5
+
+TMP = tempfile.mkdtemp(prefix="smartflex-bench-")
+os.environ["SMARTFLEX_DATABASE_URL"] = f"sqlite:///{TMP}/bench.db"
+import database  # noqa: E402  (reads SMARTFLEX_DATABASE_URL)
+import fast_json  # noqa: E402
+import main  # noqa: E402
+import models  # noqa: E402
+import schemas  # noqa: E402
+import seating  # noqa: E402
+from benchmarks.bench_seating import make_exam  # noqa: E402
+
+def seed():
+    now = datetime(2025, 1, 6, 9, 30)
+    with database.engine.begin() as conn:
+        conn.execute(models.CommunityPost.__table__.insert(), [
+            {"title": f"Post {i}", "content": "Lab timings change next week. " * 8, "author": f"Prof {i % 40}", "role": "Faculty",
+             "tag": "Notice", "attachment_url": None, "created_at": now - timedelta(minutes=i)} for i in range(N_POSTS)])
+        conn.execute(models.Complaint.__table__.insert(), [
+            {"name": f"Student {i}", "email": f"s{i}@example.edu", "subject": "Projector", "message": "The projector in room 204 flickers. " * 4,
+             "status": "Pending", "created_at": now - timedelta(minutes=i)} for i in range(N_COMPLAINTS)])
+        conn.execute(models.AttendanceRecord.__table__.insert(), [
+            {"classroom_id": "HALL", "date": date(2025, 1, 6), "student_roll": f"R{i}", "student_name": f"Student {i}", "status": "Present", "remarks": None}
+            for i in range(N_ATTENDANCE)])
+
+def legacy_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/community/posts", response_model=List[schemas.PostResponse])
+    def get_community_posts(db: Session = Depends(database.get_db)):
+        return db.query(models.CommunityPost).order_by(models.CommunityPost.created_at.desc()).all()
+
+    @app.get("/api/complaints", response_model=List[schemas.ComplaintResponse])
+    def get_all_complaints(db: Session = Depends(database.get_db)):
+        return db.query(models.Complaint).order_by(models.Complaint.created_at.desc()).all()
+
+    @app.get("/api/attendance/{classroom_id}/{date_str}", response_model=List[schemas.AttendanceResponse])
+    def get_attendance(classroom_id: str, date_str: str, db: Session = Depends(database.get_db)):
+        target = date.fromisoformat(date_str)
+        return db.query(models.AttendanceRecord).filter(models.AttendanceRecord.classroom_id == classroom_id, models.AttendanceRecord.date == target).all()
+
+    @app.post("/api/generate_exam_seating", response_model=schemas.ExamSeatingResponse)
+    def generate_exam_seating(payload: schemas.ExamSeatingPayload):
+        assignments, unplaced, stats = seating.solve_seating(payload.students, payload.rooms, payload.engine, payload.timeLimit, payload.numWorkers, use_cache=payload.useCache)
+        assignments = [schemas.SeatAssignment(**a) for a in assignments]  # the old assign_students built models per seat
+        return schemas.ExamSeatingResponse(assignments=assignments, unplaced=unplaced, stats=stats)
+    return app
+
+async def timed(http: httpx.AsyncClient, method: str, url: str, **kwargs) -> tuple:
+    samples, size = [], 0
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        response = await http.request(method, url, **kwargs)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+        size = len(response.content)
+    return statistics.median(samples) * 1000, size
+
+async def compare(requests: list):
+    print(f"{'endpoint':<22} {'legacy ms':>10} {'current ms':>11} {'speedup':>8} {'KiB':>8}")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=legacy_app()), base_url="http://bench") as legacy, \
+               httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as current:
+        for label, method, url, kwargs in requests:
+            await current.request(method, url, **kwargs)  # warm the seating layout cache and SQLite page cache
+            before, size = await timed(legacy, method, url, **kwargs)
+            after, _ = await timed(current, method, url, **kwargs)
+            print(f"{label:<22} {before:>10.1f} {after:>11.1f} {before / after:>7.1f}x {size / 1024:>8.0f}")
+
+if __name__ == "__main__":
+    seed()
+    students, rooms = make_exam(-(-N_STUDENTS // 80), 8, 10, 4, fill=1.0)
+    exam = schemas.ExamSeatingPayload(students=students[:N_STUDENTS], rooms=rooms, engine="constructive").model_dump()
+    print(f"encoder: {'orjson' if fast_json.orjson else 'json (orjson not installed)'}, streaming above {fast_json.STREAM_ROWS} rows; median of {REPEATS}")
+    asyncio.run(compare([
+        (f"posts ({N_POSTS})", "GET", "/api/community/posts", {}),
+        (f"complaints ({N_COMPLAINTS})", "GET", "/api/complaints", {}),
+        (f"attendance ({N_ATTENDANCE})", "GET", "/api/attendance/HALL/2025-01-06", {}),
+        (f"exam seating ({N_STUDENTS})", "POST", "/api/generate_exam_seating", {"json": exam}),
+    ]))
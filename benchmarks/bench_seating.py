@@ -0,0 +1,32 @@
+"""
+Compares the monolithic seating model against the per-room one-hot model on synthetic exams.
+Run from the project root: python -m benchmarks.bench_seating
+"""
+import random
+import time
+
+import schemas
+import seating
+
+def make_exam(n_rooms, rows, cols, n_branches, fill=0.9, seed=0):
+    rng = random.Random(seed)
+    rooms = [schemas.RoomDimension(name=f"H{i}", rows=rows, cols=cols) for i in range(n_rooms)]
+    n_students = int(n_rooms * rows * cols * fill)
+    students = [schemas.StudentInput(name=f"S{i}", roll_no=str(i), branch=f"B{rng.randrange(n_branches)}") for i in range(n_students)]
+    return students, rooms
+
+def run(engine, students, rooms, time_limit):
+    start = time.perf_counter()
+    branch_counts, _ = seating.group_by_branch(students)
+    layouts, stats = seating.SEATING_ENGINES[engine](rooms, branch_counts, time_limit)
+    return time.perf_counter() - start, stats["status"], seating.layout_penalty(layouts)
+
+if __name__ == "__main__":
+    time_limit = 30.0
+    print(f"{'exam':<28} {'engine':<11} {'seconds':>8} {'status':>9} {'penalty':>8} {'h/v pairs':>10}")
+    for n_rooms, rows, cols, n_branches in [(2, 6, 6, 3), (4, 8, 8, 4), (10, 6, 10, 8)]:
+        students, rooms = make_exam(n_rooms, rows, cols, n_branches)
+        label = f"{n_rooms}x{rows}x{cols}, {len(students)} st, {n_branches} br"
+        for engine in ("monolithic", "per_room"):
+            seconds, status, score = run(engine, students, rooms, time_limit)
+            print(f"{label:<28} {engine:<11} {seconds:>8.2f} {status:>9} {score['penalty']:>8} {score['horizontal_pairs']:>4}/{score['vertical_pairs']:<5}")
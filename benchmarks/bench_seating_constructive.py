@@ -0,0 +1,30 @@
+"""
+Compares the constructive seating layout, the auto engine (constructive + hinted CP-SAT) and the pure
+per-room CP-SAT path on 1k-10k student rosters.
+Run from the project root: python -m benchmarks.bench_seating_constructive
+"""
+import schemas
+from benchmarks.bench_seating import make_exam, run
+
+def skewed_exam(n_rooms, rows, cols, shares):
+    """Full halls with a fixed branch mix, e.g. shares=(0.55, 0.25, 0.2) leaves one dominant branch."""
+    seats = n_rooms * rows * cols
+    branches = [f"B{b}" for b, share in enumerate(shares) for _ in range(round(seats * share))][:seats]
+    rooms = [schemas.RoomDimension(name=f"H{i}", rows=rows, cols=cols) for i in range(n_rooms)]
+    return [schemas.StudentInput(name=f"S{i}", roll_no=str(i), branch=b) for i, b in enumerate(branches)], rooms
+
+if __name__ == "__main__":
+    time_limit = 10.0
+    cases = []
+    print(f"{'exam':<30} {'engine':<13} {'seconds':>8} {'status':>9} {'penalty':>8} {'h/v pairs':>10}")
+    for n_students, n_branches in [(1000, 2), (1000, 3), (1000, 8), (5000, 3), (5000, 8), (10000, 3), (10000, 8)]:
+        n_rooms = -(-n_students // 72)  # 8x10 halls at 90% fill
+        students, rooms = make_exam(n_rooms, 8, 10, n_branches)
+        students = students[:n_students]
+        cases.append((f"{n_rooms} halls, {len(students)} st, {n_branches} br", students, rooms))
+    students, rooms = skewed_exam(14, 8, 10, (0.55, 0.25, 0.2))
+    cases.append((f"14 full halls, {len(students)} st, skewed", students, rooms))
+    for label, students, rooms in cases:
+        for engine in ("constructive", "auto", "per_room"):
+            seconds, status, score = run(engine, students, rooms, time_limit)
+            print(f"{label:<30} {engine:<13} {seconds:>8.2f} {status:>9} {score['penalty']:>8} {score['horizontal_pairs']:>4}/{score['vertical_pairs']:<5}")
@@ -0,0 +1,67 @@
+"""
+Compares the original set-based generation loop against the NumPy occupancy engine.
+Run from the project root: python -m benchmarks.bench_timetable
+"""
+import random
+import time
+from types import SimpleNamespace
+
+import timetable_engine
+
+def legacy_schedule(courses, rooms, time_slots, days, faculty_schedule, room_schedule):
+    classes_to_schedule = []
+    for course in courses:
+        for _ in range(course.hours): classes_to_schedule.append({'courseName': course.name, 'facultyName': course.faculty})
+    random.shuffle(classes_to_schedule)
+    schedule, unplaced_courses = {day: {} for day in days}, []
+    for class_item in classes_to_schedule:
+        placed = False
+        faculty = class_item['facultyName']
+        possible_slots = [(d, t, r) for d in days for t in time_slots for r in rooms]
+        random.shuffle(possible_slots)
+        for day, time_, room in possible_slots:
+            if not ((day, time_, faculty) in faculty_schedule) and not ((day, time_, room) in room_schedule) and not (time_ in schedule[day]):
+                schedule[day][time_] = {'courseName': class_item['courseName'], 'facultyName': faculty, 'roomName': room}
+                faculty_schedule.add((day, time_, faculty)); room_schedule.add((day, time_, room))
+                placed = True
+                break
+        if not placed: unplaced_courses.append(class_item['courseName'])
+    return schedule, list(set(unplaced_courses))
+
+def make_case(n_rooms, n_courses, hours, busy_fraction, seed=0):
+    rng = random.Random(seed)
+    days, time_slots = timetable_engine.DAYS, timetable_engine.time_slots_for(False)
+    rooms = [f"R{i}" for i in range(n_rooms)]
+    courses = [SimpleNamespace(name=f"C{i}", hours=hours, faculty=f"F{i % max(1, n_courses // 2)}") for i in range(n_courses)]
+    busy = [(d, t, rng.choice(rooms), f"F{rng.randrange(n_courses)}") for d in days for t in time_slots for _ in range(int(n_rooms * busy_fraction))]
+    return days, time_slots, rooms, courses, busy
+
+def run_legacy(case):
+    days, time_slots, rooms, courses, busy = case
+    faculty_schedule = {(d, t, f) for d, t, _, f in busy}
+    room_schedule = {(d, t, r) for d, t, r, _ in busy}
+    return legacy_schedule(courses, rooms, time_slots, days, faculty_schedule, room_schedule)
+
+def run_engine(case):
+    days, time_slots, rooms, courses, busy = case
+    grid = timetable_engine.OccupancyGrid(days, time_slots, rooms, [c.faculty for c in courses])
+    for d, t, r, f in busy:
+        grid.mark_room(d, t, r); grid.mark_faculty(d, t, f)
+    return timetable_engine.generate_schedule(grid, timetable_engine.expand_classes(courses))
+
+def best_of(fn, case, repeat):
+    timings = []
+    for i in range(repeat):
+        random.seed(i)
+        start = time.perf_counter()
+        fn(case)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+if __name__ == "__main__":
+    print(f"{'rooms':>6} {'course-hours':>13} {'legacy ms':>10} {'numpy ms':>10} {'speedup':>8}")
+    for n_rooms, n_courses, hours in [(10, 8, 4), (40, 10, 4), (40, 60, 4), (80, 100, 5)]:
+        case = make_case(n_rooms, n_courses, hours, busy_fraction=0.5)
+        legacy = best_of(run_legacy, case, 3)
+        engine = best_of(run_engine, case, 3)
+        print(f"{n_rooms:>6} {n_courses * hours:>13} {legacy * 1000:>10.1f} {engine * 1000:>10.1f} {legacy / engine:>7.1f}x")
@@ -0,0 +1,68 @@
+"""
+The community feed: newest-first pages of community_posts behind an opaque keyset cursor on (created_at, id),
+filtered by tag and role, with full-text search over title, content and tag through the community_posts_fts
+FTS5 index. Triggers keep the index in step with the table, so every insert, update and delete is covered.
+"""
+import base64
+import re
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, select, tuple_
+from sqlalchemy.orm import Session
+
+import models
+
+DEFAULT_PAGE, MAX_PAGE = 20, 100
+
+Post = models.CommunityPost
+# The FTS5 table as far as queries need it: rowid is the post id, the table-named column takes MATCH
+PostSearch = Table("community_posts_fts", MetaData(), Column("rowid", Integer), Column("community_posts_fts", String))
+FEED_COLUMNS = (Post.id, Post.title, Post.content, Post.author, Post.role, Post.tag, Post.attachment_url, Post.created_at)
+
+# --- SEARCH INDEX ---
+FTS_SQL = [  # external-content index: the text lives once, in community_posts
+    """CREATE VIRTUAL TABLE IF NOT EXISTS community_posts_fts USING fts5(title, content, tag,
+        content='community_posts', content_rowid='id', tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS community_posts_fts_insert AFTER INSERT ON community_posts BEGIN
+        INSERT INTO community_posts_fts (rowid, title, content, tag) VALUES (new.id, new.title, new.content, new.tag); END""",
+    """CREATE TRIGGER IF NOT EXISTS community_posts_fts_delete AFTER DELETE ON community_posts BEGIN
+        INSERT INTO community_posts_fts (community_posts_fts, rowid, title, content, tag) VALUES ('delete', old.id, old.title, old.content, old.tag); END""",
+    """CREATE TRIGGER IF NOT EXISTS community_posts_fts_update AFTER UPDATE OF title, content, tag ON community_posts BEGIN
+        INSERT INTO community_posts_fts (community_posts_fts, rowid, title, content, tag) VALUES ('delete', old.id, old.title, old.content, old.tag);
+        INSERT INTO community_posts_fts (rowid, title, content, tag) VALUES (new.id, new.title, new.content, new.tag); END""",
+    "INSERT INTO community_posts_fts (community_posts_fts) VALUES ('rebuild')",
+]
+
+def search_query(text: str) -> str:
+    """FTS5 query for free text: every word must match, the last one as a prefix; FTS syntax in `text` is not interpreted."""
+    words = re.findall(r"\w+", text.lower())
+    if not words: raise ValueError("search needs at least one word")
+    return " ".join([f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*'])
+
+# --- CURSOR ---
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{post_id}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, post_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|")
+        return datetime.fromisoformat(created_at), int(post_id)
+    except ValueError: raise ValueError("invalid cursor")  # covers bad base64, UTF-8, timestamps and ids
+
+# --- FEED ---
+def page_query(cursor: str = None, limit: int = DEFAULT_PAGE, tag: str = None, role: str = None, search: str = None):
+    """One page plus a row to tell whether another follows: an index range read after the cursor."""
+    q = select(*FEED_COLUMNS).order_by(Post.created_at.desc(), Post.id.desc()).limit(limit + 1)
+    if cursor: q = q.where(tuple_(Post.created_at, Post.id) < decode_cursor(cursor))
+    if tag: q = q.where(Post.tag == tag)
+    if role: q = q.where(Post.role == role)
+    if search is not None:
+        q = q.where(Post.id.in_(select(PostSearch.c.rowid).where(PostSearch.c.community_posts_fts.match(search_query(search)))))
+    return q
+
+def page(db: Session, cursor: str = None, limit: int = DEFAULT_PAGE, tag: str = None, role: str = None, search: str = None) -> tuple:
+    """(posts newest first, cursor of the next page or None); a search keeps the posts whose title, content or tag match."""
+    posts = [dict(r) for r in db.execute(page_query(cursor, limit, tag, role, search)).mappings()]
+    if len(posts) <= limit: return posts, None
+    posts = posts[:limit]
+    return posts, encode_cursor(posts[-1]["created_at"], posts[-1]["id"])
@@ -1,20 +1,47 @@
-from sqlalchemy import create_engine
+import os
+
+from anyio import to_thread
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-# CHANGED: New filename to fix "no such column" error automatically
-SQLALCHEMY_DATABASE_URL = "sqlite:///./smartflex_v2.db"
+# Schema changes go through migrations.py, which upgrades this file in place.
+SQLALCHEMY_DATABASE_URL = os.environ.get("SMARTFLEX_DATABASE_URL", "sqlite:///./smartflex_v2.db")
+
+# Access policy: endpoints that use a Session are plain `def`, so FastAPI runs them on the AnyIO thread
+# pool instead of the event loop. `async def` endpoints never touch a Session directly; they hand blocking
+# work to run_in_threadpool. The pool and the connection pool are sized together so a thread never waits
+# for a connection.
+DB_THREADS = int(os.environ.get("SMARTFLEX_DB_THREADS", "40"))
+
+# WAL lets readers run alongside the single writer; NORMAL sync is durable across app crashes in WAL mode.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 5000,
+    "cache_size": -20000, "temp_store": "MEMORY", "mmap_size": 268435456,
+}
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False},
+    pool_size=DB_THREADS, max_overflow=0, pool_timeout=30,
 )
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items(): cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def configure_thread_pool(threads: int = DB_THREADS):
+    """Sizes the thread pool behind sync endpoints and run_in_threadpool; call from the running event loop."""
+    to_thread.current_default_thread_limiter().total_tokens = threads
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+
+import models
+import timetable_engine
+
+CACHE_DATES = 64
+
+def override_view(ov, entry: dict, new_teacher: str, new_room: str) -> dict:
+    """The /api/schedule/view shape the timetable page renders as "Changes for Today"."""
+    return {
+        "original_entry_id": ov.original_entry_id, "change_type": ov.change_type, "new_teacher": new_teacher,
+        "new_room": new_room, "new_day": ov.new_day, "new_time_slot": ov.new_time_slot,
+        "original_class": {"course_name": entry["course_name"], "day": entry["day"], "time_slot": entry["time_slot"]},
+    }
+
+def calendar_order(cell: dict) -> int:
+    """Sort key: the cell's calendar slot, unknown cells last. Slot 0 (first period of the first day) is a real slot."""
+    slot = timetable_engine.slot_id(cell["day"], cell["time_slot"])
+    return slot if slot is not None else len(timetable_engine.SLOT_CELLS)
+
+def resolve(db: Session, view_date: date) -> dict:
+    """
+    {section: {"classes": [...], "overrides": [...]}} for every section with a saved timetable, as taught
+    on `view_date`. An override changes its entry's occurrence in the week of its override_date; a
+    reschedule also adds the class on its new_day of that week. The latest override of an occurrence wins.
+    "overrides" keeps the /api/schedule/view rule the "Changes for Today" panel was built on: the section's
+    overrides whose override_date is `view_date` itself, whichever day their class falls on.
+    """
+    day_name = timetable_engine.DAYS[view_date.weekday()] if view_date.weekday() < len(timetable_engine.DAYS) else None
+    monday = view_date - timedelta(days=view_date.weekday())
+    Entry, NewTeacher, NewRoom = models.ScheduleEntry, aliased(models.Teacher), aliased(models.Room)
+    entry_columns = (Entry.id, models.Section.name, Entry.day, Entry.time_slot, models.Course.name, models.Teacher.name, models.Room.name)
+    entry_keys = ("entry_id", "section", "day", "time_slot", "course_name", "faculty_name", "room_name")
+    with_names = lambda q: q.join(models.Section, Entry.section_id == models.Section.id).join(models.Course, Entry.course_id == models.Course.id) \
+        .join(models.Teacher, Entry.teacher_id == models.Teacher.id).join(models.Room, Entry.room_id == models.Room.id)
+
+    sections = {name: {"classes": {}, "overrides": []} for name in db.execute(
+        select(models.Section.name).join(Entry, Entry.section_id == models.Section.id).distinct()).scalars()}
+    if day_name:
+        for row in db.execute(with_names(select(*entry_columns)).where(Entry.day == day_name)):
+            entry = dict(zip(entry_keys, row))
+            sections[entry["section"]]["classes"][entry["entry_id"]] = {**entry, "status": "regular", "original": None}
+
+    overrides = db.execute(with_names(select(
+        models.ScheduleOverride, NewTeacher.name.label("new_teacher_name"), NewRoom.name.label("new_room_name"), *entry_columns
+    ).join(Entry, models.ScheduleOverride.original_entry_id == Entry.id))
+        .outerjoin(NewTeacher, models.ScheduleOverride.new_teacher_id == NewTeacher.id)
+        .outerjoin(NewRoom, models.ScheduleOverride.new_room_id == NewRoom.id)
+        .where(models.ScheduleOverride.override_date.between(monday, monday + timedelta(days=6)))
+        .order_by(models.ScheduleOverride.id)).all()
+    for ov, new_teacher_name, new_room_name, *row in overrides:
+        entry = dict(zip(entry_keys, row))
+        section = sections[entry["section"]]
+        original = {k: entry[k] for k in ("day", "time_slot", "faculty_name", "room_name")}
+        # every override here is from view_date's week, so matching weekday names means matching dates
+        occurs_today = day_name is not None and entry["day"] == day_name
+        moved_in = ov.change_type == "RESCHEDULE" and day_name is not None and ov.new_day == day_name
+        if occurs_today and ov.change_type == "SUBSTITUTE":
+            section["classes"][entry["entry_id"]] = {**entry, "faculty_name": new_teacher_name or entry["faculty_name"], "status": "substitute", "original": original}
+        elif occurs_today and ov.change_type == "RESCHEDULE":
+            section["classes"].pop(entry["entry_id"], None)
+        if moved_in:
+            section["classes"][("moved", entry["entry_id"])] = {
+                **entry, "day": ov.new_day, "time_slot": ov.new_time_slot or entry["time_slot"], "room_name": new_room_name or entry["room_name"],
+                "faculty_name": new_teacher_name or entry["faculty_name"], "status": "rescheduled", "original": original,
+            }
+        if ov.override_date == view_date: section["overrides"].append(override_view(ov, entry, new_teacher_name, new_room_name))
+
+    return {name: {
+        "classes": sorted(({k: v for k, v in c.items() if k != "section"} for c in data["classes"].values()), key=calendar_order),
+        "overrides": data["overrides"],
+    } for name, data in sections.items()}
+
+class EffectiveTimetableCache:
+    """
+    Resolved timetables per date, LRU over CACHE_DATES dates. Writers call invalidate(): schedule writes
+    with no argument (they change every date), override writes with the override date (they change its week).
+    Per process, like the occupancy index.
+    """
+    def __init__(self, max_dates: int = CACHE_DATES):
+        self._lock = threading.Lock()
+        self._dates = OrderedDict()
+        self._generation = 0
+        self.max_dates = max_dates
+
+    def get(self, db: Session, view_date: date) -> dict:
+        with self._lock:
+            if view_date in self._dates:
+                self._dates.move_to_end(view_date)
+                return self._dates[view_date]
+            generation = self._generation
+        resolved = resolve(db, view_date)
+        with self._lock:
+            if generation != self._generation: return resolved  # a write landed while resolving
+            self._dates[view_date] = resolved
+            while len(self._dates) > self.max_dates: self._dates.popitem(last=False)
+        return resolved
+
+    def invalidate(self, on: date = None):
+        with self._lock:
+            self._generation += 1
+            if on is None: self._dates.clear(); return
+            monday = on - timedelta(days=on.weekday())
+            for cached in [d for d in self._dates if monday <= d < monday + timedelta(days=7)]: del self._dates[cached]
+
+cache = EffectiveTimetableCache()
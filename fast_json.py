@@ -0,0 +1,60 @@
+"""
+JSON responses for the large list endpoints. Rows are plain dicts/lists built straight from query rows or
+solver output (no per-row Pydantic model), encoded with orjson when it is installed and the stdlib encoder
+otherwise. Lists longer than STREAM_ROWS are sent as a chunked stream, CHUNK_ROWS rows per chunk.
+"""
+import json
+import os
+from datetime import date, datetime
+from itertools import islice
+
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+STREAM_ROWS = int(os.environ.get("SMARTFLEX_JSON_STREAM_ROWS", "5000"))
+CHUNK_ROWS = 1000
+
+def _default(value):
+    if isinstance(value, (date, datetime)): return value.isoformat()
+    if hasattr(value, "model_dump"): return value.model_dump(mode="json")
+    if hasattr(value, "item"): return value.item()  # numpy scalars
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value) -> bytes:
+    if orjson is not None: return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def iter_array(rows):
+    """Yields the JSON array of `rows` (any iterable), encoding CHUNK_ROWS rows per call."""
+    rows, separator = iter(rows), b"["
+    while batch := list(islice(rows, CHUNK_ROWS)):
+        yield separator + dumps(batch)[1:-1]
+        separator = b","
+    yield b"]" if separator == b"," else b"[]"
+
+def iter_object(fields: dict):
+    """Yields the JSON object of `fields`, streaming its list values with iter_array."""
+    for i, (key, value) in enumerate(fields.items()):
+        yield (b"," if i else b"{") + dumps(str(key)) + b":"
+        if isinstance(value, list): yield from iter_array(value)
+        else: yield dumps(value)
+    yield b"}" if fields else b"{}"
+
+def list_response(rows: list, **kwargs) -> Response:
+    if len(rows) > STREAM_ROWS: return StreamingResponse(iter_array(rows), media_type="application/json", **kwargs)
+    return FastJSONResponse(rows, **kwargs)
+
+def object_response(fields: dict, **kwargs) -> Response:
+    if any(isinstance(v, list) and len(v) > STREAM_ROWS for v in fields.values()):
+        return StreamingResponse(iter_object(fields), media_type="application/json", **kwargs)
+    return FastJSONResponse(fields, **kwargs)
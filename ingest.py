@@ -0,0 +1,179 @@
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import jobs
+
+MAX_UPLOAD_BYTES = int(os.environ.get("SMARTFLEX_MAX_UPLOAD_MB", "25")) * 1024 * 1024
+CSV_CHUNK_ROWS = 50_000
+MAX_ROW_ERRORS = 500
+COURSE_COLUMNS = ['courses', 'weeklyhours', 'faculty']
+INGEST_WORKERS = int(os.environ.get("SMARTFLEX_INGEST_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+
+class UploadTooLarge(ValueError):
+    pass
+
+def check_size(file_obj, limit: int = MAX_UPLOAD_BYTES) -> int:
+    file_obj.seek(0, os.SEEK_END)
+    size = file_obj.tell()
+    file_obj.seek(0)
+    if size > limit: raise UploadTooLarge(f"File is {size / 1048576:.1f} MB; the limit is {limit / 1048576:.0f} MB.")
+    return size
+
+def normalize_columns(columns) -> list:
+    return [str(col).strip().lower().replace(" ", "") for col in columns]
+
+def iter_frames(file_obj, filename: str):
+    """Yields the upload as DataFrames: CSV in chunks of CSV_CHUNK_ROWS, spreadsheets in one piece."""
+    if filename.endswith('.csv'): yield from pd.read_csv(file_obj, chunksize=CSV_CHUNK_ROWS)
+    else: yield pd.read_excel(file_obj)
+
+def parse_course_upload(file_obj, filename: str, limit: int = MAX_UPLOAD_BYTES) -> dict:
+    """
+    Builds the course list and room list of a timetable upload with column operations, one chunk at
+    a time. Rows with every course field empty are skipped (room-only rows); incomplete rows or
+    non-integer hours are reported in `errors` by spreadsheet row number instead of failing the file.
+    """
+    check_size(file_obj, limit)
+    courses, rooms, errors = [], {}, []
+    rows_read = error_count = 0
+    for chunk in iter_frames(file_obj, filename):
+        chunk.columns = normalize_columns(chunk.columns)
+        missing = [c for c in COURSE_COLUMNS + ['rooms'] if c not in chunk.columns]
+        if missing: raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        first_row = rows_read + 2  # row 1 is the header
+        rows_read += len(chunk)
+
+        filled = chunk[COURSE_COLUMNS].notna()
+        hours = pd.to_numeric(chunk['weeklyhours'], errors='coerce')
+        incomplete = filled.any(axis=1) & ~filled.all(axis=1)
+        bad_hours = filled.all(axis=1) & ~(hours.notna() & (hours % 1 == 0) & (hours > 0))
+        valid = filled.all(axis=1) & ~bad_hours
+
+        block = pd.DataFrame({
+            'name': chunk.loc[valid, 'courses'].astype(str),
+            'hours': hours[valid].astype(int),
+            'faculty': chunk.loc[valid, 'faculty'].astype(str),
+        })
+        courses.extend(block.to_dict('records'))
+        rooms.update(dict.fromkeys(chunk['rooms'].dropna().astype(str)))
+
+        error_count += int(incomplete.sum() + bad_hours.sum())
+        if len(errors) < MAX_ROW_ERRORS:
+            for pos in np.flatnonzero(incomplete.to_numpy()):
+                absent = [c for c in COURSE_COLUMNS if not filled.iat[pos, COURSE_COLUMNS.index(c)]]
+                errors.append({"row": first_row + int(pos), "error": f"Missing {', '.join(absent)}"})
+            for pos in np.flatnonzero(bad_hours.to_numpy()):
+                errors.append({"row": first_row + int(pos), "error": f"Invalid weekly hours '{chunk['weeklyhours'].iat[pos]}'"})
+            errors = sorted(errors, key=lambda e: e["row"])[:MAX_ROW_ERRORS]
+    return {"courses": courses, "rooms": list(rooms), "errors": errors, "errorCount": error_count, "rowsRead": rows_read}
+
+# --- ATTENDANCE HISTORY ---
+MAX_ATTENDANCE_UPLOAD_BYTES = int(os.environ.get("SMARTFLEX_MAX_ATTENDANCE_UPLOAD_MB", "500")) * 1024 * 1024
+ATTENDANCE_COLUMNS = ['classroomid', 'date', 'studentroll', 'studentname', 'status']
+
+def iter_attendance_csv(file_obj, limit: int = MAX_ATTENDANCE_UPLOAD_BYTES):
+    """
+    Yields (rows, errors, rows_read) per CSV_CHUNK_ROWS chunk of an attendance CSV, so a semester streams
+    through in constant memory. Rows are dicts with the AttendanceCreate fields; rows with an empty field
+    or a date that is not YYYY-MM-DD are skipped; up to MAX_ROW_ERRORS of them per chunk are reported in
+    `errors` by line number.
+    """
+    check_size(file_obj, limit)
+    rows_read = 0
+    for chunk in pd.read_csv(file_obj, chunksize=CSV_CHUNK_ROWS, dtype=str, keep_default_na=False):
+        chunk.columns = [c.replace("_", "") for c in normalize_columns(chunk.columns)]
+        missing = [c for c in ATTENDANCE_COLUMNS if c not in chunk.columns]
+        if missing: raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        first_row = rows_read + 2  # row 1 is the header
+        rows_read += len(chunk)
+
+        fields = chunk[ATTENDANCE_COLUMNS].apply(lambda column: column.str.strip())
+        dates = pd.to_datetime(fields['date'], format='%Y-%m-%d', errors='coerce')
+        filled = (fields != '').all(axis=1)
+        bad_date = filled & dates.isna()
+        valid = filled & ~bad_date
+        remarks = chunk['remarks'].str.strip() if 'remarks' in chunk.columns else pd.Series('', index=chunk.index)
+
+        block = {
+            'classroom_id': fields.loc[valid, 'classroomid'].tolist(), 'date': dates[valid].dt.date.tolist(),
+            'student_roll': fields.loc[valid, 'studentroll'].tolist(), 'student_name': fields.loc[valid, 'studentname'].tolist(),
+            'status': fields.loc[valid, 'status'].tolist(), 'remarks': [r or None for r in remarks[valid].tolist()],
+        }
+        errors = [{"row": first_row + int(pos), "error": f"Missing {', '.join(c for c in ATTENDANCE_COLUMNS if fields.iat[pos, ATTENDANCE_COLUMNS.index(c)] == '')}"}
+                  for pos in np.flatnonzero(~filled.to_numpy())[:MAX_ROW_ERRORS]]
+        errors += [{"row": first_row + int(pos), "error": f"Invalid date '{fields['date'].iat[pos]}'"} for pos in np.flatnonzero(bad_date.to_numpy())[:MAX_ROW_ERRORS]]
+        yield to_records(block), sorted(errors, key=lambda e: e["row"]), len(chunk)
+
+# --- EXAM ROSTERS (process pool) ---
+_pool = jobs.ProcessPool(INGEST_WORKERS)
+
+def process_pool() -> ProcessPoolExecutor:
+    return _pool.get()
+
+def reset_pool(broken: ProcessPoolExecutor):
+    """Drops `broken` (it raised BrokenProcessPool) so the next process_pool() starts a fresh one; no-op once replaced."""
+    _pool.reset(broken)
+
+def read_frame(filename: str, contents: bytes) -> pd.DataFrame:
+    df = pd.read_csv(io.BytesIO(contents)) if filename.endswith('.csv') else pd.read_excel(io.BytesIO(contents))
+    df.columns = [str(col).strip().lower().replace(" ", "").replace("_", "") for col in df.columns]
+    return df
+
+def as_text(column: pd.Series) -> pd.Series:
+    """str() per value, but whole-number float columns (ints with blanks) lose their trailing '.0'."""
+    if pd.api.types.is_float_dtype(column) and (column.dropna() % 1 == 0).all(): column = column.astype('Int64')
+    return column.astype(str)
+
+def parse_students_bytes(filename: str, contents: bytes) -> dict:
+    """Columnar {"name", "roll_no", "branch"} lists for one roster; files without name/branch columns yield nothing."""
+    df = read_frame(filename, contents)
+    if 'name' not in df.columns or 'branch' not in df.columns: return {"name": [], "roll_no": [], "branch": []}
+    df = df[df['name'].notna() & df['branch'].notna()]
+    roll_no = as_text(df['rollno']).where(df['rollno'].notna(), "N/A") if 'rollno' in df.columns else pd.Series("N/A", index=df.index)
+    return {"name": as_text(df['name']).tolist(), "roll_no": roll_no.tolist(), "branch": as_text(df['branch']).tolist()}
+
+def parse_rooms_bytes(filename: str, contents: bytes) -> dict:
+    """Columnar {"name", "rows", "cols"} lists; each field maps to the last column whose name contains room/row/col."""
+    df = read_frame(filename, contents)
+    col_map = {}
+    for c in df.columns:
+        if 'room' in c: col_map['name'] = c
+        if 'row' in c: col_map['rows'] = c
+        if 'col' in c: col_map['cols'] = c
+    if not {'name', 'rows', 'cols'} <= col_map.keys(): return {"name": [], "rows": [], "cols": []}
+    df = df[df[col_map['name']].notna()]
+    return {
+        "name": as_text(df[col_map['name']]).tolist(),
+        "rows": df[col_map['rows']].astype(int).tolist(),
+        "cols": df[col_map['cols']].astype(int).tolist(),
+    }
+
+def concat_columns(parts: list) -> dict:
+    return {key: [v for part in parts for v in part[key]] for key in parts[0]} if parts else {}
+
+def dedupe_students(columns: dict) -> dict:
+    """Keeps the first row per roll number across all files; rows without a roll number are all kept."""
+    df = pd.DataFrame(columns)
+    if df.empty: return {"name": [], "roll_no": [], "branch": []}
+    df = df[(df['roll_no'] == "N/A") | ~df.duplicated('roll_no')]
+    return {key: df[key].tolist() for key in ("name", "roll_no", "branch")}
+
+def to_records(columns: dict) -> list:
+    keys = list(columns)
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+def iter_columnar_json(key: str, columns: dict):
+    """Streams {key: {"count": n, "columns": {...}}} one column at a time; `branch` is dictionary-encoded when present."""
+    count = len(next(iter(columns.values()), []))
+    if 'branch' in columns:
+        codes, uniques = pd.factorize(pd.Series(columns['branch'], dtype=object))
+        columns = {**columns, "branch": codes.tolist(), "branches": uniques.tolist()}
+    yield f'{{{json.dumps(key)}:{{"count":{count},"columns":{{'
+    for i, (name, values) in enumerate(columns.items()):
+        yield ("," if i else "") + json.dumps(name) + ":" + json.dumps(values)
+    yield "}}}"
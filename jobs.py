@@ -0,0 +1,232 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from multiprocessing.connection import wait
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+JOB_WORKERS = int(os.environ.get("SMARTFLEX_JOB_WORKERS", "0")) or os.cpu_count() or 1
+JOB_RESULT_TTL = float(os.environ.get("SMARTFLEX_JOB_TTL_SECONDS", "3600"))
+JOB_TIME_LIMIT = float(os.environ.get("SMARTFLEX_JOB_TIME_LIMIT_SECONDS", "600"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED, TIMED_OUT = "queued", "running", "done", "failed", "cancelled", "timed_out"
+FINISHED = (DONE, FAILED, CANCELLED, TIMED_OUT)
+
+def mp_context():
+    """
+    Start method for worker processes, also used by ingest's parse pool. The server is multi-threaded by
+    the time a pool starts, so children come from a forkserver (spawn where there is none), never a fork.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods(): return multiprocessing.get_context("spawn")
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload(["seating", "timetable_engine", "ingest"])  # children fork with OR-Tools and pandas already imported
+    return ctx
+
+class ProcessPool:
+    """
+    A ProcessPoolExecutor on mp_context(), started on first use and shared by every request. A worker that
+    dies (e.g. out of memory) breaks the executor; reset() drops it so the next get() starts a fresh one.
+    """
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool, self._lock = None, threading.Lock()
+
+    def get(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None: self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp_context())
+            return self._pool
+
+    def reset(self, broken: ProcessPoolExecutor):
+        """Drops `broken` (it raised BrokenProcessPool); a no-op once another caller replaced it."""
+        with self._lock:
+            if self._pool is not broken: return
+            self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def map(self, func, *iterables) -> list:
+        """list(executor.map(...)), retried once on a fresh executor if a worker dies."""
+        iterables = [list(it) for it in iterables]
+        for attempt in range(2):
+            pool = self.get()
+            try: return list(pool.map(func, *iterables))
+            except BrokenProcessPool:
+                self.reset(pool)
+                if attempt: raise
+
+def _run(conn, func, args, kwargs):
+    if hasattr(os, "setpgrp"): os.setpgrp()  # own process group, so stopping the job also stops its solver pools
+    try: conn.send((DONE, func(*args, **kwargs)))
+    except Exception as e: conn.send((FAILED, f"{type(e).__name__}: {e}"))
+    finally: conn.close()
+
+def _reap(process):
+    """Waits for a worker to exit, killing it after 5s."""
+    if process is None: return
+    process.join(5)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+class Job:
+    def __init__(self, kind: str, func, args: tuple, kwargs: dict, time_limit: float, on_result):
+        self.id = uuid.uuid4().hex
+        self.kind, self.func, self.args, self.kwargs = kind, func, args, kwargs
+        self.time_limit, self.on_result = time_limit, on_result
+        self.status, self.result, self.error = QUEUED, None, None
+        self.submitted_at, self.started_at, self.finished_at = time.time(), None, None
+        self.process = self.conn = self.deadline = None
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id, "kind": self.kind, "status": self.status, "error": self.error, "time_limit": self.time_limit,
+            "submitted_at": self.submitted_at, "started_at": self.started_at, "finished_at": self.finished_at,
+        }
+
+class JobManager:
+    """
+    Runs solver calls in child processes so they never block the event loop: at most `workers` jobs run
+    at once, one process each, which lets a cancelled or overdue job be terminated without touching the
+    others. Arguments and results must be picklable; `on_result` post-processes a result in this process
+    (e.g. saving it), so state such as the DB session and in-memory indexes stays in the server. Finished
+    jobs are kept for `ttl` seconds. A supervisor thread starts queued jobs and collects results; it sleeps
+    until a worker replies or exits, a deadline or expiry comes due, or submit() wakes it, and never polls.
+    """
+    def __init__(self, workers: int = JOB_WORKERS, ttl: float = JOB_RESULT_TTL):
+        self.workers, self.ttl = workers, ttl
+        self._jobs, self._queue, self._running = {}, deque(), set()
+        self._lock = threading.Lock()
+        self._wake_reader = self._wake_writer = None  # socketpair, made with the supervisor
+        self._supervisor = None
+        self._stopped = False
+
+    def submit(self, kind: str, func, *args, time_limit: float = None, on_result=None, **kwargs) -> Job:
+        job = Job(kind, func, args, kwargs, min(time_limit or JOB_TIME_LIMIT, JOB_TIME_LIMIT), on_result)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            if self._supervisor is None:
+                self._wake_reader, self._wake_writer = socket.socketpair()
+                for end in (self._wake_reader, self._wake_writer): end.setblocking(False)
+                self._supervisor = threading.Thread(target=self._supervise, name="job-supervisor", daemon=True)
+                self._supervisor.start()
+        self._wake()
+        return job
+
+    def record(self, kind: str, result) -> Job:
+        """Stores an already computed result (e.g. a cache hit) as a finished job."""
+        job = Job(kind, None, (), {}, 0, None)
+        job.status, job.result, job.started_at, job.finished_at = DONE, result, job.submitted_at, job.submitted_at
+        with self._lock: self._jobs[job.id] = job
+        self._wake()  # its expiry may come before the supervisor's next timeout
+        return job
+
+    def get(self, job_id: str):
+        with self._lock: return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED: return job
+            process = None
+            if job.status == QUEUED: self._queue.remove(job)
+            else: process = self._stop(job)
+            self._finish(job, CANCELLED, error="Cancelled by request")
+        self._wake()
+        _reap(process)  # outside the lock: get() and submit() run on the event loop
+        return job
+
+    def shutdown(self):
+        self._stopped = True
+        self._wake()
+        with self._lock: processes = [self._stop(job) for job in list(self._running)]
+        for process in processes: _reap(process)
+
+    def _wake(self):
+        try: self._wake_writer.send(b"\0")
+        except (AttributeError, BlockingIOError): pass  # no supervisor yet, or a wake-up is already pending
+
+    def _timeout(self):
+        """Seconds until the next job deadline or result expiry; None when there is nothing to wait for."""
+        now, clock = time.monotonic(), time.time()
+        due = [job.deadline - now for job in self._running] + [job.finished_at + self.ttl - clock for job in self._jobs.values() if job.finished_at]
+        return max(0, min(due)) if due else None
+
+    def _supervise(self):
+        while not self._stopped:
+            with self._lock:
+                completed, exited = self._collect()
+                while self._queue and len(self._running) < self.workers: self._start(self._queue.popleft())
+                self._expire()
+                # descriptors, not Connections: cancel() may close a job's pipe while this thread waits on it
+                ready = [self._wake_reader] + [fd for job in self._running for fd in (job.conn.fileno(), job.process.sentinel)]
+                timeout = self._timeout()
+            for process in exited: _reap(process)
+            for job, status, payload in completed:
+                if status == DONE and job.on_result:
+                    try: payload = job.on_result(payload)
+                    except Exception as e: status, payload = FAILED, f"{type(e).__name__}: {e}"
+                with self._lock:
+                    if job.status != RUNNING: continue  # cancelled while on_result ran
+                    if status == DONE: self._finish(job, DONE, result=payload)
+                    else: self._finish(job, FAILED, error=payload)
+            if completed or exited: continue  # on_result and _reap took time: settle again before sleeping
+            if self._wake_reader in wait(ready, timeout):
+                try:
+                    while self._wake_reader.recv(4096): pass
+                except BlockingIOError: pass
+
+    def _start(self, job: Job):
+        ctx = mp_context()
+        job.conn, child = ctx.Pipe(duplex=False)
+        job.process = ctx.Process(target=_run, args=(child, job.func, job.args, job.kwargs), name=f"job-{job.kind}-{job.id[:8]}")
+        job.process.start()
+        child.close()
+        job.status, job.started_at, job.deadline = RUNNING, time.time(), time.monotonic() + job.time_limit
+        self._running.add(job)
+
+    def _collect(self) -> tuple:
+        """
+        Settles overdue and crashed workers. Returns ((job, status, payload) for workers that replied, the
+        processes to _reap() once the lock is released).
+        """
+        completed, exited = [], []
+        for job in list(self._running):
+            alive = job.process.is_alive()  # before poll(): a worker that replies and exits in between is still read
+            if job.conn.poll():
+                try: status, payload = job.conn.recv()
+                except EOFError: status, payload = FAILED, "Worker exited without a result"
+                exited.append(job.process)
+                self._running.discard(job)
+                completed.append((job, status, payload))
+            elif not alive:
+                self._finish(job, FAILED, error=f"Worker exited with code {job.process.exitcode}")
+            elif time.monotonic() > job.deadline:
+                exited.append(self._stop(job))
+                self._finish(job, TIMED_OUT, error=f"Exceeded the {job.time_limit:g}s time limit")
+        return completed, exited
+
+    def _stop(self, job: Job):
+        """Signals the job's worker to exit and returns its process for _reap()."""
+        if job.process is None: return None
+        if hasattr(os, "killpg"):
+            try: os.killpg(job.process.pid, signal.SIGTERM)
+            except ProcessLookupError: pass
+        job.process.terminate()
+        return job.process
+
+    def _finish(self, job: Job, status: str, result=None, error: str = None):
+        job.status, job.result, job.error, job.finished_at = status, result, error, time.time()
+        if job.conn: job.conn.close()
+        job.func = job.args = job.kwargs = job.process = job.conn = None
+        self._running.discard(job)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]: del self._jobs[job_id]
+
+manager = JobManager()
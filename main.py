@@ -1,37 +1,86 @@
-import random
-import pandas as pd
 from datetime import date, datetime
 from typing import List, Optional, Dict
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Request, Form, Header
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Request, Form, Header, Query
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-from collections import defaultdict
+from sqlalchemy import func, select
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
 import uuid
-import io
-import math
 import os
-import shutil
-
-from ortools.sat.python import cp_model
 
 import models
 import schemas
-from database import engine, get_db
-
-# Create DB Tables
+import timetable_engine
+import occupancy_index
+import schedule_store
+import ingest
+import adjustments
+import attendance_analytics
+import attendance_archive
+import attachment_store
+import attendance_store
+import community_feed
+import seating
+import jobs
+import migrations
+import effective_schedule
+import fast_json
+from database import engine, get_db, SessionLocal, configure_thread_pool
+
+# Create DB Tables, then upgrade existing databases in place
 models.Base.metadata.create_all(bind=engine)
+migrations.upgrade(engine)
+
+class BodyLimit:
+    """
+    Rejects a POST to `path` whose body is over `limit` bytes with a 413 before the form is spooled to disk:
+    up front when Content-Length says so, else as soon as the received chunks pass the limit.
+    """
+    def __init__(self, app, path: str, limit: int):
+        self.app, self.path, self.limit = app, path, limit
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != self.path: return await self.app(scope, receive, send)
+        detail = f"Request is over the {self.limit / 1048576:.0f} MB limit."
+        length = dict(scope["headers"]).get(b"content-length")
+        if length and length.isdigit() and int(length) > self.limit:
+            return await JSONResponse({"detail": detail}, status_code=413, headers={"Connection": "close"})(scope, receive, send)
+        received = 0
+        async def counted():
+            nonlocal received
+            message = await receive()
+            received += len(message.get("body", b""))
+            if received > self.limit: raise HTTPException(status_code=413, detail=detail)  # FastAPI re-raises it from form parsing
+            return message
+        await self.app(scope, counted, send)
 
 app = FastAPI()
 
-app.add_middleware(
+app.add_middleware(BodyLimit, path="/api/community/posts", limit=attachment_store.MAX_ATTACHMENT_BYTES + attachment_store.FORM_OVERHEAD_BYTES)
+app.add_middleware(  # added last, so it wraps BodyLimit and a 413 still carries CORS headers
     CORSMiddleware,
     allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"],
 )
 
-UPLOAD_DIR = "public/uploads"
+@app.on_event("startup")
+async def size_thread_pool():
+    configure_thread_pool()
+
+@app.on_event("startup")
+def build_occupancy_index():
+    db = SessionLocal()
+    try: occupancy_index.index.rebuild(db)
+    finally: db.close()
+
+@app.on_event("shutdown")
+def stop_jobs():
+    jobs.manager.shutdown()
+
+UPLOAD_DIR = "public/uploads"  # attachments from before attachment_store, under their client filenames
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 announcements_db = {
@@ -41,15 +90,6 @@ announcements_db = {
     "EC207": [], "EC209": [], "cs-b-md": [], 
 }
 
-def get_or_create(db: Session, model, name: str):
-    instance = db.query(model).filter(model.name == name).first()
-    if not instance:
-        instance = model(name=name)
-        db.add(instance)
-        db.commit()
-        db.refresh(instance)
-    return instance
-
 # --- TIMETABLE: EXCEL UPLOAD ---
 @app.post("/api/upload_excel")
 async def handle_excel_upload(file: UploadFile = File(...)):
@@ -57,147 +97,137 @@ async def handle_excel_upload(file: UploadFile = File(...)):
     if not (file.filename.endswith('.csv') or file.filename.endswith('.xlsx') or file.filename.endswith('.xls')): 
         raise HTTPException(status_code=400, detail="Invalid file type.")
     try:
-        contents = await file.read()
-        df = pd.read_csv(io.BytesIO(contents)) if file.filename.endswith('.csv') else pd.read_excel(io.BytesIO(contents))
-        df.columns = [col.strip().lower().replace(" ", "") for col in df.columns]
-        required = {'courses', 'weeklyhours', 'faculty', 'rooms'}
-        if not required.issubset(df.columns): raise HTTPException(400, f"Missing required columns: {', '.join(required)}")
-        courses = [{'name': str(r['courses']), 'hours': int(r['weeklyhours']), 'faculty': str(r['faculty'])} for i, r in df.iterrows() if pd.notna(r.get('courses')) and pd.notna(r.get('weeklyhours')) and pd.notna(r.get('faculty'))]
-        rooms = df['rooms'].dropna().astype(str).unique().tolist()
-        return {"courses": courses, "rooms": rooms}
+        return await run_in_threadpool(ingest.parse_course_upload, file.file, file.filename)
+    except ingest.UploadTooLarge as e: raise HTTPException(413, str(e))
+    except ValueError as e: raise HTTPException(400, f"Error processing file: {e}")
     except Exception as e: raise HTTPException(500, f"Error processing file: {e}")
 
+# --- TIMETABLE: CALENDAR ---
+@app.get("/api/calendar")
+async def get_calendar():
+    return {"days": timetable_engine.DAYS, "periods": timetable_engine.PERIODS, "lunch_period": timetable_engine.LUNCH_SLOT}
+
 # --- TIMETABLE: GET SAVED ---
 @app.get("/api/saved_schedules")
-async def get_saved_schedules(db: Session = Depends(get_db)):
-    all_entries = db.query(models.ScheduleEntry).options(
-        joinedload(models.ScheduleEntry.section), joinedload(models.ScheduleEntry.course),
-        joinedload(models.ScheduleEntry.teacher), joinedload(models.ScheduleEntry.room)
-    ).order_by(models.ScheduleEntry.time_slot).all()
-    grouped_schedules = defaultdict(list)
-    for entry in all_entries:
-        if entry.section:
-            grouped_schedules[entry.section.name].append({
-                "entry_id": entry.id, "day": entry.day, "time_slot": entry.time_slot,
-                "course_name": entry.course.name, "faculty_name": entry.teacher.name,
-                "room_name": entry.room.name
-            })
-    return grouped_schedules
+def get_saved_schedules(
+    sections: Optional[List[str]] = Query(None), offset: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1),
+    if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db),
+):
+    """
+    {section: [entries]}, sections by name, optionally only `sections` and one page of `limit` sections from
+    `offset` (X-Total-Count has the unpaginated count). Conditional on the ETag, so unchanged timetables are a 304.
+    """
+    saved = schedule_store.saved_cache.get(db)
+    paged = bool(sections) or offset > 0 or limit is not None
+    etag = saved.page_etag(sections, offset, limit) if paged else saved.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")): return Response(status_code=304, headers=headers)
+    if not paged: return Response(saved.body, media_type="application/json", headers=headers)
+    wanted = set(sections or ())
+    names = [name for name in saved.grouped if name in wanted] if sections else list(saved.grouped)
+    page = names[offset:offset + limit if limit is not None else None]
+    headers["X-Total-Count"] = str(len(names))
+    return fast_json.FastJSONResponse({name: saved.grouped[name] for name in page}, headers=headers)
 
 # --- TIMETABLE: GENERATION LOGIC ---
-def create_schedule_logic(db: Session, courses: list[schemas.CourseInput], rooms: list[str], include_lunch_break: bool):
-    time_slots = ['9:00 AM', '10:00 AM', '11:00 AM', '12:00 PM', '2:00 PM', '3:00 PM', '4:00 PM', '5:00 PM']
-    if not include_lunch_break: time_slots.insert(4, '1:00 PM')
-    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-    faculty_schedule, room_schedule = set(), set()
-    for entry in db.query(models.ScheduleEntry).options(joinedload(models.ScheduleEntry.teacher), joinedload(models.ScheduleEntry.room)).all():
-        faculty_schedule.add((entry.day, entry.time_slot, entry.teacher.name))
-        room_schedule.add((entry.day, entry.time_slot, entry.room.name))
-    classes_to_schedule = []
-    for course in courses:
-        for _ in range(course.hours): classes_to_schedule.append({'courseName': course.name, 'facultyName': course.faculty})
-    random.shuffle(classes_to_schedule)
-    schedule, unplaced_courses = {day: {} for day in days}, []
-    for class_item in classes_to_schedule:
-        placed = False
-        faculty = class_item['facultyName']
-        possible_slots = [(d, t, r) for d in days for t in time_slots for r in rooms]
-        random.shuffle(possible_slots)
-        for day, time, room in possible_slots:
-            if not ((day, time, faculty) in faculty_schedule) and not ((day, time, room) in room_schedule) and not (time in schedule[day]):
-                schedule[day][time] = {'courseName': class_item['courseName'], 'facultyName': faculty, 'roomName': room}
-                faculty_schedule.add((day, time, faculty)); room_schedule.add((day, time, room))
-                placed = True
-                break
-        if not placed: unplaced_courses.append(class_item['courseName'])
-    return schedule, list(set(unplaced_courses))
+def load_occupancy_grid(courses: list[schemas.CourseInput], rooms: list[str], include_lunch_break: bool):
+    faculty = [course.faculty for course in courses]
+    grid = timetable_engine.OccupancyGrid(timetable_engine.DAYS, timetable_engine.time_slots_for(include_lunch_break), rooms, faculty)
+    for day, time_slot, room_name, teacher_name in occupancy_index.index.busy_cells(rooms, faculty):
+        grid.mark_faculty(day, time_slot, teacher_name)
+        grid.mark_room(day, time_slot, room_name)
+    return grid
+
+def check_generate_payload(payload: schemas.GeneratePayload):
+    if not payload.courses or not payload.rooms: raise HTTPException(status_code=400, detail="Courses and rooms cannot be empty.")
+    if payload.engine not in ("random", "cpsat"): raise HTTPException(status_code=400, detail=f"Unknown engine '{payload.engine}'.")
+
+def generate_args(payload: schemas.GeneratePayload) -> tuple:
+    """timetable_engine.schedule_section arguments; the busy grid is read from this process's occupancy index."""
+    grid = load_occupancy_grid(payload.courses, payload.rooms, payload.includeLunchBreak)
+    return grid, payload.courses, payload.engine, payload.timeLimit, payload.numWorkers
 
 @app.post("/api/generate")
-async def generate_timetable(payload: schemas.GeneratePayload, db: Session = Depends(get_db)):
-    if not payload.courses or not payload.rooms: raise HTTPException(status_code=400, detail="Courses and rooms cannot be empty.")
+async def generate_timetable(payload: schemas.GeneratePayload):
+    check_generate_payload(payload)
+    try: return await run_in_threadpool(timetable_engine.schedule_section, *generate_args(payload))
+    except Exception as e: raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+def check_batch_payload(payload: schemas.GenerateBatchPayload):
+    if not payload.sections or not payload.rooms: raise HTTPException(status_code=400, detail="Sections and rooms cannot be empty.")
+    if payload.engine not in ("random", "cpsat"): raise HTTPException(status_code=400, detail=f"Unknown engine '{payload.engine}'.")
+    names = [s.sectionName for s in payload.sections]
+    if len(set(names)) != len(names): raise HTTPException(status_code=400, detail="Section names must be unique.")
+
+def batch_args(payload: schemas.GenerateBatchPayload) -> tuple:
+    """timetable_engine.generate_batch arguments, with busy cells taken from the occupancy index."""
+    section_rooms = {s.sectionName: s.rooms or payload.rooms for s in payload.sections}
+    busy = occupancy_index.index.busy_cells([r for rooms in section_rooms.values() for r in rooms], [c.faculty for s in payload.sections for c in s.courses])
+    return (timetable_engine.DAYS, timetable_engine.time_slots_for(payload.includeLunchBreak), section_rooms,
+            {s.sectionName: s.courses for s in payload.sections}, busy, payload.engine, payload.timeLimit, payload.numWorkers)
+
+def finish_batch(payload: schemas.GenerateBatchPayload, result: tuple) -> dict:
+    """Saves a generate_batch result when requested; runs in a worker thread, so it opens its own session."""
+    schedules, unplaced, stats = result
+    timings = None
+    if payload.save:
+        db = SessionLocal()
+        try: timings = schedule_store.bulk_save_schedules(db, schedules)
+        finally: db.close()
+    return {"schedules": schedules, "unplaced": unplaced, "engine": payload.engine, "saved": payload.save, "timings": timings, **stats}
+
+@app.post("/api/generate_batch")
+async def generate_timetable_batch(payload: schemas.GenerateBatchPayload):
+    check_batch_payload(payload)
     try:
-        schedule, unplaced = create_schedule_logic(db, payload.courses, payload.rooms, payload.includeLunchBreak)
-        return {"schedule": schedule, "unplaced": unplaced}
+        result = await run_in_threadpool(timetable_engine.generate_batch, *batch_args(payload))
+        return await run_in_threadpool(finish_batch, payload, result)
     except Exception as e: raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 # --- TIMETABLE: SAVE/DELETE ---
 @app.post("/api/save_schedule")
-async def save_schedule(payload: schemas.SaveSchedulePayload, db: Session = Depends(get_db)):
-    section = get_or_create(db, models.Section, payload.sectionName)
-    db.query(models.ScheduleEntry).filter(models.ScheduleEntry.section_id == section.id).delete()
-    new_entries = []
-    for day, time_slots in payload.schedule.items():
-        for time_slot, details in time_slots.items():
-            if details:
-                teacher = get_or_create(db, models.Teacher, details.facultyName)
-                course = get_or_create(db, models.Course, details.courseName)
-                room = get_or_create(db, models.Room, details.roomName)
-                
-                if course not in teacher.courses:
-                    teacher.courses.append(course)
-                    db.commit()
-                
-                new_entries.append(models.ScheduleEntry(section_id=section.id, day=day, time_slot=time_slot, course_id=course.id, teacher_id=teacher.id, room_id=room.id))
-    db.add_all(new_entries)
-    db.commit()
-    return {"message": f"Timetable for {section.name} saved successfully!"}
+def save_schedule(payload: schemas.SaveSchedulePayload, db: Session = Depends(get_db)):
+    schedule = {day: {time_slot: details.model_dump() for time_slot, details in time_slots.items() if details} for day, time_slots in payload.schedule.items()}
+    timings = schedule_store.bulk_save_schedules(db, {payload.sectionName: schedule})
+    return {"message": f"Timetable for {payload.sectionName} saved successfully!", "timings": timings}
 
 @app.post("/api/delete_schedule")
-async def delete_schedule(payload: schemas.DeleteSchedulePayload, db: Session = Depends(get_db)):
+def delete_schedule(payload: schemas.DeleteSchedulePayload, db: Session = Depends(get_db)):
     section = db.query(models.Section).filter(models.Section.name == payload.sectionName).first()
     if not section: raise HTTPException(status_code=404, detail=f"Schedule for '{payload.sectionName}' not found.")
-    db.query(models.ScheduleEntry).filter(models.ScheduleEntry.section_id == section.id).delete()
-    db.commit()
+    section_id = section.id
+    with occupancy_index.index.write_lock:  # commit and index update in the same order as other schedule writes
+        db.query(models.ScheduleEntry).filter(models.ScheduleEntry.section_id == section_id).delete()
+        db.commit()
+        occupancy_index.index.remove_section(section_id)
+    effective_schedule.cache.invalidate()
+    schedule_store.saved_cache.invalidate()
     return {"message": f"Schedule for {payload.sectionName} deleted."}
 
 @app.post("/api/clear_all_schedules")
-async def clear_all_schedules(db: Session = Depends(get_db)):
-    db.query(models.ScheduleOverride).delete()
-    db.query(models.ScheduleEntry).delete()
-    db.commit()
+def clear_all_schedules(db: Session = Depends(get_db)):
+    with occupancy_index.index.write_lock:
+        db.query(models.ScheduleOverride).delete()
+        db.query(models.ScheduleEntry).delete()
+        db.commit()
+        occupancy_index.index.clear_entries()
+    effective_schedule.cache.invalidate()
+    schedule_store.saved_cache.invalidate()
     return {"message": "Cleared all schedule entries and overrides."}
 
 # --- ADJUSTMENT LOGIC ---
-def find_solutions_for_conflict(conflict: models.ScheduleEntry, db: Session, all_days: list, all_time_slots: list):
-    solutions = []
-    conflict_course = db.query(models.Course).options(joinedload(models.Course.teachers)).get(conflict.course_id)
-    
-    for qualified_teacher in conflict_course.teachers:
-        if qualified_teacher.id == conflict.teacher_id: continue
-        is_busy = db.query(models.ScheduleEntry).filter(models.ScheduleEntry.teacher_id == qualified_teacher.id, models.ScheduleEntry.day == conflict.day, models.ScheduleEntry.time_slot == conflict.time_slot).first()
-        if not is_busy:
-            solutions.append(schemas.Solution(type="SUBSTITUTE", details=f"Assign {qualified_teacher.name}", new_teacher_id=qualified_teacher.id))
-    
-    occupied_section_slots = {(e.day, e.time_slot) for e in db.query(models.ScheduleEntry).filter(models.ScheduleEntry.section_id == conflict.section_id).all()}
-    occupied_teacher_slots = {(e.day, e.time_slot) for e in db.query(models.ScheduleEntry).filter(models.ScheduleEntry.teacher_id == conflict.teacher_id).all()}
-    potential_slots = [{'day': day, 'time': time} for day in all_days for time in all_time_slots if (day, time) not in occupied_section_slots and (day, time) not in occupied_teacher_slots]
-    random.shuffle(potential_slots)
-    
-    reschedule_count = 0
-    for slot in potential_slots:
-        if reschedule_count >= 3: break
-        occupied_rooms = {e.room_id for e in db.query(models.ScheduleEntry).filter(models.ScheduleEntry.day == slot['day'], models.ScheduleEntry.time_slot == slot['time']).all()}
-        all_rooms = {r.id for r in db.query(models.Room).all()}
-        available_rooms = all_rooms - occupied_rooms
-        if available_rooms:
-            free_room_id = available_rooms.pop()
-            free_room = db.query(models.Room).get(free_room_id)
-            solutions.append(schemas.Solution(type="RESCHEDULE", details=f"Move to {slot['day']}, {slot['time']} in {free_room.name}", new_day=slot['day'], new_time_slot=slot['time'], new_room_id=free_room_id))
-            reschedule_count += 1
-    return solutions
-
 @app.post("/api/adjustments/find-solutions", response_model=schemas.AdjustmentSolutionPayload)
-async def find_adjustment_solutions(payload: schemas.TeacherLeavePayload, db: Session = Depends(get_db)):
+def find_adjustment_solutions(payload: schemas.TeacherLeavePayload, db: Session = Depends(get_db)):
     teacher = db.query(models.Teacher).filter(models.Teacher.name == payload.teacher_name).first()
     if not teacher: raise HTTPException(status_code=404, detail="Teacher not found")
     conflicts = db.query(models.ScheduleEntry).options(joinedload(models.ScheduleEntry.course), joinedload(models.ScheduleEntry.section)).filter(models.ScheduleEntry.teacher_id == teacher.id).all()
     if not conflicts: return schemas.AdjustmentSolutionPayload(solutions=[])
-    days, slots = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'], ['9:00 AM', '10:00 AM', '11:00 AM', '12:00 PM', '1:00 PM', '2:00 PM', '3:00 PM', '4:00 PM', '5:00 PM']
-    proposed = [schemas.Conflict(conflict_entry_id=e.id, original_class=f"{e.course.name} ({e.section.name}) on {e.day} at {e.time_slot}", solutions=find_solutions_for_conflict(e, db, days, slots)) for e in conflicts]
+    snapshot = adjustments.AvailabilitySnapshot.load(db, occupancy_index.index)
+    proposed = [schemas.Conflict(conflict_entry_id=e.id, original_class=f"{e.course.name} ({e.section.name}) on {e.day} at {e.time_slot}", solutions=adjustments.find_solutions_for_conflict(e, snapshot)) for e in conflicts]
     return schemas.AdjustmentSolutionPayload(solutions=proposed)
 
 @app.post("/api/adjustments/apply-solution")
-async def apply_adjustment_solution(payload: schemas.ApplySolutionPayload, db: Session = Depends(get_db)):
+def apply_adjustment_solution(payload: schemas.ApplySolutionPayload, db: Session = Depends(get_db)):
     original_entry = db.query(models.ScheduleEntry).get(payload.entry_id_to_update)
     if not original_entry: raise HTTPException(status_code=404, detail="Original schedule entry not found")
     solution = payload.solution
@@ -211,10 +241,24 @@ async def apply_adjustment_solution(payload: schemas.ApplySolutionPayload, db: S
         new_override.new_room_id = solution.new_room_id
     db.add(new_override)
     db.commit()
+    effective_schedule.cache.invalidate(override_date)
     return {"message": f"Override for {override_date} has been saved."}
 
+@app.post("/api/adjustments/plan-leave", response_model=schemas.LeavePlan)
+def plan_teacher_leave(payload: schemas.LeavePlanPayload, db: Session = Depends(get_db)):
+    teacher = db.query(models.Teacher).filter(models.Teacher.name == payload.teacher_name).first()
+    if not teacher: raise HTTPException(status_code=404, detail="Teacher not found")
+    try: return adjustments.plan_leave(db, teacher, payload.start_date, payload.end_date, payload.timeLimit, payload.numWorkers)
+    except ValueError as e: raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/adjustments/apply-plan")
+def apply_leave_plan(payload: schemas.ApplyPlanPayload, db: Session = Depends(get_db)):
+    try: applied = adjustments.apply_plan(db, payload.assignments)
+    except LookupError as e: raise HTTPException(status_code=404, detail=str(e))
+    return {"message": f"{applied} overrides saved.", "applied": applied}
+
 @app.get("/api/schedule/view/{section_name}")
-async def get_daily_schedule(section_name: str, view_date: date, db: Session = Depends(get_db)):
+def get_daily_schedule(section_name: str, view_date: date, db: Session = Depends(get_db)):
     section = db.query(models.Section).filter(models.Section.name == section_name).first()
     if not section: raise HTTPException(status_code=404, detail="Section not found")
     
@@ -234,6 +278,13 @@ async def get_daily_schedule(section_name: str, view_date: date, db: Session = D
     ]
     return {"overrides": overrides}
 
+@app.get("/api/schedule/effective")
+def get_effective_schedules(view_date: date, sections: Optional[List[str]] = Query(None), db: Session = Depends(get_db)):
+    """Every section's classes on `view_date` with overrides applied (or only `sections`), cached per date."""
+    resolved = effective_schedule.cache.get(db, view_date)
+    if sections: resolved = {name: resolved[name] for name in sections if name in resolved}
+    return {"date": view_date, "sections": resolved}
+
 # --- ANNOUNCEMENTS ---
 @app.get("/api/classrooms/{classroom_id}/announcements", response_model=List[schemas.Announcement])
 async def get_announcements(classroom_id: str):
@@ -275,178 +326,155 @@ async def get_classrooms_data(): return [{"id": "EC201", "name": "Digital Electr
 
 
 # --- SMART SEAT LOGIC (OR-TOOLS) ---
+async def parse_in_pool(parser, filename: str, contents: bytes):
+    """Runs `parser` in ingest's process pool; a pool broken by a dead worker (e.g. out of memory) is replaced and the file retried once."""
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = ingest.process_pool()
+        try: return await loop.run_in_executor(pool, parser, filename, contents)
+        except BrokenProcessPool:
+            ingest.reset_pool(pool)
+            if attempt: raise
+
+async def parse_uploads_in_pool(files: List[UploadFile], parser) -> list:
+    """Parses the files concurrently; on the first error (a file too large or unparsable) the others are cancelled and awaited before it propagates."""
+    pending = []
+    try:
+        for file in files:
+            if not file.filename: continue
+            ingest.check_size(file.file)
+            pending.append((file.filename, asyncio.ensure_future(parse_in_pool(parser, file.filename, await file.read()))))
+        parts = []
+        for filename, future in pending:
+            try: parts.append(await future)
+            except Exception as e: raise HTTPException(500, f"Error parsing {filename}: {str(e)}")
+        return parts
+    finally:
+        for _, future in pending: future.cancel()  # no-op for the finished ones
+        await asyncio.gather(*(future for _, future in pending), return_exceptions=True)
+
+def columnar_response(key: str, columns: dict, format: str):
+    if format == "columns": return StreamingResponse(ingest.iter_columnar_json(key, columns), media_type="application/json")
+    return {key: ingest.to_records(columns)}
+
 @app.post("/api/parse/students")
-async def parse_students_file(files: List[UploadFile] = File(...)):
-    all_students = []
-    for file in files:
-        if not file.filename: continue
-        try:
-            contents = await file.read()
-            if file.filename.endswith('.csv'): df = pd.read_csv(io.BytesIO(contents))
-            else: df = pd.read_excel(io.BytesIO(contents))
-            
-            df.columns = [str(col).strip().lower().replace(" ", "").replace("_", "") for col in df.columns]
-            if 'name' not in df.columns or 'branch' not in df.columns: continue
-            
-            for _, row in df.iterrows():
-                if pd.notna(row.get('name')) and pd.notna(row.get('branch')):
-                    all_students.append({
-                        "name": str(row['name']),
-                        "roll_no": str(row['rollno']) if 'rollno' in df.columns and pd.notna(row['rollno']) else "N/A",
-                        "branch": str(row['branch'])
-                    })
-        except Exception as e: raise HTTPException(500, f"Error parsing {file.filename}: {str(e)}")
-    return {"students": all_students}
+async def parse_students_file(files: List[UploadFile] = File(...), format: str = "records"):
+    try: parts = await parse_uploads_in_pool(files, ingest.parse_students_bytes)
+    except ingest.UploadTooLarge as e: raise HTTPException(413, str(e))
+    columns = ingest.dedupe_students(ingest.concat_columns(parts))
+    return columnar_response("students", columns, format)
 
 @app.post("/api/parse/rooms")
-async def parse_rooms_file(files: List[UploadFile] = File(...)):
-    all_rooms = []
-    for file in files:
-        if not file.filename: continue
-        try:
-            contents = await file.read()
-            if file.filename.endswith('.csv'): df = pd.read_csv(io.BytesIO(contents))
-            else: df = pd.read_excel(io.BytesIO(contents))
-            
-            df.columns = [str(col).strip().lower().replace(" ", "").replace("_", "") for col in df.columns]
-            col_map = {c: c for c in df.columns}
-            for c in df.columns:
-                if 'room' in c: col_map['name'] = c
-                if 'row' in c: col_map['rows'] = c
-                if 'col' in c: col_map['cols'] = c
-                
-            if 'name' not in col_map or 'rows' not in col_map or 'cols' not in col_map: continue
-                 
-            for _, row in df.iterrows():
-                if pd.notna(row.get(col_map['name'])):
-                    all_rooms.append({
-                        "name": str(row[col_map['name']]),
-                        "rows": int(row[col_map['rows']]),
-                        "cols": int(row[col_map['cols']])
-                    })
-        except Exception as e: raise HTTPException(500, f"Error parsing {file.filename}: {str(e)}")
-    return {"rooms": all_rooms}
-
-def solve_seating_cp_sat(students, rooms):
-    model = cp_model.CpModel()
-    unique_branches = sorted(list(set(s.branch for s in students)))
-    branch_to_id = {b: i + 1 for i, b in enumerate(unique_branches)}
-    branch_counts = defaultdict(int)
-    students_by_branch = defaultdict(list)
-    for s in students:
-        branch_counts[branch_to_id[s.branch]] += 1
-        students_by_branch[branch_to_id[s.branch]].append(s)
-
-    total_students = len(students)
-    total_capacity = sum(r.rows * r.cols for r in rooms)
-    
-    if total_students > total_capacity:
-        raise ValueError(f"Not enough seats! Students: {total_students}, Capacity: {total_capacity}")
-
-    grid_vars = {}
-    is_occupied_vars = {}
-    penalty_vars = []
-
-    for r_idx, room in enumerate(rooms):
-        for r in range(room.rows):
-            for c in range(room.cols):
-                seat_key = (r_idx, r, c)
-                var = model.NewIntVar(0, len(unique_branches), f'seat_{r_idx}_{r}_{c}')
-                grid_vars[seat_key] = var
-                is_occ = model.NewBoolVar(f'occ_{r_idx}_{r}_{c}')
-                model.Add(var > 0).OnlyEnforceIf(is_occ)
-                model.Add(var == 0).OnlyEnforceIf(is_occ.Not())
-                is_occupied_vars[seat_key] = is_occ
-
-    for b_id, count in branch_counts.items():
-        bools_for_branch = []
-        for seat_key, var in grid_vars.items():
-            b_var = model.NewBoolVar(f'{seat_key}_is_{b_id}')
-            model.Add(var == b_id).OnlyEnforceIf(b_var)
-            model.Add(var != b_id).OnlyEnforceIf(b_var.Not())
-            bools_for_branch.append(b_var)
-        model.Add(sum(bools_for_branch) == count)
-
-    HORIZONTAL_PENALTY = 1000 
-    VERTICAL_PENALTY = 10     
-
-    for r_idx, room in enumerate(rooms):
-        for r in range(room.rows):
-            for c in range(room.cols):
-                current_seat = grid_vars[(r_idx, r, c)]
-                if c < room.cols - 1:
-                    right_seat = grid_vars[(r_idx, r, c + 1)]
-                    is_same_h = model.NewBoolVar(f'conflict_h_{r_idx}_{r}_{c}')
-                    seats_equal = model.NewBoolVar(f'eq_h_{r_idx}_{r}_{c}')
-                    model.Add(current_seat == right_seat).OnlyEnforceIf(seats_equal)
-                    model.Add(current_seat != right_seat).OnlyEnforceIf(seats_equal.Not())
-                    curr_not_empty = is_occupied_vars[(r_idx, r, c)]
-                    model.AddBoolAnd([seats_equal, curr_not_empty]).OnlyEnforceIf(is_same_h)
-                    model.AddBoolOr([seats_equal.Not(), curr_not_empty.Not()]).OnlyEnforceIf(is_same_h.Not())
-                    penalty_vars.append(is_same_h * HORIZONTAL_PENALTY)
-
-                if r < room.rows - 1:
-                    down_seat = grid_vars[(r_idx, r + 1, c)]
-                    is_same_v = model.NewBoolVar(f'conflict_v_{r_idx}_{r}_{c}')
-                    seats_equal_v = model.NewBoolVar(f'eq_v_{r_idx}_{r}_{c}')
-                    model.Add(current_seat == down_seat).OnlyEnforceIf(seats_equal_v)
-                    model.Add(current_seat != down_seat).OnlyEnforceIf(seats_equal_v.Not())
-                    curr_not_empty_v = is_occupied_vars[(r_idx, r, c)]
-                    model.AddBoolAnd([seats_equal_v, curr_not_empty_v]).OnlyEnforceIf(is_same_v)
-                    model.AddBoolOr([seats_equal_v.Not(), curr_not_empty_v.Not()]).OnlyEnforceIf(is_same_v.Not())
-                    penalty_vars.append(is_same_v * VERTICAL_PENALTY)
-
-    if penalty_vars:
-        model.Minimize(sum(penalty_vars))
-
-    ideal_per_room = total_students / len(rooms)
-    min_per_room = math.floor(ideal_per_room)
-    max_per_room = math.ceil(ideal_per_room)
-    
-    for r_idx, room in enumerate(rooms):
-        room_seats = [is_occupied_vars[(r_idx, r, c)] for r in range(room.rows) for c in range(room.cols)]
-        model.Add(sum(room_seats) >= min_per_room)
-        model.Add(sum(room_seats) <= max_per_room)
-
-    solver = cp_model.CpSolver()
-    status = solver.Solve(model)
-
-    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-        raise ValueError("No valid seating arrangement found! Try adding more rooms.")
-
-    assignments = []
-    unplaced = []
-    for b in students_by_branch: random.shuffle(students_by_branch[b])
-
-    for r_idx, room in enumerate(rooms):
-        for r in range(room.rows):
-            for c in range(room.cols):
-                seat_key = (r_idx, r, c)
-                val = solver.Value(grid_vars[seat_key])
-                if val > 0:
-                    if students_by_branch[val]:
-                        student = students_by_branch[val].pop(0)
-                        assignments.append(schemas.SeatAssignment(
-                            student=student, room_name=room.name, row=r + 1, col=c + 1
-                        ))
-    return assignments, unplaced
+async def parse_rooms_file(files: List[UploadFile] = File(...), format: str = "records"):
+    try: parts = await parse_uploads_in_pool(files, ingest.parse_rooms_bytes)
+    except ingest.UploadTooLarge as e: raise HTTPException(413, str(e))
+    columns = ingest.concat_columns(parts) or {"name": [], "rows": [], "cols": []}
+    return columnar_response("rooms", columns, format)
 
 @app.post("/api/generate_exam_seating", response_model=schemas.ExamSeatingResponse)
 async def generate_exam_seating(payload: schemas.ExamSeatingPayload):
     try:
         if not payload.students or not payload.rooms: raise ValueError("Students and Rooms data required")
-        assignments, unplaced = solve_seating_cp_sat(payload.students, payload.rooms)
-        return schemas.ExamSeatingResponse(assignments=assignments, unplaced=unplaced)
+        assignments, unplaced, stats = await run_in_threadpool(seating.solve_seating, payload.students, payload.rooms, payload.engine, payload.timeLimit, payload.numWorkers, use_cache=payload.useCache, accept_cached=payload.acceptCached)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
+    return fast_json.object_response(seating_result(assignments, unplaced, stats))
+
+def seating_result(assignments: list, unplaced: list, stats: dict) -> dict:
+    """The schemas.ExamSeatingResponse body, built from seating's dict rows without re-validating them."""
+    return {"assignments": assignments, "unplaced": [seating.student_row(s) for s in unplaced], "stats": stats}
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {fast_json.dumps(data).decode()}\n\n"
+
+@app.post("/api/generate_exam_seating/stream")
+async def stream_exam_seating(payload: schemas.ExamSeatingPayload):
+    """Server-Sent Events: a `progress` event per improving layout, then `result` (or `error`)."""
+    if not payload.students or not payload.rooms: raise HTTPException(status_code=400, detail="Students and Rooms data required")
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    def report(progress): loop.call_soon_threadsafe(queue.put_nowait, ("progress", progress))
+
+    async def events():
+        # run_in_threadpool, not the loop's executor: the solve counts against the limiter configure_thread_pool sizes
+        solve = asyncio.ensure_future(run_in_threadpool(seating.solve_seating, payload.students, payload.rooms, payload.engine, payload.timeLimit, payload.numWorkers, report, payload.useCache, payload.acceptCached))
+        solve.add_done_callback(lambda _: queue.put_nowait(("done", None)))
+        while True:
+            event, data = await queue.get()
+            if event == "done": break
+            yield sse(event, data)
+        try:
+            assignments, unplaced, stats = solve.result()
+            yield sse("result", seating_result(assignments, unplaced, stats))
+        except Exception as e:
+            yield sse("error", {"detail": f"Optimization failed: {str(e)}"})
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.delete("/api/generate_exam_seating/cache")
+async def clear_seating_cache():
+    seating.layout_cache.clear()
+    return {"message": "Seating layout cache cleared"}
+
+# --- BACKGROUND JOBS ---
+# Long solves run in child processes (see jobs.py); poll GET /api/jobs/{id} and fetch /result when done.
+# `max_seconds` is a hard wall-clock limit on top of the solver's own timeLimit.
+@app.post("/api/jobs/generate", status_code=202)
+async def submit_generate_job(payload: schemas.GeneratePayload, max_seconds: Optional[float] = None):
+    check_generate_payload(payload)
+    return jobs.manager.submit("generate", timetable_engine.schedule_section, *generate_args(payload), time_limit=max_seconds).to_dict()
+
+@app.post("/api/jobs/generate_batch", status_code=202)
+async def submit_generate_batch_job(payload: schemas.GenerateBatchPayload, max_seconds: Optional[float] = None):
+    check_batch_payload(payload)
+    return jobs.manager.submit("generate_batch", timetable_engine.generate_batch, *batch_args(payload), time_limit=max_seconds, on_result=lambda result: finish_batch(payload, result)).to_dict()
+
+@app.post("/api/jobs/exam_seating", status_code=202)  # plain def: the cache lookup and a hit's finish() block
+def submit_exam_seating_job(payload: schemas.ExamSeatingPayload, max_seconds: Optional[float] = None):
+    if not payload.students or not payload.rooms: raise HTTPException(status_code=400, detail="Students and Rooms data required")
+    try: state = seating.start_seating(payload.students, payload.rooms, payload.engine, payload.useCache, payload.timeLimit, payload.acceptCached)
+    except ValueError as e: raise HTTPException(status_code=400, detail=str(e))
+    def finish(layout_result=()):
+        return seating_result(*seating.finish_seating(state, *layout_result))
+    if state["layouts"] is not None: return jobs.manager.record("exam_seating", finish()).to_dict()
+    return jobs.manager.submit(
+        "exam_seating", seating.SEATING_ENGINES[payload.engine], payload.rooms, state["branch_counts"], payload.timeLimit, payload.numWorkers,
+        time_limit=max_seconds, on_result=finish
+    ).to_dict()
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = jobs.manager.get(job_id)
+    if not job: raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict()
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = jobs.manager.get(job_id)
+    if not job: raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job.status in (jobs.QUEUED, jobs.RUNNING): return JSONResponse(status_code=202, content=job.to_dict())
+    if job.status == jobs.FAILED: raise HTTPException(status_code=500, detail=job.error)
+    if job.status != jobs.DONE: raise HTTPException(status_code=409, detail=f"Job {job.status}: {job.error}")
+    return fast_json.object_response(job.result) if isinstance(job.result, dict) else job.result
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = jobs.manager.cancel(job_id)
+    if not job: raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict()
 
 # --- COMMUNITY ENDPOINTS ---
 @app.get("/api/community/posts", response_model=List[schemas.PostResponse])
-async def get_community_posts(db: Session = Depends(get_db)):
-    return db.query(models.CommunityPost).order_by(models.CommunityPost.created_at.desc()).all()
+def get_community_posts(
+    cursor: Optional[str] = None, limit: int = Query(community_feed.DEFAULT_PAGE, ge=1, le=community_feed.MAX_PAGE),
+    tag: Optional[str] = None, role: Optional[str] = None, q: Optional[str] = None, db: Session = Depends(get_db),
+):
+    """One page of the feed, newest first, optionally one tag / role or posts matching the words in `q`. X-Next-Cursor carries the next page's cursor."""
+    try: posts, next_cursor = community_feed.page(db, cursor, limit, tag, role, q)
+    except ValueError as e: raise HTTPException(status_code=400, detail=str(e))
+    return fast_json.FastJSONResponse(posts, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
 
 @app.post("/api/community/posts", response_model=schemas.PostResponse)
-async def create_community_post(
+def create_community_post(
     title: str = Form(...),
     content: str = Form(...),
     author: str = Form(...),
@@ -459,29 +487,28 @@ async def create_community_post(
     if password != "admin123":
         raise HTTPException(status_code=401, detail="Invalid admin password")
 
-    attachment_url = None
-    if file:
-        file_path = f"{UPLOAD_DIR}/{file.filename}"
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        attachment_url = f"/uploads/{file.filename}"
-
-    new_post = models.CommunityPost(
-        title=title,
-        content=content,
-        author=author,
-        role=role,
-        tag=tag,
-        attachment_url=attachment_url,
-        created_at=datetime.now()
-    )
-    db.add(new_post)
-    db.commit()
+    received = None
+    if file and file.filename:  # a plain def, so the chunked copy runs in the thread pool
+        try: received = attachment_store.receive(file.file, file.filename)
+        except ingest.UploadTooLarge as e: raise HTTPException(status_code=413, detail=str(e))
+
+    with attachment_store.lock:  # a delete must not unlink a deduplicated file before this post links it
+        new_post = models.CommunityPost(
+            title=title,
+            content=content,
+            author=author,
+            role=role,
+            tag=tag,
+            attachment_url=attachment_store.link(*received)["url"] if received else None,
+            created_at=datetime.now()
+        )
+        db.add(new_post)
+        db.commit()
     db.refresh(new_post)
     return new_post
 
 @app.delete("/api/community/posts/{post_id}")
-async def delete_community_post(
+def delete_community_post(
     post_id: int, 
     password: str = Header(None), 
     db: Session = Depends(get_db)
@@ -493,61 +520,86 @@ async def delete_community_post(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    if post.attachment_url:
+    attachment = attachment_store.name_of(post.attachment_url)
+    if post.attachment_url and not attachment:  # legacy upload under its client filename
         try:
             file_name = post.attachment_url.split('/')[-1]
             os.remove(f"{UPLOAD_DIR}/{file_name}")
         except:
             pass
 
+    attachment_url = post.attachment_url
     db.delete(post)
     db.commit()
+    # Stored once per content: the file goes with the last post that links it
+    with attachment_store.lock:
+        if attachment and not db.query(models.CommunityPost.id).filter(models.CommunityPost.attachment_url == attachment_url).first():
+            attachment_store.remove(attachment)
     return {"message": "Post deleted"}
 
+@app.get("/api/attachments/{name}")
+def get_attachment(name: str, if_none_match: Optional[str] = Header(None)):
+    """A stored attachment. The name is its content hash, so it is cached for good; Range requests are honoured."""
+    try: file_path = attachment_store.path(name)
+    except ValueError: raise HTTPException(status_code=404, detail="Attachment not found")
+    if not os.path.isfile(file_path): raise HTTPException(status_code=404, detail="Attachment not found")
+    etag = f'"{name.split(".")[0]}"'
+    headers = {"ETag": etag, "Cache-Control": attachment_store.CACHE_CONTROL}
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")): return Response(status_code=304, headers=headers)
+    return FileResponse(file_path, media_type=attachment_store.media_type(name), headers=headers)
+
 # --- ATTENDANCE ENDPOINTS ---
 @app.get("/api/attendance/{classroom_id}/{date_str}", response_model=List[schemas.AttendanceResponse])
-async def get_attendance(classroom_id: str, date_str: str, db: Session = Depends(get_db)):
+def get_attendance(classroom_id: str, date_str: str, db: Session = Depends(get_db)):
     try:
         target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
         
-    records = db.query(models.AttendanceRecord).filter(
-        models.AttendanceRecord.classroom_id == classroom_id,
-        models.AttendanceRecord.date == target_date
-    ).all()
-    return records
+    archived = attendance_archive.read_day(db, classroom_id, target_date)
+    if archived is not None: return fast_json.list_response(archived)
+    Record = models.AttendanceRecord
+    rows = db.execute(select(Record.classroom_id, Record.date, Record.student_roll, Record.student_name, Record.status, Record.remarks, Record.id)
+        .where(Record.classroom_id == classroom_id, Record.date == target_date)).mappings()
+    return fast_json.list_response([dict(r) for r in rows])
 
 @app.post("/api/attendance")
-async def save_attendance(payload: schemas.BulkAttendancePayload, db: Session = Depends(get_db)):
+def save_attendance(payload: schemas.BulkAttendancePayload, db: Session = Depends(get_db)):
     if not payload.records:
         return {"message": "No records to save"}
     
-    first = payload.records[0]
-    
-    # Clean up existing records for this class/date to strictly overwrite
-    db.query(models.AttendanceRecord).filter(
-        models.AttendanceRecord.classroom_id == first.classroom_id,
-        models.AttendanceRecord.date == first.date
-    ).delete()
-    
-    new_records = [
-        models.AttendanceRecord(
-            classroom_id=r.classroom_id,
-            date=r.date,
-            student_roll=r.student_roll,
-            student_name=r.student_name,
-            status=r.status,
-            remarks=r.remarks # Now supports remarks properly
-        ) for r in payload.records
-    ]
-    db.add_all(new_records)
-    db.commit()
-    return {"message": "Attendance saved successfully"}
+    # Each (classroom, date) in the payload is that day's whole register and replaces the saved one
+    saved = attendance_store.save_records(db, [r.model_dump() for r in payload.records])
+    return {"message": "Attendance saved successfully", **saved}
+
+@app.post("/api/attendance/import")
+def import_attendance(file: UploadFile = File(...), replace_days: bool = False, db: Session = Depends(get_db)):
+    """Historical attendance CSV (classroom_id, date, student_roll, student_name, status[, remarks]), upserted in chunks."""
+    try: return attendance_store.import_csv(db, file.file, replace_days)
+    except ingest.UploadTooLarge as e: raise HTTPException(413, str(e))
+    except ValueError as e: raise HTTPException(400, str(e))
+
+# --- ATTENDANCE ANALYTICS ---
+# Full months in the range are read from the attendance_rollups table, partial months from the log.
+def attendance_report(report, *args, **kwargs):
+    try: return fast_json.list_response(report(*args, **kwargs))
+    except ValueError as e: raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/analytics/attendance/students")
+def get_student_attendance(start: Optional[date] = None, end: Optional[date] = None, classroom_id: Optional[str] = None, student_roll: Optional[str] = None, db: Session = Depends(get_db)):
+    return attendance_report(attendance_analytics.students, db, start, end, classroom_id, student_roll)
+
+@app.get("/api/analytics/attendance/classrooms")
+def get_classroom_attendance(start: Optional[date] = None, end: Optional[date] = None, threshold: float = Query(attendance_analytics.DEFAULTER_THRESHOLD, ge=0, le=100), db: Session = Depends(get_db)):
+    return attendance_report(attendance_analytics.classrooms, db, start, end, threshold)
+
+@app.get("/api/analytics/attendance/defaulters")
+def get_attendance_defaulters(start: Optional[date] = None, end: Optional[date] = None, classroom_id: Optional[str] = None, threshold: float = Query(attendance_analytics.DEFAULTER_THRESHOLD, ge=0, le=100), db: Session = Depends(get_db)):
+    return attendance_report(attendance_analytics.defaulters, db, start, end, classroom_id, threshold)
 
 # --- NEW: COMPLAINT ENDPOINTS ---
 @app.post("/api/complaints", response_model=schemas.ComplaintResponse)
-async def create_complaint(complaint: schemas.ComplaintCreate, db: Session = Depends(get_db)):
+def create_complaint(complaint: schemas.ComplaintCreate, db: Session = Depends(get_db)):
     new_complaint = models.Complaint(
         name=complaint.name,
         email=complaint.email,
@@ -560,11 +612,14 @@ async def create_complaint(complaint: schemas.ComplaintCreate, db: Session = Dep
     return new_complaint
 
 @app.get("/api/complaints", response_model=List[schemas.ComplaintResponse])
-async def get_all_complaints(db: Session = Depends(get_db)):
-    return db.query(models.Complaint).order_by(models.Complaint.created_at.desc()).all()
+def get_all_complaints(db: Session = Depends(get_db)):
+    Complaint = models.Complaint
+    rows = db.execute(select(Complaint.name, Complaint.email, Complaint.subject, Complaint.message, Complaint.id, Complaint.status, Complaint.created_at)
+        .order_by(Complaint.created_at.desc())).mappings()
+    return fast_json.list_response([dict(r) for r in rows])
 
 @app.post("/api/complaints/{complaint_id}/resolve")
-async def resolve_complaint(complaint_id: int, db: Session = Depends(get_db)):
+def resolve_complaint(complaint_id: int, db: Session = Depends(get_db)):
     complaint = db.query(models.Complaint).filter(models.Complaint.id == complaint_id).first()
     if not complaint:
         raise HTTPException(status_code=404, detail="Complaint not found")
@@ -0,0 +1,175 @@
+"""
+Versioned, in-place schema migrations for the SQLite database. The schema version lives in
+PRAGMA user_version; each migration runs in one transaction together with the version bump.
+
+    python migrations.py           # upgrade to the latest version
+    python migrations.py --status  # print the current and latest versions
+    python migrations.py --check   # upgrade, then fail if a hot query plans a full table scan
+    python migrations.py --reslot  # upgrade, then recompute schedule_entries.slot after a calendar change
+    python migrations.py --rollups # upgrade, then rebuild the attendance rollups from the log
+"""
+import sys
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+import attendance_analytics
+import community_feed
+import models
+import timetable_engine
+
+def reslot(dbapi) -> int:
+    """Recomputes schedule_entries.slot from day and time_slot for the configured calendar; returns the rows changed."""
+    rows = dbapi.execute("SELECT id, day, time_slot, slot FROM schedule_entries").fetchall()
+    changed = [(timetable_engine.slot_id(day, time_slot), entry_id) for entry_id, day, time_slot, slot in rows
+               if timetable_engine.slot_id(day, time_slot) != slot]
+    dbapi.executemany("UPDATE schedule_entries SET slot = ? WHERE id = ?", changed)
+    return len(changed)
+
+def add_slot_column(dbapi):
+    columns = {row[1] for row in dbapi.execute("PRAGMA table_info(schedule_entries)")}
+    if "slot" not in columns: dbapi.execute("ALTER TABLE schedule_entries ADD COLUMN slot INTEGER")
+    reslot(dbapi)
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_schedule_entries_slot ON schedule_entries (slot)",
+        "CREATE INDEX IF NOT EXISTS ix_schedule_entries_teacher_slot ON schedule_entries (teacher_id, slot)",
+        "CREATE INDEX IF NOT EXISTS ix_schedule_entries_room_slot ON schedule_entries (room_id, slot)",
+        "ANALYZE schedule_entries",
+    ): dbapi.execute(statement)
+
+# The rollup backfill as migrations 3 and 4 ran it, frozen: attendance_analytics.REBUILD_SQL follows the live schema
+ROLLUP_BACKFILL_SQL = [
+    "DELETE FROM attendance_rollups",
+    """INSERT INTO attendance_rollups (classroom_id, student_roll, month, student_name, attended, total)
+        SELECT classroom_id, student_roll, date(date, 'start of month'), max(student_name),
+               sum(status IN ('P', 'L', 'Present', 'Late')), count(*)
+        FROM attendance_log_v1 GROUP BY classroom_id, student_roll, date(date, 'start of month')""",
+]
+
+# (version, description, SQL statements or a callable taking a DB-API connection). Append only.
+MIGRATIONS = [
+    (1, "Composite indexes for the hot schedule, override, leave and attendance filters", [
+        "CREATE INDEX IF NOT EXISTS ix_schedule_entries_teacher_day_slot ON schedule_entries (teacher_id, day, time_slot)",
+        "CREATE INDEX IF NOT EXISTS ix_schedule_entries_section ON schedule_entries (section_id)",
+        "CREATE INDEX IF NOT EXISTS ix_schedule_entries_day_slot ON schedule_entries (day, time_slot)",
+        "CREATE INDEX IF NOT EXISTS ix_schedule_overrides_date ON schedule_overrides (override_date)",
+        "CREATE INDEX IF NOT EXISTS ix_schedule_overrides_entry ON schedule_overrides (original_entry_id)",
+        "CREATE INDEX IF NOT EXISTS ix_teacher_leaves_teacher_start ON teacher_leaves (teacher_id, start_date)",
+        "CREATE INDEX IF NOT EXISTS ix_attendance_classroom_date ON attendance_log_v1 (classroom_id, date)",
+        "ANALYZE",
+    ]),
+    (2, "Integer calendar slot on schedule entries, backfilled, with slot indexes", add_slot_column),
+    (3, "Date index on the attendance log; backfill the monthly attendance rollups", [
+        "CREATE INDEX IF NOT EXISTS ix_attendance_date ON attendance_log_v1 (date)",
+        *ROLLUP_BACKFILL_SQL,
+        "ANALYZE attendance_log_v1",
+    ]),
+    (4, "One attendance row per classroom, date and student: drop duplicates, key the upserts on a unique index", [
+        "DELETE FROM attendance_log_v1 WHERE id NOT IN (SELECT max(id) FROM attendance_log_v1 GROUP BY classroom_id, date, student_roll)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_attendance_classroom_date_roll ON attendance_log_v1 (classroom_id, date, student_roll)",
+        "DROP INDEX IF EXISTS ix_attendance_classroom_date",  # a prefix of the unique index
+        *ROLLUP_BACKFILL_SQL,
+    ]),
+    (5, "Keyset indexes for the community feed; FTS5 search index over posts, kept in sync by triggers", [
+        "UPDATE community_posts SET created_at = '1970-01-01 00:00:00.000000' WHERE created_at IS NULL",  # the cursor needs a timestamp
+        "CREATE INDEX IF NOT EXISTS ix_community_posts_created ON community_posts (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_community_posts_tag_created ON community_posts (tag, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_community_posts_role_created ON community_posts (role, created_at, id)",
+        *community_feed.FTS_SQL,
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def current_version(engine) -> int:
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+def upgrade(engine, target: int = LATEST_VERSION) -> list:
+    """Applies the pending migrations up to `target`; returns the versions applied."""
+    applied = []
+    raw = engine.raw_connection()
+    try:
+        dbapi = raw.driver_connection
+        dbapi.isolation_level = None  # explicit BEGIN so DDL is transactional too
+        version = dbapi.execute("PRAGMA user_version").fetchone()[0]
+        for number, _, steps in MIGRATIONS:
+            if number <= version or number > target: continue
+            dbapi.execute("BEGIN IMMEDIATE")
+            try:
+                if callable(steps): steps(dbapi)
+                else:
+                    for statement in steps: dbapi.execute(statement)
+                dbapi.execute(f"PRAGMA user_version = {number}")
+                dbapi.execute("COMMIT")
+            except Exception:
+                dbapi.execute("ROLLBACK")
+                raise
+            applied.append(number)
+    finally:
+        raw.driver_connection.isolation_level = ""
+        raw.close()
+    return applied
+
+# --- QUERY PLAN CHECK ---
+# The filters the endpoints, the occupancy index and the leave planner run against large tables.
+HOT_QUERIES = {
+    "entries by teacher, day and slot": select(models.ScheduleEntry).where(
+        models.ScheduleEntry.teacher_id == 1, models.ScheduleEntry.day == "Monday", models.ScheduleEntry.time_slot == "9:00 AM"),
+    "entries by teacher and slot": select(models.ScheduleEntry).where(models.ScheduleEntry.teacher_id == 1, models.ScheduleEntry.slot == 0),
+    "entries by room and slot": select(models.ScheduleEntry).where(models.ScheduleEntry.room_id == 1, models.ScheduleEntry.slot == 0),
+    "entries by section": select(models.ScheduleEntry).where(models.ScheduleEntry.section_id == 1),
+    "entries by day and slot": select(models.ScheduleEntry).where(models.ScheduleEntry.day == "Monday", models.ScheduleEntry.time_slot == "9:00 AM"),
+    "overrides from a date": select(models.ScheduleOverride).where(models.ScheduleOverride.override_date >= date(2025, 1, 6)),
+    "overrides of a section on a date": select(models.ScheduleOverride).join(models.ScheduleEntry).where(
+        models.ScheduleEntry.section_id == 1, models.ScheduleOverride.override_date == date(2025, 1, 6)),
+    "leaves of a teacher": select(models.TeacherLeave).where(
+        models.TeacherLeave.teacher_id == 1, models.TeacherLeave.start_date <= date(2025, 1, 10), models.TeacherLeave.end_date >= date(2025, 1, 6)),
+    "attendance rollups of a class": select(models.AttendanceRollup).where(
+        models.AttendanceRollup.classroom_id == "EC201", models.AttendanceRollup.month >= date(2025, 1, 1)),
+    "attendance rollups by month": select(models.AttendanceRollup).where(models.AttendanceRollup.month.between(date(2025, 1, 1), date(2025, 4, 1))),
+    "attendance log between dates": select(models.AttendanceRecord).where(models.AttendanceRecord.date.between(date(2025, 1, 6), date(2025, 1, 31))),
+    "attendance of a class on a date": select(models.AttendanceRecord).where(
+        models.AttendanceRecord.classroom_id == "EC201", models.AttendanceRecord.date == date(2025, 1, 6)),
+    "community feed page": community_feed.page_query(cursor=community_feed.encode_cursor(datetime(2025, 1, 6), 1)),
+    "community feed page of a tag": community_feed.page_query(cursor=community_feed.encode_cursor(datetime(2025, 1, 6), 1), tag="Notice"),
+    "community feed page of a role": community_feed.page_query(role="Faculty"),
+}
+
+def query_plan(engine, statement) -> list:
+    compiled = statement.compile(dialect=engine.dialect)
+    params = [compiled.params[name] for name in compiled.positiontup]
+    params = [p.isoformat() if isinstance(p, date) else p for p in params]
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", tuple(params))]
+
+def full_scans(engine) -> dict:
+    """{query name: plan lines} for every hot query whose plan reads a table without an index."""
+    scans = {}
+    for name, statement in HOT_QUERIES.items():
+        plan = query_plan(engine, statement)
+        if any(line.startswith("SCAN ") and "INDEX" not in line for line in plan): scans[name] = plan
+    return scans
+
+if __name__ == "__main__":
+    from database import engine
+    models.Base.metadata.create_all(bind=engine)
+    if "--status" in sys.argv:
+        print(f"schema version {current_version(engine)}, latest {LATEST_VERSION}")
+        sys.exit(0)
+    applied = upgrade(engine)
+    print(f"applied migrations {applied}" if applied else f"already at version {LATEST_VERSION}")
+    if "--reslot" in sys.argv or "--rollups" in sys.argv:
+        raw = engine.raw_connection()
+        try:
+            if "--reslot" in sys.argv: print(f"re-slotted {reslot(raw.driver_connection)} schedule entries")
+            if "--rollups" in sys.argv:
+                attendance_analytics.rebuild(raw.driver_connection)
+                print("rebuilt the attendance rollups")
+            raw.commit()
+        finally: raw.close()
+    if "--check" in sys.argv:
+        scans = full_scans(engine)
+        for name, plan in scans.items(): print(f"FULL SCAN: {name}: {' | '.join(plan)}")
+        if scans: sys.exit(1)
+        print(f"all {len(HOT_QUERIES)} hot queries use an index")
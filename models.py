@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Table, DateTime
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Table, DateTime, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -49,11 +49,14 @@ class TeacherLeave(Base):
     
     teacher = relationship("Teacher", back_populates="leaves")
 
+    __table_args__ = (Index('ix_teacher_leaves_teacher_start', 'teacher_id', 'start_date'),)
+
 class ScheduleEntry(Base):
     __tablename__ = 'schedule_entries'
     id = Column(Integer, primary_key=True, index=True)
     day = Column(String(20), nullable=False)
     time_slot = Column(String(20), nullable=False)
+    slot = Column(Integer, nullable=True)  # timetable_engine.slot_id(day, time_slot); NULL outside the calendar
     
     section_id = Column(Integer, ForeignKey('sections.id'), nullable=False)
     course_id = Column(Integer, ForeignKey('courses.id'), nullable=False)
@@ -66,6 +69,16 @@ class ScheduleEntry(Base):
     room = relationship("Room", back_populates="schedule_entries")
     overrides = relationship("ScheduleOverride", back_populates="original_entry", cascade="all, delete-orphan")
 
+    # Indexes are also created for existing databases by migrations.py; keep the names in sync.
+    __table_args__ = (
+        Index('ix_schedule_entries_teacher_day_slot', 'teacher_id', 'day', 'time_slot'),
+        Index('ix_schedule_entries_section', 'section_id'),
+        Index('ix_schedule_entries_day_slot', 'day', 'time_slot'),
+        Index('ix_schedule_entries_slot', 'slot'),
+        Index('ix_schedule_entries_teacher_slot', 'teacher_id', 'slot'),
+        Index('ix_schedule_entries_room_slot', 'room_id', 'slot'),
+    )
+
 class ScheduleOverride(Base):
     __tablename__ = 'schedule_overrides'
     id = Column(Integer, primary_key=True, index=True)
@@ -82,6 +95,11 @@ class ScheduleOverride(Base):
     new_teacher = relationship("Teacher")
     new_room = relationship("Room")
 
+    __table_args__ = (
+        Index('ix_schedule_overrides_date', 'override_date'),
+        Index('ix_schedule_overrides_entry', 'original_entry_id'),
+    )
+
 class CommunityPost(Base):
     __tablename__ = 'community_posts'
     
@@ -94,6 +112,12 @@ class CommunityPost(Base):
     attachment_url = Column(String, nullable=True) 
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (  # the feed's keyset order, whole and per tag / role
+        Index('ix_community_posts_created', 'created_at', 'id'),
+        Index('ix_community_posts_tag_created', 'tag', 'created_at', 'id'),
+        Index('ix_community_posts_role_created', 'role', 'created_at', 'id'),
+    )
+
 class AttendanceRecord(Base):
     __tablename__ = 'attendance_log_v1' 
     
@@ -105,6 +129,35 @@ class AttendanceRecord(Base):
     status = Column(String, nullable=False) 
     remarks = Column(String, nullable=True)
 
+    __table_args__ = (
+        Index('ux_attendance_classroom_date_roll', 'classroom_id', 'date', 'student_roll', unique=True),
+        Index('ix_attendance_date', 'date'),
+    )
+
+class AttendanceRollup(Base):
+    """Per-student monthly attendance counts, kept in step with attendance_log_v1 by attendance_analytics."""
+    __tablename__ = 'attendance_rollups'
+
+    classroom_id = Column(String, primary_key=True)
+    student_roll = Column(String, primary_key=True)
+    month = Column(Date, primary_key=True)  # first day of the month
+    student_name = Column(String, nullable=False)
+    attended = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index('ix_attendance_rollups_month', 'month'),)
+
+class AttendanceArchivePartition(Base):
+    """A closed classroom-month of attendance_log_v1 moved to a columnar file by attendance_archive."""
+    __tablename__ = 'attendance_archive'
+
+    classroom_id = Column(String, primary_key=True)
+    month = Column(Date, primary_key=True)  # first day of the month
+    path = Column(String, nullable=False)  # relative to attendance_archive.ARCHIVE_DIR
+    rows = Column(Integer, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
 # --- NEW: COMPLAINT MODEL ---
 class Complaint(Base):
     __tablename__ = 'complaints'
@@ -0,0 +1,128 @@
+import threading
+from collections import Counter, defaultdict
+from sqlalchemy.orm import Session
+
+import models
+import timetable_engine
+
+class OccupancyIndex:
+    """
+    In-memory mirror of schedule_entries: busy calendar slots (timetable_engine.slot_id) per teacher id,
+    room id and section id, as counters plus bitmasks with one bit per slot. Built once at startup and kept
+    current by the endpoints that write schedules, so conflict checks are bit tests instead of table scans.
+    Cells outside the calendar are not indexed. Dated overrides are not mirrored, as a weekly bitmap has no
+    date to hang them on: AvailabilitySnapshot and the leave planner read the ones for their dates from the database.
+    The index is per process; run a single worker or rebuild after out-of-band writes. Schedule writers hold
+    write_lock from their database write until the index has it, so the index applies writes in commit order.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.write_lock = threading.Lock()
+        self.teacher_names, self.room_names = {}, {}
+        self.teacher_ids, self.room_ids = {}, {}
+        self._reset_entries()
+
+    def _reset_entries(self):
+        self.entries = {}
+        self.section_entries = defaultdict(set)
+        self.teacher_slots = defaultdict(Counter)
+        self.room_slots = defaultdict(Counter)
+        self.section_slots = defaultdict(Counter)
+        self.teacher_masks, self.room_masks, self.section_masks = defaultdict(int), defaultdict(int), defaultdict(int)
+
+    def rebuild(self, db: Session):
+        with self._lock:
+            self.teacher_names, self.room_names = {}, {}
+            self.teacher_ids, self.room_ids = {}, {}
+            self._reset_entries()
+            for teacher_id, name in db.query(models.Teacher.id, models.Teacher.name): self.add_teacher(teacher_id, name)
+            for room_id, name in db.query(models.Room.id, models.Room.name): self.add_room(room_id, name)
+            self.add_entries(db.query(
+                models.ScheduleEntry.id, models.ScheduleEntry.section_id, models.ScheduleEntry.teacher_id,
+                models.ScheduleEntry.room_id, models.ScheduleEntry.day, models.ScheduleEntry.time_slot
+            ).all())
+
+    def add_teacher(self, teacher_id: int, name: str):
+        with self._lock:
+            self.teacher_names[teacher_id], self.teacher_ids[name] = name, teacher_id
+
+    def add_room(self, room_id: int, name: str):
+        with self._lock:
+            self.room_names[room_id], self.room_ids[name] = name, room_id
+
+    @staticmethod
+    def _count(slots: dict, masks: dict, key: int, slot: int, delta: int):
+        slots[key][slot] += delta
+        if slots[key][slot] > 0: masks[key] |= 1 << slot
+        else:
+            del slots[key][slot]
+            masks[key] &= ~(1 << slot)
+
+    def add_entries(self, rows):
+        """rows: iterable of (entry_id, section_id, teacher_id, room_id, day, time_slot)."""
+        with self._lock:
+            for entry_id, section_id, teacher_id, room_id, day, time_slot in rows:
+                slot = timetable_engine.slot_id(day, time_slot)
+                self.entries[entry_id] = (section_id, teacher_id, room_id, day, time_slot, slot)
+                self.section_entries[section_id].add(entry_id)
+                if slot is None: continue
+                self._count(self.teacher_slots, self.teacher_masks, teacher_id, slot, 1)
+                self._count(self.room_slots, self.room_masks, room_id, slot, 1)
+                self._count(self.section_slots, self.section_masks, section_id, slot, 1)
+
+    def remove_section(self, section_id: int):
+        with self._lock:
+            for entry_id in self.section_entries.pop(section_id, set()):
+                _, teacher_id, room_id, _, _, slot = self.entries.pop(entry_id)
+                if slot is None: continue
+                self._count(self.teacher_slots, self.teacher_masks, teacher_id, slot, -1)
+                self._count(self.room_slots, self.room_masks, room_id, slot, -1)
+            self.section_slots.pop(section_id, None)
+            self.section_masks.pop(section_id, None)
+
+    def replace_sections(self, section_ids, rows, teachers: dict = None, rooms: dict = None):
+        """Swaps the entries of `section_ids` for `rows` in one step; readers never see a section half replaced."""
+        with self._lock:
+            for name, teacher_id in (teachers or {}).items(): self.add_teacher(teacher_id, name)
+            for name, room_id in (rooms or {}).items(): self.add_room(room_id, name)
+            for section_id in section_ids: self.remove_section(section_id)
+            self.add_entries(rows)
+
+    def clear_entries(self):
+        with self._lock:
+            self._reset_entries()
+
+    @staticmethod
+    def _cells(mask: int) -> set:
+        cells = set()
+        while mask:
+            low = mask & -mask
+            cells.add(timetable_engine.slot_cell(low.bit_length() - 1))
+            mask ^= low
+        return cells
+
+    def teacher_cells(self, teacher_id: int) -> set:
+        return self._cells(self.teacher_masks.get(teacher_id, 0))
+
+    def room_cells(self, room_id: int) -> set:
+        return self._cells(self.room_masks.get(room_id, 0))
+
+    def masks(self) -> tuple:
+        """Copies of the (teacher, room, section) busy bitmasks, bit n set when slot id n is taken."""
+        with self._lock:
+            return dict(self.teacher_masks), dict(self.room_masks), dict(self.section_masks)
+
+    def entry_rows(self) -> list:
+        """(section_id, teacher_id, room_id, day, time_slot, slot) for every indexed entry."""
+        with self._lock:
+            return list(self.entries.values())
+
+    def busy_cells(self, rooms: list, faculty: list) -> list:
+        """(day, time_slot, room, faculty) rows for the named rooms and faculty, the other side left None."""
+        with self._lock:
+            room_ids = {self.room_ids[name]: name for name in rooms if name in self.room_ids}
+            teacher_ids = {self.teacher_ids[name]: name for name in faculty if name in self.teacher_ids}
+            cells = [(day, time_slot, name, None) for room_id, name in room_ids.items() for day, time_slot in self.room_cells(room_id)]
+            return cells + [(day, time_slot, None, name) for teacher_id, name in teacher_ids.items() for day, time_slot in self.teacher_cells(teacher_id)]
+
+index = OccupancyIndex()
@@ -11,6 +11,8 @@ document.addEventListener('DOMContentLoaded', () => {
     const feedContainer = document.getElementById('posts-feed');
     const postCountLabel = document.getElementById('post-count');
     const feedTitle = document.getElementById('feed-title');
+    const searchInput = document.getElementById('post-search');
+    const loadMoreBtn = document.getElementById('load-more-btn');
     
     // Auth Elements
     const adminLoginBtn = document.getElementById('admin-login-btn');
@@ -26,6 +28,8 @@ document.addEventListener('DOMContentLoaded', () => {
     const createForm = document.getElementById('create-post-form');
 
     let allPosts = [];
+    let nextCursor = null;
+    let searchTimer = null;
     let isAdmin = false;
     let adminPassword = ""; 
     let currentFilter = 'Notice'; // Default View
@@ -46,7 +50,7 @@ document.addEventListener('DOMContentLoaded', () => {
             createPostBtn.classList.remove('hidden');
             
             // Re-render
-            renderPosts(getFilteredPosts());
+            renderPosts(allPosts);
             alert("Admin verified successfully.");
         } else {
             alert("Incorrect password.");
@@ -54,27 +58,35 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     // --- 2. FETCH & RENDER ---
-    async function fetchPosts() {
+    // The server filters by tag / search and pages the feed; "Load more" follows the X-Next-Cursor header
+    async function fetchPosts(append = false) {
+        const params = new URLSearchParams({ tag: currentFilter });
+        const query = searchInput.value.trim();
+        if (query) params.set('q', query);
+        if (append && nextCursor) params.set('cursor', nextCursor);
         try {
-            const res = await fetch('/api/community/posts');
+            const res = await fetch(`/api/community/posts?${params}`);
             if (!res.ok) throw new Error('Failed to fetch');
-            allPosts = await res.json();
-            // Render based on CURRENT filter
-            renderPosts(getFilteredPosts());
+            const page = await res.json();
+            nextCursor = res.headers.get('X-Next-Cursor');
+            allPosts = append ? allPosts.concat(page) : page;
+            renderPosts(allPosts);
         } catch (err) {
             console.error(err);
             feedContainer.innerHTML = '<p style="text-align:center; color:#ef4444;">Failed to load posts.</p>';
         }
     }
 
-    function getFilteredPosts() {
-        // Strict filtering: Only return posts that match the current tag
-        return allPosts.filter(p => p.tag === currentFilter);
-    }
+    loadMoreBtn.addEventListener('click', () => fetchPosts(true));
+    searchInput.addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => fetchPosts(), 250);
+    });
 
     window.renderPosts = function(posts) {
         feedContainer.innerHTML = '';
-        postCountLabel.textContent = `${posts.length} posts found`;
+        postCountLabel.textContent = `${posts.length}${nextCursor ? '+' : ''} posts found`;
+        loadMoreBtn.classList.toggle('hidden', !nextCursor);
 
         if (posts.length === 0) {
             feedContainer.innerHTML = `
@@ -151,8 +163,8 @@ document.addEventListener('DOMContentLoaded', () => {
         else if(tag === 'General') feedTitle.textContent = "General Discussions";
         else feedTitle.textContent = tag + "s";
 
-        // Re-render
-        renderPosts(getFilteredPosts());
+        // Re-fetch the first page of the new tag
+        fetchPosts();
     };
 
     // --- 4. CREATE POST ---
@@ -191,17 +203,14 @@ document.addEventListener('DOMContentLoaded', () => {
                 createForm.reset();
                 postModal.style.display = 'none';
                 
-                // 1. Fetch updated list
-                await fetchPosts();
-                
-                // 2. Automatically switch filter to the new post's category
+                // Switch the feed to the new post's category, which re-fetches its first page
                 // Find the button corresponding to the tag (lowercased ID selector)
                 const targetBtn = document.getElementById(`btn-${tagValue.toLowerCase()}`);
                 if(targetBtn) {
                     filterPosts(tagValue, targetBtn);
                 } else {
                     // Fallback
-                    renderPosts(getFilteredPosts());
+                    await fetchPosts();
                 }
 
             } else {
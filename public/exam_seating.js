@@ -103,7 +103,7 @@ document.addEventListener('DOMContentLoaded', () => {
         loadingOverlay.querySelector('p').textContent = "Running Optimization (this may take a few seconds)...";
 
         try {
-            const response = await fetch('/api/generate_exam_seating', {
+            const response = await fetch('/api/generate_exam_seating/stream', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ students: studentsData, rooms: roomsData })
@@ -114,7 +114,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 throw new Error(err.detail || "Optimization failed");
             }
             
-            const result = await response.json();
+            const result = await readSeatingStream(response);
             renderSeating(result.assignments, roomsData);
             
         } catch (error) {
@@ -124,6 +124,32 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    // Reads the Server-Sent Events stream: progress updates the overlay, the final event resolves or throws
+    async function readSeatingStream(response) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const status = loadingOverlay.querySelector('p');
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) throw new Error("Optimization stream ended unexpectedly");
+            buffer += decoder.decode(value, { stream: true });
+            const messages = buffer.split('\n\n');
+            buffer = messages.pop();
+            for (const message of messages) {
+                const event = (message.match(/^event: (.*)$/m) || [])[1];
+                const data = JSON.parse((message.match(/^data: (.*)$/m) || [])[1] || 'null');
+                if (event === 'progress') {
+                    status.textContent = `Optimizing... ${data.adjacent_pairs} same-branch neighbours (${data.elapsed}s)`;
+                } else if (event === 'result') {
+                    return data;
+                } else if (event === 'error') {
+                    throw new Error(data.detail || "Optimization failed");
+                }
+            }
+        }
+    }
+
     function renderSeating(assignments, roomsConfig) {
         outputDiv.innerHTML = '';
         const branchColors = {}; 
@@ -27,6 +27,11 @@ document.addEventListener('DOMContentLoaded', () => {
     const leaveDateInput = document.getElementById('leave-date');
 
     let lastGeneratedSchedule = null;
+    let calendar = {
+        days: ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'],
+        periods: ['9:00 AM', '10:00 AM', '11:00 AM', '12:00 PM', '1:00 PM', '2:00 PM', '3:00 PM', '4:00 PM', '5:00 PM'],
+    };
+    fetch('/api/calendar').then(r => r.ok ? r.json() : null).then(c => { if (c) calendar = c; }).catch(() => {});
     let mainCourseColorMap = new Map();
 
     function addCourseRow(name = '', hours = '', faculty = '') {
@@ -76,7 +81,9 @@ document.addEventListener('DOMContentLoaded', () => {
             if (!response.ok) { const errorData = await response.json(); throw new Error(errorData.detail || 'Failed to upload file'); }
             const data = await response.json();
             populateFormWithData(data);
-            fileNameSpan.textContent = `Successfully loaded: ${file.name}`;
+            fileNameSpan.textContent = data.errorCount
+                ? `Loaded ${file.name} (${data.errorCount} row(s) skipped, first at row ${data.errors[0].row}: ${data.errors[0].error})`
+                : `Successfully loaded: ${file.name}`;
         } catch (error) {
             console.error('Error uploading file:', error);
             fileNameSpan.textContent = `Error: ${error.message}`;
@@ -89,8 +96,7 @@ document.addEventListener('DOMContentLoaded', () => {
     function createScheduleGridElement(scheduleData, courseColorMap) {
         const gridContainer = document.createElement('div');
         gridContainer.className = 'schedule-grid';
-        const days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'];
-        const timeSlots = ['9:00 AM', '10:00 AM', '11:00 AM', '12:00 PM', '1:00 PM', '2:00 PM', '3:00 PM', '4:00 PM', '5:00 PM'];
+        const { days, periods: timeSlots } = calendar;
         gridContainer.style.gridTemplateRows = `40px repeat(${timeSlots.length}, 60px)`;
         days.forEach((day, index) => {
             const dayHeader = document.createElement('div');
@@ -199,8 +205,12 @@ document.addEventListener('DOMContentLoaded', () => {
     const fetchAndDisplaySavedSchedules = async () => {
         savedSchedulesContentDiv.innerHTML = '<p>Loading...</p>';
         try {
-            const response = await fetch('/api/saved_schedules');
+            const today = new Date().toISOString().split('T')[0];
+            const [response, effectiveResponse] = await Promise.all([
+                fetch('/api/saved_schedules', { cache: 'no-cache' }), fetch(`/api/schedule/effective?view_date=${today}`)
+            ]);
             const masterScheduleData = await response.json();
+            const effectiveSections = effectiveResponse.ok ? (await effectiveResponse.json()).sections : {};
             if (Object.keys(masterScheduleData).length === 0) { savedSchedulesContentDiv.innerHTML = '<p>No schedules saved.</p>'; return; }
             savedSchedulesContentDiv.innerHTML = '';
             for (const sectionName in masterScheduleData) {
@@ -222,22 +232,16 @@ document.addEventListener('DOMContentLoaded', () => {
                 const overridesContainer = document.createElement('div');
                 overridesContainer.className = 'daily-overrides-container';
                 details.appendChild(overridesContainer);
-                const today = new Date().toISOString().split('T')[0];
-                try {
-                    const overrideResponse = await fetch(`/api/schedule/view/${sectionName}?view_date=${today}`);
-                    if(overrideResponse.ok){
-                        const dailyData = await overrideResponse.json();
-                        if (dailyData.overrides.length > 0) {
-                            let overridesHTML = '<h4>Changes for Today:</h4><ul class="overrides-list">';
-                            dailyData.overrides.forEach(ov => {
-                                if (ov.change_type === 'SUBSTITUTE') { overridesHTML += `<li><strong>SUBSTITUTE:</strong> ${ov.original_class.course_name} (${ov.original_class.time_slot}) will be taught by <strong>${ov.new_teacher}</strong>.</li>`; }
-                                else if (ov.change_type === 'RESCHEDULE') { overridesHTML += `<li><strong>RESCHEDULED:</strong> ${ov.original_class.course_name} from ${ov.original_class.day} at ${ov.original_class.time_slot} has been moved to <strong>${ov.new_day}, ${ov.new_time_slot}</strong> in room ${ov.new_room}.</li>`; }
-                            });
-                            overridesHTML += '</ul>';
-                            overridesContainer.innerHTML = overridesHTML;
-                        }
-                    }
-                } catch (e) { console.error("Could not fetch overrides:", e); }
+                const dailyOverrides = (effectiveSections[sectionName] || {}).overrides || [];
+                if (dailyOverrides.length > 0) {
+                    let overridesHTML = '<h4>Changes for Today:</h4><ul class="overrides-list">';
+                    dailyOverrides.forEach(ov => {
+                        if (ov.change_type === 'SUBSTITUTE') { overridesHTML += `<li><strong>SUBSTITUTE:</strong> ${ov.original_class.course_name} (${ov.original_class.time_slot}) will be taught by <strong>${ov.new_teacher}</strong>.</li>`; }
+                        else if (ov.change_type === 'RESCHEDULE') { overridesHTML += `<li><strong>RESCHEDULED:</strong> ${ov.original_class.course_name} from ${ov.original_class.day} at ${ov.original_class.time_slot} has been moved to <strong>${ov.new_day}, ${ov.new_time_slot}</strong> in room ${ov.new_room}.</li>`; }
+                    });
+                    overridesHTML += '</ul>';
+                    overridesContainer.innerHTML = overridesHTML;
+                }
                 const adjustBtn = document.createElement('button');
                 adjustBtn.textContent = 'Make Dynamic Adjustments';
                 adjustBtn.className = 'action-btn';
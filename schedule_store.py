@@ -0,0 +1,130 @@
+import hashlib
+import json
+import threading
+import time
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import effective_schedule
+import fast_json
+import models
+import occupancy_index
+import timetable_engine
+
+def resolve_names(db: Session, model, names) -> dict:
+    """name -> id for `model`, inserting the missing names in one executemany."""
+    names = set(names)
+    if not names: return {}
+    ids = dict(db.execute(select(model.name, model.id).where(model.name.in_(names))).all())
+    missing = names - ids.keys()
+    if missing:
+        db.execute(insert(model), [{"name": name} for name in missing])
+        ids.update(db.execute(select(model.name, model.id).where(model.name.in_(missing))).all())
+    return ids
+
+def bulk_save_schedules(db: Session, schedules: dict) -> dict:
+    """
+    Replaces the saved timetable of every section in `schedules` ({section: {day: {slot: detail dict}}})
+    with set-based statements and a single commit, then mirrors the write into the occupancy index; both
+    happen under the index's write_lock, so concurrent saves, deletes and clears reach it in commit order.
+    Returns the time spent in each phase in milliseconds.
+    """
+    timings, start = {}, time.perf_counter()
+    def lap(phase):
+        nonlocal start
+        now = time.perf_counter()
+        timings[phase] = round((now - start) * 1000, 2)
+        start = now
+
+    cells = [(section, day, slot, details) for section, schedule in schedules.items() for day, slots in schedule.items() for slot, details in slots.items() if details]
+    occupancy = occupancy_index.index
+    with occupancy.write_lock:
+        try:
+            section_ids = resolve_names(db, models.Section, schedules)
+            teacher_ids = resolve_names(db, models.Teacher, {d['facultyName'] for *_, d in cells})
+            course_ids = resolve_names(db, models.Course, {d['courseName'] for *_, d in cells})
+            room_ids = resolve_names(db, models.Room, {d['roomName'] for *_, d in cells})
+            lap("resolve")
+
+            pairs = {(teacher_ids[d['facultyName']], course_ids[d['courseName']]) for *_, d in cells}
+            if pairs:
+                db.execute(sqlite_insert(models.teacher_course_association).on_conflict_do_nothing(),
+                           [{"teacher_id": teacher_id, "course_id": course_id} for teacher_id, course_id in pairs])
+            lap("associations")
+
+            db.execute(delete(models.ScheduleEntry).where(models.ScheduleEntry.section_id.in_(section_ids.values())))
+            params = [{
+                "section_id": section_ids[section], "day": day, "time_slot": slot, "slot": timetable_engine.slot_id(day, slot), "course_id": course_ids[d['courseName']],
+                "teacher_id": teacher_ids[d['facultyName']], "room_id": room_ids[d['roomName']],
+            } for section, day, slot, d in cells]
+            rows = []
+            if params:
+                ids = db.execute(insert(models.ScheduleEntry).returning(models.ScheduleEntry.id, sort_by_parameter_order=True), params).scalars().all()
+                rows = [(entry_id, p["section_id"], p["teacher_id"], p["room_id"], p["day"], p["time_slot"]) for entry_id, p in zip(ids, params)]
+            lap("entries")
+
+            db.commit()
+            lap("commit")
+        except Exception:
+            db.rollback()
+            raise
+        occupancy.replace_sections(section_ids.values(), rows, teacher_ids, room_ids)
+    effective_schedule.cache.invalidate()
+    saved_cache.invalidate()
+    lap("index")
+    return timings
+
+# --- SAVED TIMETABLES ---
+def load_saved_schedules(db: Session) -> dict:
+    """{section: [entry dict, ...]} for every saved timetable, sections by name, entries in calendar order."""
+    Entry = models.ScheduleEntry
+    rows = db.execute(select(models.Section.name, Entry.id, Entry.day, Entry.time_slot, models.Course.name, models.Teacher.name, models.Room.name)
+        .join(models.Section, Entry.section_id == models.Section.id).join(models.Course, Entry.course_id == models.Course.id)
+        .join(models.Teacher, Entry.teacher_id == models.Teacher.id).join(models.Room, Entry.room_id == models.Room.id)
+        .order_by(models.Section.name, Entry.slot.nulls_last(), Entry.id))
+    grouped = {}
+    for section, entry_id, day, time_slot, course, teacher, room in rows:
+        grouped.setdefault(section, []).append({
+            "entry_id": entry_id, "day": day, "time_slot": time_slot,
+            "course_name": course, "faculty_name": teacher, "room_name": room,
+        })
+    return grouped
+
+class SavedSchedules:
+    """One build of the saved timetables: the grouped dict, its JSON body and an ETag derived from that body."""
+    def __init__(self, grouped: dict):
+        self.grouped = grouped
+        self.body = fast_json.dumps(grouped)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+    def page_etag(self, sections, offset: int, limit) -> str:
+        """ETag of a filtered or paginated view: changes with the data or with the query."""
+        query = json.dumps([self.etag, sections, offset, limit]).encode()
+        return f'"{hashlib.sha256(query).hexdigest()[:32]}"'
+
+class SavedScheduleCache:
+    """
+    The saved timetables, rebuilt on the first read after a write. Schedule writes (bulk saves, deletes,
+    clears) call invalidate(); overrides do not change saved timetables. Per process, like the occupancy index.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = None
+        self._generation = 0
+
+    def get(self, db: Session) -> SavedSchedules:
+        with self._lock:
+            if self._current is not None: return self._current
+            generation = self._generation
+        current = SavedSchedules(load_saved_schedules(db))
+        with self._lock:
+            if generation == self._generation: self._current = current  # else a write landed while loading
+        return current
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._current = None
+
+saved_cache = SavedScheduleCache()
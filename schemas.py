@@ -11,6 +11,23 @@ class GeneratePayload(BaseModel):
     courses: List[CourseInput]
     rooms: List[str]
     includeLunchBreak: bool
+    engine: str = "random"  # "random" first-fit or "cpsat"
+    timeLimit: float = 10.0
+    numWorkers: int = 8
+
+class BatchSectionInput(BaseModel):
+    sectionName: str
+    courses: List[CourseInput]
+    rooms: Optional[List[str]] = None  # defaults to the batch-wide room list
+
+class GenerateBatchPayload(BaseModel):
+    sections: List[BatchSectionInput]
+    rooms: List[str]
+    includeLunchBreak: bool
+    engine: str = "cpsat"
+    timeLimit: float = 30.0
+    numWorkers: int = 8
+    save: bool = True
 
 class ScheduleDetail(BaseModel):
     courseName: str
@@ -49,6 +66,32 @@ class ApplySolutionPayload(BaseModel):
     entry_id_to_update: int
     solution: Solution
 
+class LeavePlanPayload(TeacherLeavePayload):
+    timeLimit: float = 10.0
+    numWorkers: int = 8
+
+class PlannedOverride(BaseModel):
+    entry_id: int
+    override_date: date
+    change_type: str  # SUBSTITUTE, RESCHEDULE or UNRESOLVED
+    original_class: str
+    details: str
+    new_teacher_id: Optional[int] = None
+    new_day: Optional[str] = None
+    new_time_slot: Optional[str] = None
+    new_room_id: Optional[int] = None
+
+class LeavePlan(BaseModel):
+    assignments: List[PlannedOverride]
+    unresolved: List[PlannedOverride]
+    already_covered: int
+    status: str
+    solve_time: float
+    objective: Optional[float] = None
+
+class ApplyPlanPayload(BaseModel):
+    assignments: List[PlannedOverride]
+
 class DailyScheduleEntry(BaseModel):
     entry_id: int
     day: str
@@ -80,6 +123,11 @@ class RoomDimension(BaseModel):
 class ExamSeatingPayload(BaseModel):
     students: List[StudentInput]
     rooms: List[RoomDimension]
+    engine: str = "auto"  # "auto", "constructive", "per_room" or "monolithic"
+    timeLimit: float = 20.0
+    numWorkers: Optional[int] = None
+    useCache: bool = True
+    acceptCached: bool = False  # serve a cached layout even when it was solved with a smaller timeLimit
 
 class SeatAssignment(BaseModel):
     student: StudentInput
@@ -90,6 +138,7 @@ class SeatAssignment(BaseModel):
 class ExamSeatingResponse(BaseModel):
     assignments: List[SeatAssignment]
     unplaced: List[StudentInput]
+    stats: Optional[dict] = None
 
 class PostCreate(BaseModel):
     title: str
@@ -0,0 +1,482 @@
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+import jobs
+import schemas
+
+HORIZONTAL_PENALTY = 1000
+VERTICAL_PENALTY = 10
+AUTO_CP_SAT_MAX_LITERALS = 20_000  # seats x branches above which a room keeps its constructive layout
+LAYOUT_CACHE_SIZE = int(os.environ.get("SMARTFLEX_SEATING_CACHE_SIZE", "128"))
+LAYOUT_CACHE_DIR = os.environ.get("SMARTFLEX_SEATING_CACHE_DIR")  # unset keeps the cache in memory only
+LAYOUT_CACHE_DISK_SIZE = int(os.environ.get("SMARTFLEX_SEATING_CACHE_DISK_SIZE", "1024"))  # files kept in LAYOUT_CACHE_DIR
+
+def group_by_branch(students):
+    """Branch ids start at 1 (0 marks an empty seat); returns (branch_counts, students_by_branch) keyed by id."""
+    unique_branches = sorted(list(set(s.branch for s in students)))
+    branch_to_id = {b: i + 1 for i, b in enumerate(unique_branches)}
+    branch_counts = defaultdict(int)
+    students_by_branch = defaultdict(list)
+    for s in students:
+        branch_counts[branch_to_id[s.branch]] += 1
+        students_by_branch[branch_to_id[s.branch]].append(s)
+    return branch_counts, students_by_branch
+
+def check_capacity(total_students: int, rooms):
+    total_capacity = sum(r.rows * r.cols for r in rooms)
+    if total_students > total_capacity:
+        raise ValueError(f"Not enough seats! Students: {total_students}, Capacity: {total_capacity}")
+
+def layout_penalty(layouts: list) -> dict:
+    """Scores room layouts (2-D arrays of branch ids) the way the CP-SAT objective does."""
+    horizontal = vertical = 0
+    for grid in layouts:
+        grid = np.asarray(grid)
+        horizontal += int(((grid[:, :-1] == grid[:, 1:]) & (grid[:, :-1] > 0)).sum())
+        vertical += int(((grid[:-1, :] == grid[1:, :]) & (grid[:-1, :] > 0)).sum())
+    return {"penalty": horizontal * HORIZONTAL_PENALTY + vertical * VERTICAL_PENALTY, "horizontal_pairs": horizontal, "vertical_pairs": vertical}
+
+class SolutionCallback(cp_model.CpSolverSolutionCallback):
+    def __init__(self, on_solution):
+        super().__init__()
+        self._on_solution = on_solution
+
+    def on_solution_callback(self):
+        self._on_solution(self)
+
+class ProgressTracker:
+    """
+    Collects improving room layouts from one or more solver threads and reports whole-exam progress
+    once every room has a layout, but only when the combined penalty improves.
+    """
+    def __init__(self, n_rooms: int, report):
+        self._lock = threading.Lock()
+        self._grids = [None] * n_rooms
+        self._report = report
+        self._best = None
+        self._start = time.perf_counter()
+
+    def update(self, grids_by_room: dict):
+        with self._lock:
+            for room_idx, grid in grids_by_room.items(): self._grids[room_idx] = grid
+            if any(grid is None for grid in self._grids): return
+            score = layout_penalty(self._grids)
+            if self._best is not None and score["penalty"] >= self._best: return
+            self._best = score["penalty"]
+            self._report({
+                "objective": score["penalty"], "adjacent_pairs": score["horizontal_pairs"] + score["vertical_pairs"],
+                **score, "elapsed": round(time.perf_counter() - self._start, 3),
+            })
+
+def student_row(student: schemas.StudentInput) -> dict:
+    return {"name": student.name, "roll_no": student.roll_no, "branch": student.branch}
+
+def assign_students(rooms, layouts: list, students_by_branch):
+    """(assignments, unplaced) as schemas.SeatAssignment-shaped dicts, ready for fast_json."""
+    assignments = []
+    unplaced = []
+    queues = {}
+    for b in students_by_branch:
+        random.shuffle(students_by_branch[b])
+        queues[b] = iter(students_by_branch[b])
+
+    for r_idx, room in enumerate(rooms):
+        for r in range(room.rows):
+            for c in range(room.cols):
+                val = int(layouts[r_idx][r][c])
+                if val > 0:
+                    student = next(queues.get(val, iter(())), None)
+                    if student is not None:
+                        assignments.append({"student": student_row(student), "room_name": room.name, "row": r + 1, "col": c + 1})
+    return assignments, unplaced
+
+# --- MONOLITHIC MODEL (one IntVar per seat) ---
+def solve_layout_monolithic(rooms, branch_counts, time_limit: float = None, num_workers: int = None, tracker: ProgressTracker = None):
+    model = cp_model.CpModel()
+    n_branches = len(branch_counts)
+    total_students = sum(branch_counts.values())
+    grid_vars = {}
+    is_occupied_vars = {}
+    penalty_vars = []
+
+    for r_idx, room in enumerate(rooms):
+        for r in range(room.rows):
+            for c in range(room.cols):
+                seat_key = (r_idx, r, c)
+                var = model.NewIntVar(0, n_branches, f'seat_{r_idx}_{r}_{c}')
+                grid_vars[seat_key] = var
+                is_occ = model.NewBoolVar(f'occ_{r_idx}_{r}_{c}')
+                model.Add(var > 0).OnlyEnforceIf(is_occ)
+                model.Add(var == 0).OnlyEnforceIf(is_occ.Not())
+                is_occupied_vars[seat_key] = is_occ
+
+    for b_id, count in branch_counts.items():
+        bools_for_branch = []
+        for seat_key, var in grid_vars.items():
+            b_var = model.NewBoolVar(f'{seat_key}_is_{b_id}')
+            model.Add(var == b_id).OnlyEnforceIf(b_var)
+            model.Add(var != b_id).OnlyEnforceIf(b_var.Not())
+            bools_for_branch.append(b_var)
+        model.Add(sum(bools_for_branch) == count)
+
+    for r_idx, room in enumerate(rooms):
+        for r in range(room.rows):
+            for c in range(room.cols):
+                current_seat = grid_vars[(r_idx, r, c)]
+                if c < room.cols - 1:
+                    right_seat = grid_vars[(r_idx, r, c + 1)]
+                    is_same_h = model.NewBoolVar(f'conflict_h_{r_idx}_{r}_{c}')
+                    seats_equal = model.NewBoolVar(f'eq_h_{r_idx}_{r}_{c}')
+                    model.Add(current_seat == right_seat).OnlyEnforceIf(seats_equal)
+                    model.Add(current_seat != right_seat).OnlyEnforceIf(seats_equal.Not())
+                    curr_not_empty = is_occupied_vars[(r_idx, r, c)]
+                    model.AddBoolAnd([seats_equal, curr_not_empty]).OnlyEnforceIf(is_same_h)
+                    model.AddBoolOr([seats_equal.Not(), curr_not_empty.Not()]).OnlyEnforceIf(is_same_h.Not())
+                    penalty_vars.append(is_same_h * HORIZONTAL_PENALTY)
+
+                if r < room.rows - 1:
+                    down_seat = grid_vars[(r_idx, r + 1, c)]
+                    is_same_v = model.NewBoolVar(f'conflict_v_{r_idx}_{r}_{c}')
+                    seats_equal_v = model.NewBoolVar(f'eq_v_{r_idx}_{r}_{c}')
+                    model.Add(current_seat == down_seat).OnlyEnforceIf(seats_equal_v)
+                    model.Add(current_seat != down_seat).OnlyEnforceIf(seats_equal_v.Not())
+                    curr_not_empty_v = is_occupied_vars[(r_idx, r, c)]
+                    model.AddBoolAnd([seats_equal_v, curr_not_empty_v]).OnlyEnforceIf(is_same_v)
+                    model.AddBoolOr([seats_equal_v.Not(), curr_not_empty_v.Not()]).OnlyEnforceIf(is_same_v.Not())
+                    penalty_vars.append(is_same_v * VERTICAL_PENALTY)
+
+    if penalty_vars:
+        model.Minimize(sum(penalty_vars))
+
+    ideal_per_room = total_students / len(rooms)
+    min_per_room = math.floor(ideal_per_room)
+    max_per_room = math.ceil(ideal_per_room)
+
+    for r_idx, room in enumerate(rooms):
+        room_seats = [is_occupied_vars[(r_idx, r, c)] for r in range(room.rows) for c in range(room.cols)]
+        model.Add(sum(room_seats) >= min_per_room)
+        model.Add(sum(room_seats) <= max_per_room)
+
+    def read_layouts(values):
+        return [[[values.Value(grid_vars[(r_idx, r, c)]) for c in range(room.cols)] for r in range(room.rows)] for r_idx, room in enumerate(rooms)]
+
+    solver = cp_model.CpSolver()
+    if time_limit: solver.parameters.max_time_in_seconds = time_limit
+    if num_workers: solver.parameters.num_search_workers = num_workers
+    callback = SolutionCallback(lambda cb: tracker.update(dict(enumerate(read_layouts(cb))))) if tracker else None
+    status = solver.Solve(model, callback)
+
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        raise ValueError("No valid seating arrangement found! Try adding more rooms.")
+
+    layouts = read_layouts(solver)
+    return layouts, {"engine": "monolithic", "status": solver.StatusName(status), "solve_time": round(solver.WallTime(), 3)}
+
+def solve_seating_cp_sat(students, rooms):
+    branch_counts, students_by_branch = group_by_branch(students)
+    check_capacity(len(students), rooms)
+    layouts, _ = solve_layout_monolithic(rooms, branch_counts)
+    return assign_students(rooms, layouts, students_by_branch)
+
+# --- PER-ROOM MODEL (one-hot seat x branch booleans) ---
+def room_quotas(rooms, total_students: int) -> list:
+    """Spreads students as evenly as the rooms allow: equal shares, capped by capacity, overflow to the roomier halls."""
+    capacities = [r.rows * r.cols for r in rooms]
+    quotas, remaining = [0] * len(rooms), total_students
+    open_rooms = [i for i, cap in enumerate(capacities) if cap > 0]
+    while remaining and open_rooms:
+        share, extra = divmod(remaining, len(open_rooms))
+        for n, i in enumerate(list(open_rooms)):
+            take = min(share + (n < extra), capacities[i] - quotas[i])
+            quotas[i] += take
+            remaining -= take
+            if quotas[i] == capacities[i]: open_rooms.remove(i)
+    return quotas
+
+def split_branch_counts(branch_counts: dict, quotas: list) -> list:
+    """Per-room {branch_id: count} whose row sums are the quotas, keeping each room's mix proportional to what is left."""
+    remaining = dict(branch_counts)
+    splits = []
+    for q in quotas:
+        left = sum(remaining.values())
+        if left == 0 or q == 0:
+            splits.append({})
+            continue
+        exact = {b: n * q / left for b, n in remaining.items()}
+        counts = {b: min(int(v), remaining[b]) for b, v in exact.items()}
+        for b in sorted(exact, key=lambda b: exact[b] - counts[b], reverse=True):
+            if sum(counts.values()) == q: break
+            if counts[b] < remaining[b]: counts[b] += 1
+        for b, n in counts.items(): remaining[b] -= n
+        splits.append({b: n for b, n in counts.items() if n})
+    return splits
+
+def room_splits(rooms, branch_counts: dict) -> list:
+    return split_branch_counts(branch_counts, room_quotas(rooms, sum(branch_counts.values())))
+
+def construct_room_layout(rows: int, cols: int, counts: dict) -> list:
+    """
+    Greedy fill in row-major order: each seat takes the branch with the most students left, preferring
+    one that differs from its left neighbour, then from the seat in front; empty seats act as a branch
+    that never conflicts. O(seats x branches) and optimal for checkerboard/stripe-friendly mixes.
+    """
+    remaining = {b: n for b, n in counts.items() if n}
+    remaining[0] = rows * cols - sum(remaining.values())
+    grid = [[0] * cols for _ in range(rows)]
+    for r in range(rows):
+        for c in range(cols):
+            left = grid[r][c - 1] if c else 0
+            up = grid[r - 1][c] if r else 0
+            b = min((b for b, n in remaining.items() if n), key=lambda b: (b and b == left, b and b == up, -remaining[b]))
+            grid[r][c] = b
+            remaining[b] -= 1
+    return grid
+
+def solve_layout_constructive(rooms, branch_counts, time_limit: float = None, num_workers: int = None, tracker: ProgressTracker = None):
+    start = time.perf_counter()
+    layouts = [construct_room_layout(room.rows, room.cols, counts) for room, counts in zip(rooms, room_splits(rooms, branch_counts))]
+    if tracker: tracker.update(dict(enumerate(layouts)))
+    status = "OPTIMAL" if layout_penalty(layouts)["penalty"] == 0 else "HEURISTIC"
+    return layouts, {"engine": "constructive", "status": status, "solve_time": round(time.perf_counter() - start, 3)}
+
+def solve_room_layout(rows: int, cols: int, counts: dict, time_limit: float = 20.0, num_workers: int = 1, hint: list = None, on_solution=None):
+    """
+    One-hot model for a single room: x[seat, branch] booleans, at most one branch per seat, exact branch
+    counts, and one penalty literal per neighbouring seat pair that is forced on when both seats hold
+    the same branch. `hint` is a starting grid (e.g. a constructive layout) for the search to improve;
+    `on_solution` receives every improving grid. Returns (rows x cols list of branch ids, stats).
+    """
+    model = cp_model.CpModel()
+    branches = sorted(counts)
+    x = {(r, c, b): model.NewBoolVar(f'x_{r}_{c}_{b}') for r in range(rows) for c in range(cols) for b in branches}
+    for r in range(rows):
+        for c in range(cols):
+            model.AddAtMostOne(x[(r, c, b)] for b in branches)
+    for b in branches:
+        model.Add(sum(x[(r, c, b)] for r in range(rows) for c in range(cols)) == counts[b])
+
+    penalties = []
+    for r in range(rows):
+        for c in range(cols):
+            for (nr, nc), weight in (((r, c + 1), HORIZONTAL_PENALTY), ((r + 1, c), VERTICAL_PENALTY)):
+                if nr >= rows or nc >= cols: continue
+                same = model.NewBoolVar(f'same_{r}_{c}_{nr}_{nc}')
+                for b in branches:
+                    model.AddBoolOr([x[(r, c, b)].Not(), x[(nr, nc, b)].Not(), same])
+                penalties.append(weight * same)
+                if hint: model.AddHint(same, hint[r][c] != 0 and hint[r][c] == hint[nr][nc])
+    if penalties: model.Minimize(sum(penalties))
+    if hint:
+        for (r, c, b), var in x.items(): model.AddHint(var, hint[r][c] == b)
+
+    def read_grid(values):
+        return [[next((b for b in branches if values.BooleanValue(x[(r, c, b)])), 0) for c in range(cols)] for r in range(rows)]
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_search_workers = num_workers
+    status = solver.Solve(model, SolutionCallback(lambda cb: on_solution(read_grid(cb))) if on_solution else None)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        raise ValueError("No valid seating arrangement found! Try adding more rooms.")
+    grid = read_grid(solver)
+    return grid, {"status": solver.StatusName(status), "solve_time": round(solver.WallTime(), 3), "objective": round(solver.ObjectiveValue())}
+
+room_pool = jobs.ProcessPool(int(os.environ.get("SMARTFLEX_SEATING_WORKERS", "0")) or os.cpu_count() or 1)
+
+def solve_room_jobs(room_jobs: dict, num_workers: int, tracker: ProgressTracker = None) -> dict:
+    """
+    Runs {room_idx: solve_room_layout args} on the shared room_pool, or on threads when a tracker needs
+    the solver callbacks. Returns {room_idx: (grid, stats)}.
+    """
+    room_ids = list(room_jobs)
+    if tracker:
+        def solve(room_idx):
+            return solve_room_layout(*room_jobs[room_idx], on_solution=lambda grid: tracker.update({room_idx: grid}))
+        with ThreadPoolExecutor(max_workers=min(len(room_jobs), num_workers)) as pool:
+            return dict(zip(room_ids, pool.map(solve, room_ids)))
+    if len(room_jobs) == 1: return {room_ids[0]: solve_room_layout(*room_jobs[room_ids[0]])}
+    return dict(zip(room_ids, room_pool.map(solve_room_layout, *zip(*room_jobs.values()))))
+
+def solve_layout_per_room(rooms, branch_counts, time_limit: float = 20.0, num_workers: int = None, tracker: ProgressTracker = None):
+    """Splits branch counts across rooms, then solves every room as its own model."""
+    num_workers = num_workers or os.cpu_count() or 1
+    room_jobs = {i: (room.rows, room.cols, counts, time_limit, max(1, num_workers // len(rooms))) for i, (room, counts) in enumerate(zip(rooms, room_splits(rooms, branch_counts)))}
+    solved = solve_room_jobs(room_jobs, num_workers, tracker)
+    results = [solved[i] for i in range(len(rooms))]
+    layouts = [grid for grid, _ in results]
+    return layouts, {
+        "engine": "per_room", "status": "OPTIMAL" if all(s["status"] == "OPTIMAL" for _, s in results) else "FEASIBLE",
+        "solve_time": max(s["solve_time"] for _, s in results),
+        "rooms": [{"room": room.name, **s} for room, (_, s) in zip(rooms, results)],
+    }
+
+def solve_layout_auto(rooms, branch_counts, time_limit: float = 20.0, num_workers: int = None, tracker: ProgressTracker = None):
+    """
+    Constructive layout first; rooms it leaves with same-branch neighbours are re-solved by the per-room
+    model hinted with that layout, unless the room model would exceed AUTO_CP_SAT_MAX_LITERALS.
+    """
+    start = time.perf_counter()
+    num_workers = num_workers or os.cpu_count() or 1
+    splits = room_splits(rooms, branch_counts)
+    layouts = [construct_room_layout(room.rows, room.cols, counts) for room, counts in zip(rooms, splits)]
+    if tracker: tracker.update(dict(enumerate(layouts)))
+    room_stats = [{"room": room.name, "method": "constructive", "status": "OPTIMAL" if layout_penalty([grid])["penalty"] == 0 else "HEURISTIC"} for room, grid in zip(rooms, layouts)]
+    improve = [i for i, room in enumerate(rooms) if room_stats[i]["status"] != "OPTIMAL" and room.rows * room.cols * len(splits[i]) <= AUTO_CP_SAT_MAX_LITERALS]
+    if improve:
+        room_jobs = {i: (rooms[i].rows, rooms[i].cols, splits[i], time_limit, max(1, num_workers // len(improve)), layouts[i]) for i in improve}
+        for i, (grid, stats) in solve_room_jobs(room_jobs, num_workers, tracker).items():
+            if layout_penalty([grid])["penalty"] <= layout_penalty([layouts[i]])["penalty"]: layouts[i] = grid
+            room_stats[i].update(method="cp_sat", **stats)
+    statuses = {s["status"] for s in room_stats}
+    return layouts, {
+        "engine": "auto", "status": "OPTIMAL" if statuses == {"OPTIMAL"} else "HEURISTIC" if "HEURISTIC" in statuses else "FEASIBLE",
+        "solve_time": round(time.perf_counter() - start, 3), "rooms": room_stats,
+    }
+
+SEATING_ENGINES = {"auto": solve_layout_auto, "constructive": solve_layout_constructive, "per_room": solve_layout_per_room, "monolithic": solve_layout_monolithic}
+
+# --- LAYOUT CACHE ---
+def layout_key(engine: str, branch_counts: dict, rooms) -> tuple:
+    """
+    Layouts depend only on branch sizes and room shapes, so branches are renumbered 1..k by descending
+    count. Returns (sha256 key, {branch id: canonical id}).
+    """
+    order = sorted(branch_counts, key=lambda b: (-branch_counts[b], b))
+    shape = [engine, [branch_counts[b] for b in order], [(room.rows, room.cols) for room in rooms]]
+    return hashlib.sha256(json.dumps(shape).encode()).hexdigest(), {b: i + 1 for i, b in enumerate(order)}
+
+def remap_layouts(layouts: list, mapping: dict) -> list:
+    return [[[mapping.get(int(v), 0) for v in row] for row in grid] for grid in layouts]
+
+class LayoutCache:
+    """
+    LRU of solved layouts in canonical branch ids. With a directory, entries are also written there as
+    <key>.json and read back on a memory miss, so they survive restarts and are shared between workers;
+    the directory keeps the disk_size most recently used files (by mtime).
+    """
+    def __init__(self, max_size: int = LAYOUT_CACHE_SIZE, directory: str = LAYOUT_CACHE_DIR, disk_size: int = LAYOUT_CACHE_DISK_SIZE):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.max_size = max_size
+        self.directory = directory
+        self.disk_size = disk_size
+        if directory: os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        path = self.directory and os.path.join(self.directory, f"{key}.json")
+        if not path or not os.path.exists(path): return None
+        try:
+            with open(path) as f: entry = json.load(f)
+            os.utime(path)  # recently used: pruned last
+        except (OSError, ValueError):
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, layouts: list, stats: dict, time_limit: float = None):
+        """`time_limit` is the solve budget the layouts were found in; None for an unbounded solve."""
+        entry = {"layouts": layouts, "stats": stats, "time_limit": time_limit}
+        self._remember(key, entry)
+        if self.directory:
+            tmp = os.path.join(self.directory, f"{key}.{os.getpid()}.tmp")
+            with open(tmp, "w") as f: json.dump(entry, f)
+            os.replace(tmp, os.path.join(self.directory, f"{key}.json"))
+            self._prune_directory()
+
+    def _prune_directory(self):
+        files = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".json")]
+        if len(files) <= self.disk_size: return
+        def mtime(path):
+            try: return os.path.getmtime(path)
+            except FileNotFoundError: return 0
+        for path in sorted(files, key=mtime)[:len(files) - self.disk_size]:
+            try: os.remove(path)
+            except FileNotFoundError: pass  # another worker pruned it
+
+    def _remember(self, key: str, entry: dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size: self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock: self._entries.clear()
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"): os.remove(os.path.join(self.directory, name))
+
+layout_cache = LayoutCache()
+
+def covers(entry: dict, time_limit: float) -> bool:
+    """Whether a cached entry is as good as a solve with `time_limit` would be: proven optimal, or found with at least that budget."""
+    if entry["stats"].get("status") == "OPTIMAL": return True
+    budget = entry.get("time_limit")
+    return budget is not None and time_limit is not None and budget >= time_limit
+
+def start_seating(students, rooms, engine: str = "auto", use_cache: bool = True, time_limit: float = None, accept_cached: bool = False) -> dict:
+    """
+    Validates the exam and looks up the layout cache. The returned state carries the cached `layouts`
+    (None on a miss) and everything finish_seating needs, so the solve itself can run elsewhere. A cached
+    layout is served when it covers `time_limit` (see covers()) or the caller accepts any cached layout;
+    one found with a smaller budget is kept in the state as `best`, a floor the longer solve has to beat.
+    """
+    if engine not in SEATING_ENGINES: raise ValueError(f"Unknown seating engine '{engine}'.")
+    branch_counts, students_by_branch = group_by_branch(students)
+    check_capacity(len(students), rooms)
+    key, to_canonical = layout_key(engine, branch_counts, rooms)
+    cached = layout_cache.get(key) if use_cache else None
+    served = cached if cached and (accept_cached or covers(cached, time_limit)) else None
+    return {
+        "rooms": rooms, "branch_counts": branch_counts, "students_by_branch": students_by_branch, "key": key, "to_canonical": to_canonical, "time_limit": time_limit,
+        "layouts": remap_layouts(served["layouts"], {c: b for b, c in to_canonical.items()}) if served else None,
+        "stats": {**served["stats"], "cached": True} if served else None,
+        "best": cached if cached and not served else None,
+    }
+
+def finish_seating(state: dict, layouts: list = None, stats: dict = None):
+    """
+    Seats the students in the state's cached layouts or in freshly solved ones. A fresh solve is cached
+    with its budget unless the cached floor has a lower penalty, in which case the floor's layouts are used
+    and re-cached under the larger budget, since that solve could not beat them.
+    """
+    if layouts is None: layouts, stats = state["layouts"], state["stats"]
+    else:
+        canonical, best = remap_layouts(layouts, state["to_canonical"]), state.get("best")
+        if best and layout_penalty(best["layouts"])["penalty"] < layout_penalty(canonical)["penalty"]:
+            layout_cache.put(state["key"], best["layouts"], best["stats"], state.get("time_limit"))
+            layouts, stats = remap_layouts(best["layouts"], {c: b for b, c in state["to_canonical"].items()}), {**best["stats"], "cached": True}
+        else:
+            layout_cache.put(state["key"], canonical, stats, state.get("time_limit"))
+            stats = {**stats, "cached": False}
+    assignments, unplaced = assign_students(state["rooms"], layouts, state["students_by_branch"])
+    return assignments, unplaced, {**stats, **layout_penalty(layouts)}
+
+def solve_seating(students, rooms, engine: str = "auto", time_limit: float = 20.0, num_workers: int = None, on_progress=None, use_cache: bool = True, accept_cached: bool = False):
+    """
+    Returns (assignments, unplaced, stats) for the chosen layout engine; stats include the layout penalty.
+    `time_limit` bounds each solve, so the best layout found so far is returned instead of waiting for a
+    proof of optimality; `on_progress` receives a dict for every improving whole-exam layout.
+    A composition already solved (same branch sizes, room shapes and engine) to optimality or with at least
+    this `time_limit` reuses the cached layout, as does any cached one with `accept_cached`; students are
+    reshuffled into it on every call.
+    """
+    state = start_seating(students, rooms, engine, use_cache, time_limit, accept_cached)
+    tracker = ProgressTracker(len(rooms), on_progress) if on_progress else None
+    if state["layouts"] is not None:
+        if tracker: tracker.update(dict(enumerate(state["layouts"])))
+        return finish_seating(state)
+    return finish_seating(state, *SEATING_ENGINES[engine](rooms, state["branch_counts"], time_limit, num_workers, tracker))
@@ -0,0 +1,21 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# main opens its database and stores on import: point them at a scratch directory before any test imports it
+SCRATCH = tempfile.mkdtemp(prefix="smartflex-tests-")
+os.environ["SMARTFLEX_DATABASE_URL"] = f"sqlite:///{SCRATCH}/smartflex.db"
+os.environ["SMARTFLEX_ATTACHMENT_DIR"] = os.path.join(SCRATCH, "attachments")
+os.environ["SMARTFLEX_ATTENDANCE_ARCHIVE_DIR"] = os.path.join(SCRATCH, "attendance_archive")
+
+@pytest.fixture(scope="session")
+def client():
+    """One app for the session: its shutdown stops the job manager for good."""
+    from fastapi.testclient import TestClient
+    import main
+    with TestClient(main.app) as client: yield client
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(SCRATCH, ignore_errors=True)
@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import adjustments
+import models
+import occupancy_index
+import timetable_engine
+
+MONDAY = date.today() + timedelta(days=7 - date.today().weekday())  # next week, so make-up days are open
+DAY, PERIOD = timetable_engine.DAYS[0], timetable_engine.TIME_SLOTS[0]
+
+@pytest.fixture
+def db():
+    """T1 teaches CS-A and T3 teaches CS-B in the same cell; an override on MONDAY hands T3's class to T2."""
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    course = models.Course(name="DSA")
+    t1, t2, t3 = (models.Teacher(name=n) for n in ("T1", "T2", "T3"))
+    a, b, r1, r2 = models.Section(name="CS-A"), models.Section(name="CS-B"), models.Room(name="R1"), models.Room(name="R2")
+    db.add_all([course, t1, t2, t3, a, b, r1, r2])
+    db.flush()
+    db.execute(insert(models.teacher_course_association), [{"teacher_id": t.id, "course_id": course.id} for t in (t1, t2, t3)])
+    slot = timetable_engine.slot_id(DAY, PERIOD)
+    db.add_all([models.ScheduleEntry(day=DAY, time_slot=PERIOD, slot=slot, section_id=s.id, course_id=course.id, teacher_id=t.id, room_id=r.id)
+                for s, t, r in ((a, t1, r1), (b, t3, r2))])
+    db.flush()
+    b_entry = db.query(models.ScheduleEntry).filter_by(section_id=b.id).one()
+    db.add(models.ScheduleOverride(original_entry_id=b_entry.id, override_date=MONDAY, change_type="SUBSTITUTE", new_teacher_id=t2.id))
+    db.commit()
+    yield db
+    db.close()
+
+def teacher(db, name: str) -> models.Teacher:
+    return db.query(models.Teacher).filter_by(name=name).one()
+
+def test_snapshot_does_not_offer_a_teacher_an_override_books(db):
+    index = occupancy_index.OccupancyIndex()
+    index.rebuild(db)
+    conflict = db.query(models.ScheduleEntry).filter_by(teacher_id=teacher(db, "T1").id).one()
+    def substitutes(on):
+        snapshot = adjustments.AvailabilitySnapshot.load(db, index, on=on)
+        return {s.details for s in adjustments.find_solutions_for_conflict(conflict, snapshot) if s.type == "SUBSTITUTE"}
+    assert substitutes(MONDAY) == {"Assign T3"}  # T2 covers CS-B that day, which frees T3
+    assert substitutes(MONDAY + timedelta(days=7)) == {"Assign T2"}  # no override: the weekly timetable only
+
+def test_leave_plan_does_not_substitute_a_teacher_an_override_books(db):
+    plan = adjustments.plan_leave(db, teacher(db, "T1"), MONDAY, MONDAY, time_limit=5, num_workers=1)
+    assert [(a.change_type, a.new_teacher_id) for a in plan.assignments] == [("SUBSTITUTE", teacher(db, "T3").id)]
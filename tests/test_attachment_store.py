@@ -0,0 +1,30 @@
+import io
+import os
+
+import pytest
+
+import attachment_store
+import ingest
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(attachment_store, "ATTACHMENT_DIR", str(tmp_path))
+    return tmp_path
+
+def test_the_same_content_is_stored_once(store):
+    first = attachment_store.link(*attachment_store.receive(io.BytesIO(b"notice"), "a.PDF"))
+    second = attachment_store.link(*attachment_store.receive(io.BytesIO(b"notice"), "b.pdf"))
+    assert first["url"] == second["url"] and (first["deduplicated"], second["deduplicated"]) == (False, True)
+    assert first["name"].endswith(".pdf") and first["size"] == 6
+    assert [p.name for p in store.rglob("*") if p.is_file()] == [first["name"]]
+
+def test_an_upload_over_the_limit_leaves_nothing_behind(store):
+    with pytest.raises(ingest.UploadTooLarge):
+        attachment_store.receive(io.BytesIO(b"x" * (3 * attachment_store.CHUNK_BYTES)), "big.bin", limit=attachment_store.CHUNK_BYTES)
+    assert list(store.iterdir()) == []
+
+def test_only_attachment_names_map_to_paths():
+    name = "ab" * 32 + ".pdf"
+    assert attachment_store.path(name) == os.path.join(attachment_store.ATTACHMENT_DIR, "ab", name)
+    for bad in ("../../etc/passwd", "ab" * 32 + ".pdf/..", "notahash.pdf"):
+        with pytest.raises(ValueError): attachment_store.path(bad)
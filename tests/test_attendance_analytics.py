@@ -0,0 +1,91 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+import attendance_analytics
+import models
+
+CLASSES, ROLLS = ("CS-A", "CS-B"), [f"R{i:02d}" for i in range(6)]
+FIRST, LAST = date(2026, 1, 1), date(2026, 4, 30)
+
+@pytest.fixture
+def db():
+    """Four months of random registers for two classes, written straight to the log and rolled up by rebuild()."""
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(21)
+    days = [FIRST + timedelta(days=i) for i in range((LAST - FIRST).days + 1) if (FIRST + timedelta(days=i)).weekday() < 5]
+    db.execute(insert(models.AttendanceRecord), [
+        {"classroom_id": c, "date": d, "student_roll": r, "student_name": f"Student {r}", "status": rng.choice("PPPPLAA")}
+        for c in CLASSES for d in days for r in ROLLS if rng.random() < 0.9
+    ])
+    attendance_analytics.rebuild(db.connection().connection.driver_connection)
+    db.commit()
+    yield db
+    db.close()
+
+def expected(db, start=None, end=None, classroom_id=None) -> dict:
+    """(classroom_id, student_roll) -> (attended, total), counted row by row from the log."""
+    Log, totals = models.AttendanceRecord, {}
+    for c, r, d, status in db.execute(select(Log.classroom_id, Log.student_roll, Log.date, Log.status)):
+        if (start and d < start) or (end and d > end) or (classroom_id and c != classroom_id): continue
+        attended, total = totals.get((c, r), (0, 0))
+        totals[(c, r)] = (attended + (status in attendance_analytics.ATTENDED), total + 1)
+    return totals
+
+def test_split_range_reads_whole_months_from_the_rollups_and_the_edges_from_the_log():
+    split = attendance_analytics.split_range
+    assert split(date(2026, 1, 1), date(2026, 3, 31)) == ((date(2026, 1, 1), date(2026, 3, 1)), [])
+    assert split(date(2026, 1, 10), date(2026, 3, 5)) == (
+        (date(2026, 2, 1), date(2026, 2, 1)), [(date(2026, 1, 10), date(2026, 1, 31)), (date(2026, 3, 1), date(2026, 3, 5))])
+    assert split(date(2026, 2, 3), date(2026, 2, 20)) == (None, [(date(2026, 2, 3), date(2026, 2, 20))])
+    assert split(None, date(2026, 2, 10)) == ((None, date(2026, 1, 1)), [(date(2026, 2, 1), date(2026, 2, 10))])
+    with pytest.raises(ValueError): split(date(2026, 3, 1), date(2026, 2, 1))
+
+@pytest.mark.parametrize("start,end", [
+    (None, None), (FIRST, LAST), (date(2026, 1, 15), date(2026, 3, 10)), (date(2026, 2, 1), date(2026, 2, 28)),
+    (date(2026, 2, 3), date(2026, 2, 17)), (None, date(2026, 2, 11)), (date(2026, 3, 31), None),
+])
+def test_student_report_matches_the_log_over_any_range(db, start, end):
+    report = attendance_analytics.students(db, start, end)
+    assert {(s["classroom_id"], s["student_roll"]): (s["attended"], s["total"]) for s in report} == expected(db, start, end)
+    for s in report: assert s["percentage"] == round(100.0 * s["attended"] / s["total"], 2)
+
+def test_student_report_filters_by_class_and_roll(db):
+    start, end = date(2026, 1, 20), date(2026, 4, 5)
+    report = attendance_analytics.students(db, start, end, classroom_id="CS-B")
+    assert {(s["classroom_id"], s["student_roll"]): (s["attended"], s["total"]) for s in report} == expected(db, start, end, "CS-B")
+    [one] = attendance_analytics.students(db, start, end, classroom_id="CS-B", student_roll="R03")
+    assert (one["attended"], one["total"]) == expected(db, start, end, "CS-B")[("CS-B", "R03")]
+
+def test_classroom_report_and_defaulters_agree_with_the_student_report(db):
+    start, end, threshold = date(2026, 1, 12), date(2026, 4, 20), 72.0
+    by_student = attendance_analytics.students(db, start, end)
+    below = [s for s in by_student if 100.0 * s["attended"] < threshold * s["total"]]
+    assert below and len(below) < len(by_student)
+    for row in attendance_analytics.classrooms(db, start, end, threshold):
+        mine = [s for s in by_student if s["classroom_id"] == row["classroom_id"]]
+        assert (row["students"], row["attended"], row["total"]) == (len(mine), sum(s["attended"] for s in mine), sum(s["total"] for s in mine))
+        assert row["defaulters"] == sum(s in below for s in mine)
+    defaulters = attendance_analytics.defaulters(db, start, end, threshold=threshold)
+    assert sorted((s["classroom_id"], s["student_roll"]) for s in defaulters) == sorted((s["classroom_id"], s["student_roll"]) for s in below)
+    assert [s["percentage"] for s in defaulters] == sorted(s["percentage"] for s in defaulters)
+
+def test_apply_deltas_moves_the_rollups_and_drops_emptied_months(db):
+    key = ("CS-A", "R00", date(2026, 2, 1))
+    row = db.get(models.AttendanceRollup, key)
+    attended, total = row.attended, row.total
+    deltas, names = {}, {}
+    attendance_analytics.count_rows([("CS-A", "R00", "Student R00", date(2026, 2, 27), "A"), ("CS-A", "R00", "Student R00", date(2026, 2, 28), "L")], 1, deltas, names)
+    attendance_analytics.apply_deltas(db, deltas, names)
+    db.commit()
+    db.refresh(row)
+    assert (row.attended, row.total) == (attended + 1, total + 2)
+    attendance_analytics.apply_deltas(db, {key: (-row.attended, -row.total)}, names)
+    db.commit()
+    db.expire_all()
+    assert db.get(models.AttendanceRollup, key) is None
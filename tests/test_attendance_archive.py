@@ -0,0 +1,78 @@
+import os
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+import attendance_analytics
+import attendance_archive
+import attendance_store
+import models
+
+Log = models.AttendanceRecord
+FIRST, CUTOFF = date(2026, 1, 1), date(2026, 3, 1)  # January and February get archived, March stays in the log
+RANGES = [(None, None), (date(2026, 1, 12), date(2026, 2, 17)), (date(2026, 2, 9), date(2026, 2, 13)), (date(2026, 2, 20), date(2026, 3, 10))]
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(attendance_archive, "ARCHIVE_DIR", str(tmp_path))
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(23)
+    days = [FIRST + timedelta(days=i) for i in range(80) if (FIRST + timedelta(days=i)).weekday() < 5]
+    attendance_store.save_records(db, [
+        {"classroom_id": c, "date": d, "student_roll": f"R{i}", "student_name": f"Student R{i}", "status": rng.choice("PPLA"),
+         "remarks": "sick" if rng.random() < 0.1 else None}
+        for c in ("CS-A", "CS/B.1") for d in days for i in range(5)
+    ])
+    yield db
+    db.close()
+
+def day_rows(db, classroom_id, day) -> list:
+    return [{c: getattr(r, c) for c in attendance_archive.COLUMNS} for r in
+            db.execute(select(Log).where(Log.classroom_id == classroom_id, Log.date == day).order_by(Log.id)).scalars()]
+
+def reports(db) -> list:
+    return [attendance_analytics.students(db, start, end) for start, end in RANGES] + \
+           [attendance_analytics.students(db, date(2026, 2, 2), date(2026, 2, 25), "CS/B.1", "R3")]
+
+def test_archive_round_trip(db, tmp_path):
+    day = date(2026, 2, 10)
+    before_rows, before_reports = {c: day_rows(db, c, day) for c in ("CS-A", "CS/B.1")}, reports(db)
+    logged = attendance_archive.status(db)["log_rows"]
+
+    done = attendance_archive.archive(db, CUTOFF)
+    assert sorted((p["classroom_id"], p["month"]) for p in done) == [(c, m) for c in ("CS-A", "CS/B.1") for m in (date(2026, 1, 1), date(2026, 2, 1))]
+    assert db.execute(select(Log.date).where(Log.date < CUTOFF)).first() is None
+    status = attendance_archive.status(db)
+    assert (status["partitions"], status["rows"] + status["log_rows"]) == (4, logged)
+    assert os.path.isfile(tmp_path / "CS%2FB%2E1" / "2026-02.npz")
+
+    for c in ("CS-A", "CS/B.1"): assert attendance_archive.read_day(db, c, day) == before_rows[c]
+    assert attendance_archive.read_day(db, "CS-A", date(2026, 3, 2)) is None
+    assert reports(db) == before_reports
+
+def test_a_write_to_an_archived_month_restores_it(db, tmp_path):
+    day = date(2026, 2, 10)
+    attendance_archive.archive(db, CUTOFF)
+    rows = attendance_archive.read_day(db, "CS-A", day)
+    change = [{**r, "status": "A"} for r in rows if r["student_roll"] != "R4"]
+    for r in change: del r["id"]
+
+    assert attendance_store.save_records(db, change)["removed"] == 1
+    assert db.get(models.AttendanceArchivePartition, ("CS-A", date(2026, 2, 1))) is None
+    assert not os.path.exists(tmp_path / "CS-A" / "2026-02.npz")
+    assert attendance_archive.read_day(db, "CS-A", day) is None
+    assert {r["student_roll"]: r["status"] for r in day_rows(db, "CS-A", day)} == {f"R{i}": "A" for i in range(4)}
+    assert attendance_archive.read_day(db, "CS-A", date(2026, 1, 12)) is not None  # January stays archived
+
+    expected = reports(db)
+    rollups = sorted(db.execute(select(models.AttendanceRollup.__table__)).all())
+    attendance_analytics.rebuild(db.connection().connection.driver_connection)  # archived months keep their rollups
+    assert sorted(db.execute(select(models.AttendanceRollup.__table__)).all()) == rollups
+    attendance_archive.archive(db, CUTOFF)
+    assert attendance_archive.status(db)["partitions"] == 4
+    assert reports(db) == expected
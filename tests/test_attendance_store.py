@@ -0,0 +1,83 @@
+import io
+import random
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+import attendance_analytics
+import attendance_store
+import models
+
+Log, Rollup = models.AttendanceRecord, models.AttendanceRollup
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+
+def record(classroom_id, day, roll, status="P", remarks=None) -> dict:
+    return {"classroom_id": classroom_id, "date": day, "student_roll": roll, "student_name": f"Student {roll}", "status": status, "remarks": remarks}
+
+def register(db, classroom_id, day) -> dict:
+    return {r.student_roll: r.status for r in db.execute(select(Log).where(Log.classroom_id == classroom_id, Log.date == day)).scalars()}
+
+def rollups(db) -> list:
+    return sorted(db.execute(select(Rollup.classroom_id, Rollup.student_roll, Rollup.month, Rollup.student_name, Rollup.attended, Rollup.total)).all())
+
+def test_last_row_wins_and_replace_days_removes_missing_students(db):
+    day = date(2026, 3, 2)
+    assert attendance_store.save_records(db, [record("CS-A", day, "R1"), record("CS-A", day, "R2"), record("CS-A", day, "R3")]) == {"rows": 3, "days": 1, "removed": 0}
+    saved = attendance_store.save_records(db, [record("CS-A", day, "R1", "A"), record("CS-A", day, "R2", "L"), record("CS-A", day, "R1", "L")])
+    assert saved == {"rows": 2, "days": 1, "removed": 1}
+    assert register(db, "CS-A", day) == {"R1": "L", "R2": "L"}
+
+def test_without_replace_days_other_students_are_kept(db):
+    monday, tuesday = date(2026, 3, 2), date(2026, 3, 3)
+    attendance_store.save_records(db, [record("CS-A", d, r) for d in (monday, tuesday) for r in ("R1", "R2")] + [record("CS-B", monday, "R9")])
+    saved = attendance_store.save_records(db, [record("CS-A", monday, "R1", "A"), record("CS-A", tuesday, "R1", "A")], replace_days={("CS-A", tuesday)})
+    assert saved["removed"] == 1
+    assert register(db, "CS-A", monday) == {"R1": "A", "R2": "P"}
+    assert register(db, "CS-A", tuesday) == {"R1": "A"}
+    assert attendance_store.save_records(db, [record("CS-A", monday, "R3")], replace_days=False)["removed"] == 0
+    assert register(db, "CS-A", monday) == {"R1": "A", "R2": "P", "R3": "P"}
+    assert register(db, "CS-B", monday) == {"R9": "P"}
+
+def test_rollup_deltas_match_a_full_recompute(db):
+    rng = random.Random(22)
+    days = [date(2026, 1, 20) + timedelta(days=i) for i in range(40)]  # spans three months
+    for _ in range(60):
+        rows = [record(rng.choice(("CS-A", "CS-B")), rng.choice(days), f"R{rng.randrange(8)}", rng.choice("PPLA")) for _ in range(rng.randint(1, 25))]
+        attendance_store.save_records(db, rows, replace_days=rng.random() < 0.4)
+    incremental = rollups(db)
+    assert incremental and all(total > 0 for *_, total in incremental)
+    attendance_analytics.rebuild(db.connection().connection.driver_connection)
+    assert rollups(db) == incremental
+
+def test_a_failed_write_leaves_the_log_and_rollups_untouched(db):
+    day = date(2026, 3, 2)
+    attendance_store.save_records(db, [record("CS-A", day, "R1"), record("CS-A", day, "R2")])
+    before = rollups(db)
+    with pytest.raises(Exception): attendance_store.save_records(db, [record("CS-A", day, "R1", "A"), {**record("CS-A", day, "R2"), "status": None}])
+    assert register(db, "CS-A", day) == {"R1": "P", "R2": "P"}
+    assert rollups(db) == before
+
+def test_import_csv_skips_bad_rows_and_replaces_each_day_once(db, monkeypatch):
+    monkeypatch.setattr(attendance_store.ingest, "CSV_CHUNK_ROWS", 2)  # the 2026-03-02 register spans two chunks
+    attendance_store.save_records(db, [record("CS-A", date(2026, 3, 2), "R9"), record("CS-A", date(2026, 3, 3), "R9")])
+    csv = io.BytesIO(b"Classroom ID,Date,Student Roll,Student Name,Status,Remarks\n"
+                     b"CS-A,2026-03-02,R1,Student R1,P,\n"
+                     b"CS-A,2026-03-02,R2,Student R2,A,sick\n"
+                     b"CS-A,2026-03-02,R3,Student R3,L,\n"
+                     b"CS-A,02/03/2026,R4,Student R4,P,\n"
+                     b"CS-A,2026-03-02,,Student R5,P,\n")
+    summary = attendance_store.import_csv(db, csv, replace_days=True)
+    assert (summary["rowsRead"], summary["rowsImported"], summary["rowsRemoved"], summary["days"], summary["errorCount"]) == (5, 3, 1, 1, 2)
+    assert sorted(e["row"] for e in summary["errors"]) == [5, 6]
+    assert register(db, "CS-A", date(2026, 3, 2)) == {"R1": "P", "R2": "A", "R3": "L"}
+    assert register(db, "CS-A", date(2026, 3, 3)) == {"R9": "P"}
+    assert db.execute(select(Log.remarks).where(Log.student_roll == "R2")).scalar() == "sick"
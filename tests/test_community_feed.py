@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.orm import sessionmaker
+
+import community_feed
+import models
+
+Post = models.CommunityPost
+START = datetime(2026, 3, 2, 9, 0)
+
+@pytest.fixture
+def db():
+    """23 posts, several sharing a timestamp so the cursor has to break ties on id."""
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for statement in community_feed.FTS_SQL: conn.exec_driver_sql(statement)
+    db = sessionmaker(bind=engine)()
+    db.add_all([Post(title=f"Post {i}", content=f"Notes for week {i}", author="A", role=("faculty", "student")[i % 2],
+                     tag=("exam", "event", "general")[i % 3], created_at=START + timedelta(minutes=i // 3)) for i in range(23)])
+    db.commit()
+    yield db
+    db.close()
+
+def walk(db, limit, cursor=None, **filters) -> list:
+    """Ids of every page from `cursor` on, following the cursors to the end."""
+    ids = []
+    while True:
+        posts, cursor = community_feed.page(db, cursor, limit, **filters)
+        assert len(posts) <= limit
+        ids += [p["id"] for p in posts]
+        if cursor is None: return ids
+        assert len(posts) == limit
+
+def newest_first(db, **filters) -> list:
+    posts = db.query(Post).filter_by(**filters).all()
+    return [p.id for p in sorted(posts, key=lambda p: (p.created_at, p.id), reverse=True)]
+
+@pytest.mark.parametrize("limit", [1, 4, 5, 23, 100])
+def test_pages_cover_the_feed_once_in_order(db, limit):
+    assert walk(db, limit) == newest_first(db)
+
+@pytest.mark.parametrize("filters", [{"tag": "exam"}, {"role": "student"}, {"tag": "event", "role": "faculty"}])
+def test_filtered_pages_cover_their_posts_once_in_order(db, filters):
+    assert walk(db, 2, **filters) == newest_first(db, **filters)
+
+def test_a_post_added_while_paging_does_not_shift_later_pages(db):
+    first, cursor = community_feed.page(db, None, 5)
+    db.add(Post(title="Late", content="x", author="A", role="faculty", tag="exam", created_at=START + timedelta(hours=1)))
+    db.commit()
+    late, *feed = newest_first(db)
+    assert [p["id"] for p in first] + walk(db, 5, cursor) == feed
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "@@@", community_feed.encode_cursor(START, 1)[:-3]])
+def test_a_bad_cursor_is_a_value_error(db, cursor):
+    with pytest.raises(ValueError): community_feed.page(db, cursor)
+
+def search(db, text) -> list:
+    return [p["id"] for p in community_feed.page(db, None, 100, search=text)[0]]
+
+def test_search_matches_words_and_prefixes_and_ignores_fts_syntax(db):
+    assert search(db, "week 7") == [8] and search(db, "notes wee") == newest_first(db)
+    assert search(db, 'week" OR "7') == []  # a required word "or", not an OR of "week" and "7"
+    assert search(db, "ex") == newest_first(db, tag="exam")
+    with pytest.raises(ValueError): search(db, "  *  ")
+
+def test_triggers_keep_the_index_in_step_on_update_and_delete(db):
+    db.add(Post(title="Seating plan", content="Hall B for the midterm", author="A", role="faculty", tag="exam", created_at=START))
+    db.commit()
+    new = db.query(Post).filter_by(title="Seating plan").one().id
+    assert search(db, "midterm") == [new]
+
+    db.execute(update(Post).where(Post.id == new).values(content="Hall C for the final"))
+    db.commit()
+    assert search(db, "midterm") == [] and search(db, "final") == [new]
+    assert search(db, "seating") == [new]  # untouched columns are reindexed too
+
+    db.execute(update(Post).where(Post.id == new).values(author="B"))  # not an indexed column: no reindex needed
+    db.commit()
+    assert search(db, "final") == [new]
+
+    db.execute(delete(Post).where(Post.id == new))
+    db.commit()
+    assert search(db, "final") == [] and search(db, "seating") == []
+    db.connection().exec_driver_sql("INSERT INTO community_posts_fts (community_posts_fts, rank) VALUES ('integrity-check', 1)")  # raises if out of step
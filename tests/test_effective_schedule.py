@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import effective_schedule
+import models
+import timetable_engine
+
+def test_first_period_of_first_day_sorts_first():
+    """Slot 0 is a real calendar cell, not an unknown one to push to the end."""
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    section, course, teacher, room = models.Section(name="CS-A"), models.Course(name="DSA"), models.Teacher(name="T1"), models.Room(name="R1")
+    db.add_all([section, course, teacher, room])
+    db.flush()
+    day, periods = timetable_engine.DAYS[0], timetable_engine.TIME_SLOTS[:3]
+    for period in reversed(periods):
+        db.add(models.ScheduleEntry(day=day, time_slot=period, slot=timetable_engine.slot_id(day, period),
+                                    section_id=section.id, course_id=course.id, teacher_id=teacher.id, room_id=room.id))
+    db.commit()
+    assert timetable_engine.slot_id(day, periods[0]) == 0
+
+    first_day = date(2026, 10, 19)
+    first_day -= timedelta(days=first_day.weekday())  # the calendar's first day is the week's first
+    classes = effective_schedule.resolve(db, first_day)["CS-A"]["classes"]
+    assert [c["time_slot"] for c in classes] == periods
+
+def test_changes_for_today_lists_the_overrides_dated_today():
+    """The panel's list matches /api/schedule/view: overrides dated view_date; the class itself changes on its own day."""
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    section, course, t1, t2, room = models.Section(name="CS-A"), models.Course(name="DSA"), models.Teacher(name="T1"), models.Teacher(name="T2"), models.Room(name="R1")
+    db.add_all([section, course, t1, t2, room])
+    db.flush()
+    day, period = timetable_engine.DAYS[4], timetable_engine.TIME_SLOTS[0]
+    entry = models.ScheduleEntry(day=day, time_slot=period, slot=timetable_engine.slot_id(day, period), section_id=section.id, course_id=course.id, teacher_id=t1.id, room_id=room.id)
+    db.add(entry)
+    db.flush()
+    monday = date(2026, 10, 19)
+    db.add(models.ScheduleOverride(original_entry_id=entry.id, override_date=monday, change_type="SUBSTITUTE", new_teacher_id=t2.id))
+    db.commit()
+
+    on_monday, on_friday = effective_schedule.resolve(db, monday)["CS-A"], effective_schedule.resolve(db, monday + timedelta(days=4))["CS-A"]
+    assert on_monday["classes"] == [] and [(ov["change_type"], ov["new_teacher"]) for ov in on_monday["overrides"]] == [("SUBSTITUTE", "T2")]
+    assert on_friday["overrides"] == [] and [(c["faculty_name"], c["status"]) for c in on_friday["classes"]] == [("T2", "substitute")]
@@ -0,0 +1,44 @@
+import os
+import time
+
+import pytest
+
+import jobs
+
+@pytest.fixture
+def manager():
+    manager = jobs.JobManager(workers=2)
+    yield manager
+    manager.shutdown()
+
+def settle(manager: jobs.JobManager, job: jobs.Job, timeout: float = 60) -> jobs.Job:
+    deadline = time.monotonic() + timeout
+    while manager.get(job.id).status not in jobs.FINISHED:
+        assert time.monotonic() < deadline, f"{job.kind} still {job.status}"
+        time.sleep(0.02)
+    return job
+
+def test_jobs_beyond_the_worker_limit_queue_and_all_finish(manager):
+    submitted = [manager.submit("pow", pow, n, 2, on_result=lambda r: r + 1) for n in range(6)]
+    assert [settle(manager, job).result for job in submitted] == [n * n + 1 for n in range(6)]
+    assert {job.status for job in submitted} == {jobs.DONE}
+
+def test_a_crashed_worker_fails_its_job(manager):
+    job = settle(manager, manager.submit("crash", os._exit, 3))
+    assert job.status == jobs.FAILED and "exited" in job.error
+
+def test_an_overdue_job_is_stopped_at_its_deadline(manager):
+    start = time.monotonic()
+    job = settle(manager, manager.submit("sleep", time.sleep, 60, time_limit=0.5))
+    assert job.status == jobs.TIMED_OUT and time.monotonic() - start < 10
+
+def test_cancel_stops_a_running_job(manager):
+    job = manager.submit("sleep", time.sleep, 60)
+    while job.status == jobs.QUEUED: time.sleep(0.02)
+    assert manager.cancel(job.id).status == jobs.CANCELLED
+
+def test_an_idle_supervisor_sleeps_until_the_next_expiry():
+    manager = jobs.JobManager(ttl=30)
+    assert manager._timeout() is None  # nothing to wait for: block until submit() wakes it
+    manager.record("cached", 1)
+    assert 29 < manager._timeout() <= 30
@@ -0,0 +1,159 @@
+import asyncio
+import io
+import json
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import ingest
+import main
+import models
+import seating
+
+def events(body: str) -> list:
+    """(event, data) pairs of a Server-Sent Events body."""
+    parsed = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        parsed.append((fields["event"], json.loads(fields["data"])))
+    return parsed
+
+def exam_payload(branches: dict, rows: int, cols: int, **options) -> dict:
+    students = [{"name": f"{b}{i}", "roll_no": f"{b}-{i}", "branch": b} for b, n in branches.items() for i in range(n)]
+    return {"students": students, "rooms": [{"name": "Hall", "rows": rows, "cols": cols}], **options}
+
+def test_seating_stream_solves_on_the_anyio_thread_pool(client, monkeypatch):
+    threads, solve = [], seating.solve_seating
+    def recording(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return solve(*args, **kwargs)
+    monkeypatch.setattr(seating, "solve_seating", recording)
+    response = client.post("/api/generate_exam_seating/stream", json=exam_payload({"CSE": 10, "ECE": 10}, 4, 5, engine="per_room", timeLimit=5, useCache=False))
+    parsed = events(response.text)
+    assert [e for e, _ in parsed][-1] == "result" and "progress" in {e for e, _ in parsed}
+    assert len(parsed[-1][1]["assignments"]) == 20
+    assert threads and threads[0].startswith("AnyIO worker thread")
+
+def test_seating_job_solves_in_a_worker_then_serves_the_cached_layout(client):
+    payload = exam_payload({"CSE": 6, "ECE": 6}, 3, 4, engine="per_room", timeLimit=5)
+    client.delete("/api/generate_exam_seating/cache")
+    first = client.post("/api/jobs/exam_seating", json=payload).json()
+    deadline = time.monotonic() + 60
+    while (status := client.get(f"/api/jobs/{first['job_id']}").json()["status"]) in ("queued", "running"):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert status == "done" and client.get(f"/api/jobs/{first['job_id']}/result").json()["stats"]["cached"] is False
+    second = client.post("/api/jobs/exam_seating", json=payload).json()
+    assert second["status"] == "done"  # a cache hit is recorded as finished, no worker started
+    result = client.get(f"/api/jobs/{second['job_id']}/result").json()
+    assert result["stats"]["cached"] is True and len(result["assignments"]) == 12
+
+ADMIN = {"password": "admin123"}
+
+def post(client, title: str, attachment: bytes = None):
+    files = {"file": ("notice.pdf", attachment, "application/pdf")} if attachment is not None else None
+    form = {"title": title, "content": f"About {title}", "author": "Office", "role": "admin", "tag": "notice", **ADMIN}
+    response = client.post("/api/community/posts", data=form, files=files)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_a_shared_attachment_goes_with_the_last_post_that_links_it(client):
+    first, second = post(client, "exam dates", b"%PDF shared"), post(client, "exam dates again", b"%PDF shared")
+    assert first["attachment_url"] == second["attachment_url"]
+    url = first["attachment_url"]
+    client.delete(f"/api/community/posts/{first['id']}", headers=ADMIN)
+    assert client.get(url).status_code == 200
+    client.delete(f"/api/community/posts/{second['id']}", headers=ADMIN)
+    assert client.get(url).status_code == 404
+
+def test_a_post_created_while_its_attachment_is_deleted_keeps_it(client):
+    """A delete that finds no other post must not unlink a file a concurrent create has just deduplicated onto."""
+    body = b"%PDF raced"
+    old = post(client, "old notice", body)
+    committing = threading.Event()
+    def stall(session):  # hold the new post between linking its file and committing it
+        if any(isinstance(obj, models.CommunityPost) for obj in session.new):
+            committing.set()
+            time.sleep(0.3)
+    event.listen(Session, "before_commit", stall)
+    try:
+        created = []
+        creator = threading.Thread(target=lambda: created.append(post(client, "new notice", body)))
+        creator.start()
+        assert committing.wait(10)
+        client.delete(f"/api/community/posts/{old['id']}", headers=ADMIN)
+        creator.join()
+    finally: event.remove(Session, "before_commit", stall)
+    assert client.get(created[0]["attachment_url"]).content == body
+
+def test_an_oversized_post_is_refused_before_its_body_is_read():
+    app, reads = FastAPI(), []
+    @app.post("/upload")
+    def upload(file: UploadFile = File(...)):
+        reads.append(file.filename)
+    app.add_middleware(main.BodyLimit, path="/upload", limit=1024)
+    client = TestClient(app)
+    assert client.post("/upload", files={"file": ("a.bin", b"x" * 100)}).status_code == 200
+    assert client.post("/upload", files={"file": ("b.bin", b"x" * 4096)}).status_code == 413  # by Content-Length
+    chunked = client.post("/upload", content=(b"x" * 512 for _ in range(8)), headers={"content-type": "multipart/form-data; boundary=x"})
+    assert chunked.status_code == 413 and reads == ["a.bin"]
+
+def test_a_failed_upload_cancels_the_other_parses(monkeypatch):
+    async def parse(parser, filename, contents):
+        if filename == "broken.csv": raise ValueError("no header")
+        await asyncio.sleep(30)
+    def check_size(file_obj):
+        if file_obj.read() == b"huge": raise ingest.UploadTooLarge("too large")
+        file_obj.seek(0)
+    monkeypatch.setattr(main, "parse_in_pool", parse)
+    monkeypatch.setattr(ingest, "check_size", check_size)
+    async def leftovers(error, *names):
+        """Parses uploads named `names`, expecting `error`; returns the tasks still running afterwards."""
+        files = [UploadFile(io.BytesIO(b"huge" if name == "huge.csv" else b"name,branch"), filename=name) for name in names]
+        with pytest.raises(error): await main.parse_uploads_in_pool(files, ingest.parse_students_bytes)
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task() and not task.done()]
+    assert asyncio.run(leftovers(ingest.UploadTooLarge, "a.csv", "b.csv", "huge.csv")) == []
+    assert asyncio.run(leftovers(HTTPException, "broken.csv", "c.csv")) == []
+
+def save(client, section: str, teacher: str, room: str, period: int = 0):
+    slot = {"courseName": f"{section} lab", "facultyName": teacher, "roomName": room}
+    response = client.post("/api/save_schedule", json={"sectionName": section, "schedule": {"Monday": {main.timetable_engine.TIME_SLOTS[period]: slot}}})
+    assert response.status_code == 200, response.text
+
+def test_saved_schedules_are_conditional_and_paged(client):
+    client.post("/api/clear_all_schedules")
+    for i, section in enumerate(("SS-C", "SS-A", "SS-D", "SS-B")): save(client, section, f"SS-T{i}", f"SS-R{i}", i)
+
+    whole = client.get("/api/saved_schedules")
+    assert list(whole.json()) == ["SS-A", "SS-B", "SS-C", "SS-D"] and whole.headers["Cache-Control"] == "no-cache"
+    etag = whole.headers["ETag"]
+    again = client.get("/api/saved_schedules", headers={"If-None-Match": f'"stale", {etag}'})
+    assert (again.status_code, again.content, again.headers["ETag"]) == (304, b"", etag)
+
+    pages = [client.get("/api/saved_schedules", params={"offset": offset, "limit": 3}) for offset in (0, 3, 6)]
+    assert [list(p.json()) for p in pages] == [["SS-A", "SS-B", "SS-C"], ["SS-D"], []]
+    assert {p.headers["X-Total-Count"] for p in pages} == {"4"}
+    assert len({etag} | {p.headers["ETag"] for p in pages}) == 4  # each view has its own tag
+    assert client.get("/api/saved_schedules", params={"offset": 0, "limit": 3}, headers={"If-None-Match": pages[0].headers["ETag"]}).status_code == 304
+    assert client.get("/api/saved_schedules", params={"offset": 3, "limit": 3}, headers={"If-None-Match": pages[0].headers["ETag"]}).status_code == 200
+
+    picked = client.get("/api/saved_schedules", params={"sections": ["SS-D", "SS-B", "SS-X", "SS-D"], "limit": 1})
+    assert picked.json() == {"SS-B": whole.json()["SS-B"]} and picked.headers["X-Total-Count"] == "2"
+    assert client.get("/api/saved_schedules", params={"limit": 0}).status_code == 422
+
+    save(client, "SS-B", "SS-T9", "SS-R9")
+    changed = client.get("/api/saved_schedules", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.json()["SS-B"][0]["faculty_name"] == "SS-T9"
+    assert client.get("/api/saved_schedules", params={"offset": 3, "limit": 3}, headers={"If-None-Match": pages[1].headers["ETag"]}).status_code == 200
+
+    client.post("/api/delete_schedule", json={"sectionName": "SS-A"})
+    deleted = client.get("/api/saved_schedules", headers={"If-None-Match": changed.headers["ETag"]})
+    assert deleted.status_code == 200 and "SS-A" not in deleted.json()
+    client.post("/api/clear_all_schedules")
+    assert client.get("/api/saved_schedules").json() == {}
@@ -0,0 +1,63 @@
+import os
+import shutil
+import sqlite3
+
+from sqlalchemy import create_engine
+
+import community_feed
+import migrations
+import models
+import timetable_engine
+
+SHIPPED_DB = os.path.join(os.path.dirname(migrations.__file__), "smartflex_v2.db")
+
+def shipped_copy(directory, seed: bool = False):
+    """
+    An engine on a copy of the database shipped with the repo (schema version 0), after the create_all main runs
+    before upgrading. `seed` adds a pre-migration schedule entry and a second attendance mark for one student and date.
+    """
+    path = directory / "smartflex_v2.db"
+    shutil.copy(SHIPPED_DB, path)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+        if seed:
+            conn.execute("INSERT INTO schedule_entries (day, time_slot, section_id, course_id, teacher_id, room_id) VALUES (?, ?, 1, 1, 1, 1)",
+                         (timetable_engine.DAYS[1], timetable_engine.TIME_SLOTS[2]))
+            conn.execute("INSERT INTO attendance_log_v1 (classroom_id, date, student_roll, student_name, status) VALUES ('EC201', '2026-02-06', '202', 'Late Joiner', 'L')")
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)  # new tables only: existing ones get their indexes from the migrations
+    return engine
+
+def test_a_new_database_runs_every_hot_query_on_an_index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    models.Base.metadata.create_all(bind=engine)
+    assert migrations.upgrade(engine) == [number for number, _, _ in migrations.MIGRATIONS]
+    assert migrations.current_version(engine) == migrations.LATEST_VERSION
+    assert migrations.full_scans(engine) == {}
+    assert migrations.upgrade(engine) == []
+
+def test_the_shipped_database_upgrades_in_place(tmp_path):
+    shipped = shipped_copy(tmp_path)
+    assert migrations.upgrade(shipped) == [1, 2, 3, 4, 5]
+    assert migrations.current_version(shipped) == migrations.LATEST_VERSION
+    assert migrations.full_scans(shipped) == {}
+    with shipped.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM community_posts").scalar() == 2
+        assert conn.exec_driver_sql("SELECT count(*) FROM attendance_log_v1").scalar() == 8
+
+def test_migrations_apply_one_version_at_a_time(tmp_path):
+    shipped = shipped_copy(tmp_path, seed=True)
+    def scalar(sql, *params):
+        with shipped.connect() as conn: return conn.exec_driver_sql(sql, params).scalar()
+    for number in range(1, migrations.LATEST_VERSION + 1):
+        assert migrations.upgrade(shipped, target=number) == [number]
+        assert migrations.current_version(shipped) == number
+        if number == 2:  # slot backfilled from day and time_slot
+            assert scalar("SELECT slot FROM schedule_entries") == timetable_engine.slot_id(timetable_engine.DAYS[1], timetable_engine.TIME_SLOTS[2])
+        if number == 3:  # rollups backfilled; the duplicate mark still counts until migration 4
+            assert scalar("SELECT total FROM attendance_rollups WHERE student_roll = '202'") == 3
+        if number == 4:  # the latest mark of a student on a date wins, and the rollups follow
+            assert scalar("SELECT status FROM attendance_log_v1 WHERE student_roll = '202' AND date = '2026-02-06'") == "L"
+            assert scalar("SELECT attended || '/' || total FROM attendance_rollups WHERE student_roll = '202'") == "1/2"
+        if number == 5:  # existing posts are searchable
+            assert scalar("SELECT rowid FROM community_posts_fts WHERE community_posts_fts MATCH ?", community_feed.search_query("engis")) == 2
@@ -0,0 +1,68 @@
+import random
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+import models
+import occupancy_index
+import schedule_store
+import timetable_engine
+
+DAY, PERIODS = timetable_engine.DAYS[0], timetable_engine.TIME_SLOTS[:4]
+
+class SlowCommitSession(Session):
+    """Commits, then stalls: widens the window between a write reaching the database and reaching the index."""
+    def commit(self):
+        super().commit()
+        time.sleep(random.random() / 100)
+
+@pytest.fixture
+def sessions(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False, "timeout": 30})
+    models.Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(occupancy_index, "index", occupancy_index.OccupancyIndex())
+    yield sessionmaker(bind=engine, class_=SlowCommitSession)
+    engine.dispose()
+
+def timetable(teacher: str, room: str, periods=PERIODS) -> dict:
+    return {DAY: {p: {"courseName": f"{teacher}-course", "facultyName": teacher, "roomName": room} for p in periods}}
+
+def rebuilt(db) -> list:
+    index = occupancy_index.OccupancyIndex()
+    index.rebuild(db)
+    return sorted(index.entry_rows())
+
+def test_bulk_save_replaces_sections_in_the_database_and_the_index(sessions):
+    db = sessions()
+    schedule_store.bulk_save_schedules(db, {"CS-A": timetable("T1", "R1"), "CS-B": timetable("T2", "R2", PERIODS[:2])})
+    schedule_store.bulk_save_schedules(db, {"CS-A": timetable("T3", "R1", PERIODS[1:2])})
+    index = occupancy_index.index
+    assert db.scalar(select(models.ScheduleEntry.id).where(models.ScheduleEntry.teacher_id == index.teacher_ids["T1"])) is None
+    assert index.teacher_cells(index.teacher_ids["T1"]) == set()
+    assert index.teacher_cells(index.teacher_ids["T3"]) == {(DAY, PERIODS[1])}
+    assert index.room_cells(index.room_ids["R2"]) == {(DAY, p) for p in PERIODS[:2]}
+    assert sorted(index.entry_rows()) == rebuilt(db)
+
+def test_concurrent_saves_leave_the_index_matching_the_database(sessions):
+    errors = []
+    def save(n):
+        db = sessions()
+        try:
+            for i in range(5):
+                section = random.choice(["CS-A", "CS-B"])
+                schedule_store.bulk_save_schedules(db, {section: timetable(f"T{n}", f"R{n}", random.sample(PERIODS, 1 + i % len(PERIODS)))})
+        except Exception as e: errors.append(e)
+        finally: db.close()
+    threads = [threading.Thread(target=save, args=(n,)) for n in range(6)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert errors == []
+    db = sessions()
+    assert sorted(occupancy_index.index.entry_rows()) == rebuilt(db)
+    section_masks = occupancy_index.index.masks()[2]
+    for section_id in db.scalars(select(models.Section.id)):
+        slots = db.scalars(select(models.ScheduleEntry.slot).where(models.ScheduleEntry.section_id == section_id)).all()
+        assert section_masks.get(section_id, 0) == sum(1 << s for s in slots)
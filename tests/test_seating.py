@@ -0,0 +1,112 @@
+import os
+from collections import Counter
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+import schemas
+import seating
+
+def exam(branches: dict, rooms: list) -> tuple:
+    """({branch: n} students, [(rows, cols)] rooms) as request models."""
+    students = [schemas.StudentInput(name=f"{b}{i}", roll_no=f"{b}-{i}", branch=b) for b, n in branches.items() for i in range(n)]
+    return students, [schemas.RoomDimension(name=f"Hall {i}", rows=r, cols=c) for i, (r, c) in enumerate(rooms)]
+
+def seated(assignments: list) -> Counter:
+    return Counter(a["student"]["branch"] for a in assignments)
+
+def test_room_splits_fill_every_seat_quota_with_the_branch_counts():
+    rooms = exam({}, [(4, 5), (2, 3), (6, 6)])[1]
+    splits = seating.room_splits(rooms, {1: 30, 2: 20, 3: 7})
+    assert [sum(s.values()) for s in splits] == seating.room_quotas(rooms, 57)
+    assert all(sum(s.values()) <= r.rows * r.cols for s, r in zip(splits, rooms))
+    assert sum((Counter(s) for s in splits), Counter()) == Counter({1: 30, 2: 20, 3: 7})
+
+def test_constructive_layout_of_two_even_branches_has_no_neighbours():
+    layout = np.array(seating.construct_room_layout(6, 8, {1: 24, 2: 24}))
+    assert seating.layout_penalty([layout])["penalty"] == 0
+    assert Counter(layout.ravel().tolist()) == {1: 24, 2: 24}
+
+def test_auto_keeps_a_constructive_layout_with_no_neighbours():
+    rooms = exam({}, [(4, 6)])[1]
+    layouts, stats = seating.solve_layout_auto(rooms, {1: 12, 2: 12}, time_limit=5, num_workers=1)
+    assert stats["status"] == "OPTIMAL" and stats["rooms"][0]["method"] == "constructive"
+    assert layouts == [seating.construct_room_layout(4, 6, {1: 12, 2: 12})]
+
+def test_auto_improves_a_crowded_room_with_cp_sat_unless_it_is_too_large(monkeypatch):
+    rooms, counts = exam({}, [(4, 5)])[1], {1: 14, 2: 4}  # 14 of one branch in 20 seats must sit together somewhere
+    constructive = seating.layout_penalty([seating.construct_room_layout(4, 5, counts)])["penalty"]
+    layouts, stats = seating.solve_layout_auto(rooms, counts, time_limit=5, num_workers=1)
+    assert stats["rooms"][0]["method"] == "cp_sat" and stats["status"] in ("OPTIMAL", "FEASIBLE")
+    assert 0 < seating.layout_penalty(layouts)["penalty"] <= constructive
+    assert Counter(np.array(layouts[0]).ravel().tolist()) == {1: 14, 2: 4, 0: 2}
+
+    monkeypatch.setattr(seating, "AUTO_CP_SAT_MAX_LITERALS", 4 * 5 * 2 - 1)
+    layouts, stats = seating.solve_layout_auto(rooms, counts, time_limit=5, num_workers=1)
+    assert (stats["status"], stats["rooms"][0]["method"]) == ("HEURISTIC", "constructive")
+    assert seating.layout_penalty(layouts)["penalty"] == constructive
+
+def test_every_engine_seats_every_student():
+    students, rooms = exam({"CSE": 14, "ECE": 10, "ME": 6}, [(4, 5), (5, 4)])
+    for engine in seating.SEATING_ENGINES:
+        assignments, unplaced, stats = seating.solve_seating(students, rooms, engine, time_limit=5, num_workers=1, use_cache=False)
+        assert seated(assignments) == {"CSE": 14, "ECE": 10, "ME": 6} and unplaced == [], engine
+        assert len({(a["room_name"], a["row"], a["col"]) for a in assignments}) == len(students), engine
+
+def test_per_room_solves_each_hall_on_the_shared_pool_and_recovers_a_broken_one():
+    students, rooms = exam({"CSE": 12, "ECE": 12}, [(4, 6), (4, 6)])
+    broken = seating.room_pool.get()
+    try: broken.submit(os._exit, 1).result()
+    except BrokenProcessPool: pass
+    assignments, _, stats = seating.solve_seating(students, rooms, "per_room", time_limit=5, num_workers=2, use_cache=False)
+    assert len(assignments) == 24 and stats["penalty"] == 0 and len(stats["rooms"]) == 2
+    assert seating.room_pool.get() is not broken
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = seating.LayoutCache(max_size=8)
+    monkeypatch.setattr(seating, "layout_cache", cache)
+    return cache
+
+def test_a_repeated_composition_is_served_from_the_cache(cache):
+    students, rooms = exam({"CSE": 12, "ECE": 12}, [(4, 6)])
+    first = seating.solve_seating(students, rooms, "constructive", use_cache=True)[2]
+    renamed, _ = exam({"EEE": 12, "IT": 12}, [(4, 6)])  # same branch sizes and room shape
+    second = seating.solve_seating(renamed, rooms, "constructive", use_cache=True)[2]
+    assert (first["cached"], second["cached"]) == (False, True) and second["penalty"] == 0
+
+def feasible(cache, students, rooms, budget: float) -> dict:
+    """Caches a layout cut off by a time limit of `budget` seconds for the exam; returns its start_seating key."""
+    branch_counts, _ = seating.group_by_branch(students)
+    key, to_canonical = seating.layout_key("per_room", branch_counts, rooms)
+    layouts = [seating.construct_room_layout(r.rows, r.cols, c) for r, c in zip(rooms, seating.room_splits(rooms, branch_counts))]
+    cache.put(key, seating.remap_layouts(layouts, to_canonical), {"engine": "per_room", "status": "FEASIBLE"}, budget)
+    return key
+
+def test_a_time_limited_layout_is_served_to_requests_with_no_larger_budget(cache):
+    students, rooms = exam({"CSE": 12, "ECE": 12}, [(4, 6)])
+    feasible(cache, students, rooms, 5.0)
+    for time_limit, accept_cached, served in ((5.0, False, True), (2.0, False, True), (10.0, False, False), (10.0, True, True), (None, False, False)):
+        state = seating.start_seating(students, rooms, "per_room", time_limit=time_limit, accept_cached=accept_cached)
+        assert (state["layouts"] is not None) == served, (time_limit, accept_cached)
+        assert (state["best"] is not None) == (not served), (time_limit, accept_cached)
+
+def test_a_longer_solve_that_cannot_beat_the_floor_re_caches_it_under_its_budget(cache):
+    students, rooms = exam({"CSE": 12, "ECE": 12}, [(4, 6)])
+    key = feasible(cache, students, rooms, 5.0)
+    state = seating.start_seating(students, rooms, "per_room", time_limit=10.0)
+    worse = [[[1] * 6 for _ in range(2)] + [[2] * 6 for _ in range(2)]]
+    stats = seating.finish_seating(state, worse, {"engine": "per_room", "status": "FEASIBLE"})[2]
+    assert stats["cached"] and stats["penalty"] == 0
+    assert cache.get(key)["time_limit"] == 10.0
+
+def test_disk_entries_outlive_the_process_cache_and_are_pruned_oldest_first(tmp_path):
+    cache = seating.LayoutCache(max_size=8, directory=str(tmp_path), disk_size=2)
+    for i, key in enumerate("abc"):
+        cache.put(key, [[[i]]], {"status": "OPTIMAL"}, 1.0)
+        os.utime(tmp_path / f"{key}.json", (i, i))
+    cache.put("d", [[[3]]], {"status": "OPTIMAL"})
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["c.json", "d.json"]
+    restarted = seating.LayoutCache(directory=str(tmp_path))
+    assert restarted.get("c") == {"layouts": [[[2]]], "stats": {"status": "OPTIMAL"}, "time_limit": 1.0} and restarted.get("a") is None
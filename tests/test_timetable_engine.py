@@ -0,0 +1,58 @@
+import os
+import random
+from concurrent.futures.process import BrokenProcessPool
+
+import schemas
+import timetable_engine
+
+def courses(n: int, hours: int = 3) -> list:
+    return [schemas.CourseInput(name=f"C{i}", hours=hours, faculty=f"F{i % 12}") for i in range(n)]
+
+def grid(rooms: list, faculty: list) -> timetable_engine.OccupancyGrid:
+    return timetable_engine.OccupancyGrid(timetable_engine.DAYS, timetable_engine.TIME_SLOTS, rooms, faculty)
+
+def cells(schedule: dict) -> list:
+    return [(day, time, detail) for day, slots in schedule.items() for time, detail in slots.items() if detail]
+
+def test_cpsat_places_every_hour_without_clashes():
+    section = courses(6)
+    result = timetable_engine.schedule_section(grid(["R1", "R2"], [c.faculty for c in section]), section, "cpsat", time_limit=10, num_workers=1)
+    assert result["status"] in ("OPTIMAL", "FEASIBLE") and result["unplaced"] == []
+    placed = cells(result["schedule"])
+    assert len(placed) == sum(c.hours for c in section)
+    assert len({(day, time) for day, time, _ in placed}) == len(placed)  # one class per section cell
+
+def test_cpsat_timeout_returns_the_first_fit_hint():
+    """Stopped before its first solution, CP-SAT keeps the first-fit schedule instead of an empty one."""
+    random.seed(1)
+    section = courses(40)
+    result = timetable_engine.schedule_section(grid(["R1", "R2"], [c.faculty for c in section]), section, "cpsat", time_limit=0.0005, num_workers=1)
+    assert result["status"] == timetable_engine.FALLBACK_STATUS and result["solverStatus"] == "UNKNOWN"
+    placed = cells(result["schedule"])
+    assert placed and len(result["unplaced"]) < len(section)
+    hours = {c.name: 0 for c in section}
+    for _, _, detail in placed: hours[detail["courseName"]] += 1
+    assert sorted(result["unplaced"]) == sorted(name for name, n in hours.items() if n < 3)
+
+def batch():
+    a = [schemas.CourseInput(name=f"A{i}", hours=2, faculty=f"FA{i}") for i in range(3)]
+    b = [schemas.CourseInput(name=f"B{i}", hours=2, faculty=f"FB{i}") for i in range(3)]
+    return {"A": ["R1"], "B": ["R2"]}, {"A": a, "B": b}
+
+def test_generate_batch_solves_independent_components_on_the_shared_pool():
+    section_rooms, sections = batch()
+    schedules, unplaced, stats = timetable_engine.generate_batch(
+        timetable_engine.DAYS, timetable_engine.TIME_SLOTS, section_rooms, sections, [], "cpsat", time_limit=10, num_workers=2)
+    assert stats["components"] == 2 and unplaced == {"A": [], "B": []}
+    for name in sections:
+        assert len(cells(schedules[name])) == 6
+        assert {detail["roomName"] for _, _, detail in cells(schedules[name])} == set(section_rooms[name])
+
+def test_generate_batch_recovers_after_a_worker_dies():
+    section_rooms, sections = batch()
+    broken = timetable_engine.component_pool.get()
+    try: broken.submit(os._exit, 1).result()
+    except BrokenProcessPool: pass
+    schedules, unplaced, _ = timetable_engine.generate_batch(
+        timetable_engine.DAYS, timetable_engine.TIME_SLOTS, section_rooms, sections, [], "greedy", num_workers=2)
+    assert unplaced == {"A": [], "B": []} and timetable_engine.component_pool.get() is not broken
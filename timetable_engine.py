@@ -0,0 +1,301 @@
+import json
+import os
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+import jobs
+
+# --- CALENDAR ---
+# Teaching days and periods, overridable with a JSON file {"days": [...], "periods": [...], "lunch_period": "..."}
+# named by SMARTFLEX_CALENDAR. Every (day, period) cell has a compact integer slot id, stored in
+# schedule_entries.slot; after changing the calendar run `python migrations.py --reslot`.
+DEFAULT_CALENDAR = {
+    "days": ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'],
+    "periods": ['9:00 AM', '10:00 AM', '11:00 AM', '12:00 PM', '1:00 PM', '2:00 PM', '3:00 PM', '4:00 PM', '5:00 PM'],
+    "lunch_period": '1:00 PM',
+}
+
+def load_calendar(path: str = None) -> dict:
+    if not path: return DEFAULT_CALENDAR
+    with open(path) as f: return {**DEFAULT_CALENDAR, **json.load(f)}
+
+CALENDAR = load_calendar(os.environ.get("SMARTFLEX_CALENDAR"))
+DAYS = list(CALENDAR["days"])
+PERIODS = list(CALENDAR["periods"])
+LUNCH_SLOT = CALENDAR["lunch_period"]
+TIME_SLOTS = [p for p in PERIODS if p != LUNCH_SLOT]
+SLOT_IDS = {(day, period): d * len(PERIODS) + p for d, day in enumerate(DAYS) for p, period in enumerate(PERIODS)}
+SLOT_CELLS = {slot: cell for cell, slot in SLOT_IDS.items()}
+
+def slot_id(day: str, time_slot: str):
+    """Integer id of a (day, period) cell, ordered chronologically; None outside the calendar."""
+    return SLOT_IDS.get((day, time_slot))
+
+def slot_cell(slot: int) -> tuple:
+    return SLOT_CELLS[slot]
+
+def time_slots_for(include_lunch_break: bool) -> list:
+    """The periods classes may use: all of them, or all but the lunch period when a lunch break is kept."""
+    return list(TIME_SLOTS) if include_lunch_break else list(PERIODS)
+
+def week_dates(day: date) -> list:
+    monday = day - timedelta(days=day.weekday())
+    return [monday + timedelta(days=i) for i in range(len(DAYS))]
+
+def date_for_day(anchor: date, day_name: str) -> date:
+    """The date of `day_name` in the week of `anchor`; overrides store new_day relative to their own week."""
+    return week_dates(anchor)[DAYS.index(day_name)]
+
+class OccupancyGrid:
+    """
+    Dense busy masks for one generation run: day x slot x room, day x slot x faculty
+    and day x slot for the section being generated. Names outside the grid are ignored.
+    """
+    def __init__(self, days: list, time_slots: list, rooms: list, faculty: list):
+        self.days, self.time_slots = list(days), list(time_slots)
+        self.rooms = list(dict.fromkeys(rooms))
+        self.faculty = list(dict.fromkeys(faculty))
+        self.day_idx = {d: i for i, d in enumerate(self.days)}
+        self.slot_idx = {t: i for i, t in enumerate(self.time_slots)}
+        self.room_idx = {r: i for i, r in enumerate(self.rooms)}
+        self.faculty_idx = {f: i for i, f in enumerate(self.faculty)}
+        shape = (len(self.days), len(self.time_slots))
+        self.room_busy = np.zeros(shape + (len(self.rooms),), dtype=bool)
+        self.faculty_busy = np.zeros(shape + (len(self.faculty),), dtype=bool)
+        self.section_busy = np.zeros(shape, dtype=bool)
+
+    def copy(self):
+        clone = object.__new__(OccupancyGrid)
+        clone.__dict__.update(self.__dict__)
+        clone.room_busy, clone.faculty_busy, clone.section_busy = self.room_busy.copy(), self.faculty_busy.copy(), self.section_busy.copy()
+        return clone
+
+    def _cell(self, day, time):
+        return self.day_idx.get(day), self.slot_idx.get(time)
+
+    def mark_room(self, day: str, time: str, room: str):
+        d, t = self._cell(day, time)
+        r = self.room_idx.get(room)
+        if d is not None and t is not None and r is not None: self.room_busy[d, t, r] = True
+
+    def mark_faculty(self, day: str, time: str, faculty: str):
+        d, t = self._cell(day, time)
+        f = self.faculty_idx.get(faculty)
+        if d is not None and t is not None and f is not None: self.faculty_busy[d, t, f] = True
+
+    def free_mask(self, faculty: str) -> np.ndarray:
+        """(day, slot, room) mask of cells where the section, the faculty and the room are all free."""
+        free_time = ~self.section_busy
+        f = self.faculty_idx.get(faculty)
+        if f is not None: free_time &= ~self.faculty_busy[:, :, f]
+        return free_time[:, :, None] & ~self.room_busy
+
+    def place(self, d: int, t: int, r: int, faculty: str):
+        self.room_busy[d, t, r] = True
+        self.section_busy[d, t] = True
+        f = self.faculty_idx.get(faculty)
+        if f is not None: self.faculty_busy[d, t, f] = True
+
+def expand_classes(courses) -> list:
+    return [{'courseName': c.name, 'facultyName': c.faculty} for c in courses for _ in range(c.hours)]
+
+def generate_schedule(grid: OccupancyGrid, classes: list, rng=random):
+    """
+    Randomized first-fit over the grid. Each class hour lands on a uniformly random free
+    (day, slot, room) cell, the same distribution as shuffling every cell and taking the first fit.
+    """
+    classes = list(classes)
+    rng.shuffle(classes)
+    schedule, unplaced_courses = {day: {} for day in grid.days}, []
+    for class_item in classes:
+        faculty = class_item['facultyName']
+        free = np.flatnonzero(grid.free_mask(faculty))
+        if free.size == 0:
+            unplaced_courses.append(class_item['courseName'])
+            continue
+        d, t, r = np.unravel_index(free[rng.randrange(free.size)], grid.room_busy.shape)
+        grid.place(d, t, r, faculty)
+        schedule[grid.days[d]][grid.time_slots[t]] = {'courseName': class_item['courseName'], 'facultyName': faculty, 'roomName': grid.rooms[r]}
+    return schedule, list(set(unplaced_courses))
+
+PLACED_WEIGHT = 100
+SAME_DAY_PENALTY = 1
+FALLBACK_STATUS = "FIRST_FIT_FALLBACK"  # CP-SAT found nothing in time; the first-fit hint is returned
+
+def solve_schedules_cp_sat(grid: OccupancyGrid, sections: dict, time_limit: float = 10.0, num_workers: int = 8, hint: dict = None, section_rooms: dict = None, rng=random):
+    """
+    Places the courses of every section in `sections` ({section_name: [CourseInput]}) with CP-SAT,
+    maximizing placed hours and lightly penalizing repeats of a course on one day.
+    Rooms carry no capacity or type, so the model only decides (section, course, day, slot) and caps
+    each cell by the free rooms a section may use (`section_rooms`, default every grid room); concrete
+    rooms are drawn at random from the free ones afterwards.
+    `hint` takes schedules in the response shape ({section: {day: {slot: detail}}}), e.g. a first-fit run;
+    when the time limit ends before CP-SAT finds a solution the hint is returned, with status FALLBACK_STATUS.
+    Returns (schedules, unplaced, stats) keyed by section name.
+    """
+    model = cp_model.CpModel()
+    n_days, n_slots = len(grid.days), len(grid.time_slots)
+    room_sets = {name: frozenset((section_rooms or {}).get(name) or grid.rooms) for name in sections}
+    free_in_set = {rs: (~grid.room_busy[:, :, [grid.room_idx[r] for r in rs]]).sum(axis=2) for rs in set(room_sets.values())}
+    placements = []
+    by_cell, by_faculty_cell = defaultdict(list), defaultdict(list)
+    placed_terms, spread_terms = [], []
+    hinted = set()
+    for s_name, day_map in (hint or {}).items():
+        for day, slots in day_map.items():
+            for time, detail in slots.items():
+                if detail: hinted.add((s_name, detail['courseName'], detail['facultyName'], day, time))
+
+    for s_idx, (s_name, courses) in enumerate(sections.items()):
+        free_rooms = free_in_set[room_sets[s_name]]
+        section_cells = defaultdict(list)
+        for c_idx, course in enumerate(courses):
+            f = grid.faculty_idx.get(course.faculty)
+            course_vars = []
+            for d in range(n_days):
+                day_vars, day_hint = [], 0
+                for t in range(n_slots):
+                    if free_rooms[d, t] == 0 or (f is not None and grid.faculty_busy[d, t, f]): continue
+                    var = model.NewBoolVar(f'x_{s_idx}_{c_idx}_{d}_{t}')
+                    in_hint = (s_name, course.name, course.faculty, grid.days[d], grid.time_slots[t]) in hinted
+                    model.AddHint(var, in_hint)
+                    day_hint += in_hint
+                    placements.append((var, s_name, course, d, t))
+                    day_vars.append(var)
+                    section_cells[(d, t)].append(var)
+                    by_cell[(room_sets[s_name], d, t)].append(var)
+                    by_faculty_cell[(course.faculty, d, t)].append(var)
+                if len(day_vars) > 1:
+                    extra = model.NewIntVar(0, len(day_vars) - 1, f'extra_{s_idx}_{c_idx}_{d}')
+                    model.Add(extra >= sum(day_vars) - 1)
+                    model.AddHint(extra, max(0, day_hint - 1))
+                    spread_terms.append(extra)
+                course_vars.extend(day_vars)
+            model.Add(sum(course_vars) <= course.hours)
+            placed_terms.extend(course_vars)
+        for cell_vars in section_cells.values():
+            if len(cell_vars) > 1: model.AddAtMostOne(cell_vars)
+
+    # Exact when room lists are identical or disjoint; overlapping lists may leave a few classes roomless below.
+    for rs, free_rooms in free_in_set.items():
+        subsets = [other for other in free_in_set if other <= rs]
+        for d in range(n_days):
+            for t in range(n_slots):
+                cell_vars = [v for other in subsets for v in by_cell.get((other, d, t), [])]
+                if len(cell_vars) > free_rooms[d, t]: model.Add(sum(cell_vars) <= int(free_rooms[d, t]))
+    for cell_vars in by_faculty_cell.values():
+        if len(cell_vars) > 1: model.AddAtMostOne(cell_vars)
+
+    model.Maximize(PLACED_WEIGHT * sum(placed_terms) - SAME_DAY_PENALTY * sum(spread_terms))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_search_workers = num_workers
+    status = solver.Solve(model)
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+    schedules = {s_name: {day: {} for day in grid.days} for s_name in sections}
+    placed_hours = defaultdict(int)
+    chosen = defaultdict(list)
+    if solved:
+        for var, s_name, course, d, t in placements:
+            if solver.BooleanValue(var): chosen[(d, t)].append((s_name, course))
+    elif hint:  # stopped before a first solution: keep the first-fit schedule the model was hinted with
+        course_of = {(s_name, c.name, c.faculty): c for s_name, courses in sections.items() for c in courses}
+        for s_name, day_map in hint.items():
+            for day, slots in day_map.items():
+                for time, detail in slots.items():
+                    if not detail: continue
+                    schedules[s_name][day][time] = dict(detail)
+                    grid.mark_room(day, time, detail['roomName']); grid.mark_faculty(day, time, detail['facultyName'])
+                    placed_hours[(s_name, id(course_of[(s_name, detail['courseName'], detail['facultyName'])]))] += 1
+    for (d, t), classes in chosen.items():
+        for s_name, course in sorted(classes, key=lambda item: len(room_sets[item[0]])):
+            rooms = [r for r in room_sets[s_name] if not grid.room_busy[d, t, grid.room_idx[r]]]
+            if not rooms: continue
+            room = rng.choice(sorted(rooms))
+            schedules[s_name][grid.days[d]][grid.time_slots[t]] = {'courseName': course.name, 'facultyName': course.faculty, 'roomName': room}
+            grid.room_busy[d, t, grid.room_idx[room]] = True
+            grid.mark_faculty(grid.days[d], grid.time_slots[t], course.faculty)
+            placed_hours[(s_name, id(course))] += 1
+
+    unplaced = {s_name: sorted({c.name for c in courses if placed_hours[(s_name, id(c))] < c.hours}) for s_name, courses in sections.items()}
+    stats = {
+        "status": solver.StatusName(status) if solved or not hint else FALLBACK_STATUS, "solveTime": round(solver.WallTime(), 3),
+        "objective": solver.ObjectiveValue() if solved else None,
+    }
+    if not solved and hint: stats["solverStatus"] = solver.StatusName(status)
+    return schedules, unplaced, stats
+
+def schedule_section(grid: OccupancyGrid, courses, engine: str = "random", time_limit: float = 10.0, num_workers: int = 8) -> dict:
+    """The /api/generate result for one section: random first-fit, or CP-SAT hinted from it."""
+    hint, unplaced = generate_schedule(grid.copy() if engine == "cpsat" else grid, expand_classes(courses))
+    if engine != "cpsat": return {"schedule": hint, "unplaced": unplaced}
+    schedules, unplaced, stats = solve_schedules_cp_sat(grid, {"": courses}, time_limit, num_workers, hint={"": hint})
+    return {"schedule": schedules[""], "unplaced": unplaced[""], "engine": engine, **stats}
+
+def independent_components(section_rooms: dict, sections: dict) -> list:
+    """Groups section names that share a faculty member or a room; different groups can be solved separately."""
+    parent = {name: name for name in sections}
+    def find(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+    owner = {}
+    for name, courses in sections.items():
+        for key in [('f', c.faculty) for c in courses] + [('r', r) for r in section_rooms[name]]:
+            if key in owner: parent[find(name)] = find(owner[key])
+            else: owner[key] = name
+    groups = defaultdict(list)
+    for name in sections: groups[find(name)].append(name)
+    return list(groups.values())
+
+def solve_component(days, time_slots, section_rooms: dict, sections: dict, busy: list, engine: str, time_limit: float, num_workers: int):
+    """
+    Generates every section of one component against a busy list of (day, slot, room, faculty).
+    The first-fit engine runs the sections one after another on one grid; CP-SAT solves them jointly,
+    hinted with the first-fit result.
+    """
+    rooms = [r for name in sections for r in section_rooms[name]]
+    grid = OccupancyGrid(days, time_slots, rooms, [c.faculty for courses in sections.values() for c in courses])
+    for day, time, room, faculty in busy:
+        grid.mark_room(day, time, room); grid.mark_faculty(day, time, faculty)
+    base = grid.copy()
+    schedules, unplaced = {}, {}
+    for name, courses in sections.items():
+        section_grid = grid.copy()
+        section_grid.room_busy[:, :, [grid.room_idx[r] for r in grid.rooms if r not in set(section_rooms[name])]] = True
+        schedules[name], unplaced[name] = generate_schedule(section_grid, expand_classes(courses))
+        for day, slots in schedules[name].items():
+            for time, detail in slots.items():
+                grid.mark_room(day, time, detail['roomName']); grid.mark_faculty(day, time, detail['facultyName'])
+    if engine != "cpsat": return schedules, unplaced, {"status": "FIRST_FIT"}
+    return solve_schedules_cp_sat(base, sections, time_limit, num_workers, hint=schedules, section_rooms=section_rooms)
+
+component_pool = jobs.ProcessPool(int(os.environ.get("SMARTFLEX_BATCH_WORKERS", "0")) or os.cpu_count() or 1)
+
+def generate_batch(days, time_slots, section_rooms: dict, sections: dict, busy: list, engine: str = "cpsat", time_limit: float = 30.0, num_workers: int = 8):
+    """
+    Splits the batch into independent components and solves them on the shared component_pool, giving
+    each CP-SAT solve a share of `num_workers`; a component whose CP-SAT solve times out keeps its first fit.
+    Returns (schedules, unplaced, stats) keyed by section name.
+    """
+    components = independent_components(section_rooms, sections)
+    workers = max(1, num_workers // len(components))
+    tasks = [(days, time_slots, {n: section_rooms[n] for n in names}, {n: sections[n] for n in names}, busy, engine, time_limit, workers) for names in components]
+    if len(tasks) == 1: results = [solve_component(*tasks[0])]
+    else: results = component_pool.map(solve_component, *zip(*tasks))
+    schedules, unplaced = {}, {}
+    for component_schedules, component_unplaced, _ in results:
+        schedules.update(component_schedules); unplaced.update(component_unplaced)
+    stats = {
+        "components": len(components), "statuses": sorted({r[2]["status"] for r in results}),
+        "solveTime": max((r[2].get("solveTime", 0) for r in results), default=0),
+        "objective": sum(r[2].get("objective") or 0 for r in results) if engine == "cpsat" else None,
+    }
+    return schedules, unplaced, stats